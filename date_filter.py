@@ -3,14 +3,54 @@
 date_filter.py - Datums-Referenz-Filter für eb-gui.py
 Ergänzung zur bestehenden eBib GUI um Datumsfilterung nach Spalte 0
 KORRIGIERT: Verwendet grid() statt pack() für Konsistenz mit Haupt-GUI
+Versteht einzelne Tage, Monate, Jahre und Bereiche (01.03.85-31.12.86);
+gefiltert wird über Tagesnummern (eb_query.parse_day, in der DB indiziert)
 """
 
 import tkinter as tk
 from tkinter import ttk
+import calendar
 import re
 from datetime import datetime, date
 from typing import Optional, Tuple, List
 
+from eb_query import format_date_range, parse_day
+
+# Trennzeichen zwischen Anfang und Ende eines Bereichs (neben einfachem '-')
+RANGE_SEPARATORS = ('..', '–', ' - ', ' bis ')
+
+
+class DateRange:
+    """Zeitraum von start bis end (jeweils einschließlich)"""
+
+    def __init__(self, start: date, end: date):
+        self.start = start
+        self.end = end
+
+    @property
+    def is_single_day(self) -> bool:
+        return self.start == self.end
+
+    def contains(self, day_number: Optional[int]) -> bool:
+        """Liegt die Tagesnummer (eb_query.parse_day) im Zeitraum?"""
+        return day_number is not None and self.start.toordinal() <= day_number <= self.end.toordinal()
+
+    def query_value(self) -> str:
+        """Wert für das eb-Feld datum: ('2025-03-15' bzw. '1985-03-01..1986-12-31')"""
+        return format_date_range(self.start.toordinal(), self.end.toordinal())
+
+    def display(self) -> str:
+        """Anzeige als dd.mm.yy bzw. dd.mm.yy–dd.mm.yy"""
+        start = DateReferenceParser.format_date_for_display(self.start)
+        if self.is_single_day:
+            return start
+        return f"{start}–{DateReferenceParser.format_date_for_display(self.end)}"
+
+    def compact(self) -> str:
+        """Für Dateinamen: 20250315 bzw. 19850301-19861231"""
+        start = self.start.strftime("%Y%m%d")
+        return start if self.is_single_day else f"{start}-{self.end.strftime('%Y%m%d')}"
+
 
 class DateReferenceParser:
     """
@@ -68,6 +108,71 @@ class DateReferenceParser:
         
         return None
     
+    @staticmethod
+    def parse_period(period_input: str) -> Optional[DateRange]:
+        """
+        Parst einen einzelnen Zeitraum: Tag (dd.mm.yy), Monat (mm.yy,
+        mm.yyyy) oder Jahr (yy, yyyy)
+
+        Returns:
+            DateRange oder None bei ungültiger Eingabe
+        """
+        period = period_input.strip() if isinstance(period_input, str) else ''
+        day = DateReferenceParser.parse_date_reference(period)
+        if day:
+            return DateRange(day.date(), day.date())
+
+        match = re.match(r'(\d{1,2})[.\-/](\d{2}|\d{4})$', period)
+        if match:
+            month, year = int(match.group(1)), int(match.group(2))
+            if len(match.group(2)) == 2:
+                year = DateReferenceParser.convert_two_digit_year(year)
+            if 1 <= month <= 12:
+                last_day = calendar.monthrange(year, month)[1]
+                return DateRange(date(year, month, 1), date(year, month, last_day))
+            return None
+
+        match = re.match(r'(\d{2}|\d{4})$', period)
+        if match:
+            year = int(match.group(1))
+            if len(match.group(1)) == 2:
+                year = DateReferenceParser.convert_two_digit_year(year)
+            if year >= 1:
+                return DateRange(date(year, 1, 1), date(year, 12, 31))
+        return None
+
+    @staticmethod
+    def parse_date_range(date_input: str) -> Optional[DateRange]:
+        """
+        Parst einen Zeitraum oder einen Bereich zweier Zeiträume
+        (z.B. "15.03.25", "03.85", "1985", "01.03.85-31.12.86", "85-86")
+
+        Ein Bereich reicht vom ersten Tag des linken bis zum letzten
+        Tag des rechten Zeitraums.
+
+        Returns:
+            DateRange oder None bei ungültiger Eingabe
+        """
+        if not date_input or not isinstance(date_input, str):
+            return None
+        text = date_input.strip()
+        if not text:
+            return None
+
+        single = DateReferenceParser.parse_period(text)
+        if single:
+            return single
+
+        # Bereich: erst eindeutige Trenner, dann jedes '-' als mögliche Grenze
+        candidates = [text.split(sep, 1) for sep in RANGE_SEPARATORS if sep in text]
+        candidates += [[text[:pos], text[pos + 1:]] for pos, char in enumerate(text) if char == '-']
+        for start_text, end_text in candidates:
+            start = DateReferenceParser.parse_period(start_text)
+            end = DateReferenceParser.parse_period(end_text)
+            if start and end and start.start <= end.end:
+                return DateRange(start.start, end.end)
+        return None
+
     @staticmethod
     def format_date_for_display(date_obj: datetime) -> str:
         """Formatiert Datum für Anzeige als dd.mm.yy"""
@@ -139,7 +244,7 @@ class DateReferenceFilter:
         # Eingabe-Label
         date_label = tk.Label(
             self.date_filter_frame, 
-            text="Datum dd.mm.yy:",
+            text="Datum (dd.mm.yy, mm.yy, yyyy, von-bis):",
             bg=self.colors['bg'], 
             fg=self.colors['fg']
         )
@@ -199,25 +304,22 @@ class DateReferenceFilter:
                 self.filter_callback(None, None)
             return
         
-        # Datum parsen
-        parsed_date = self.parser.parse_date_reference(date_input)
+        # Datum bzw. Zeitraum parsen
+        parsed_range = self.parser.parse_date_range(date_input)
         
-        if parsed_date:
-            # Gültiges Datum
-            formatted_date = self.parser.format_date_for_display(parsed_date)
-            iso_date = self.parser.format_date_iso(parsed_date)
-            
+        if parsed_range:
+            # Gültiger Zeitraum
             self.validation_label.config(
-                text=f"✓ {formatted_date} → {iso_date}", 
+                text=f"✓ {parsed_range.display()} → {parsed_range.query_value()}", 
                 fg="green"
             )
             
-            self.current_date = parsed_date
+            self.current_date = parsed_range
             self.is_valid = True
             
             # Filter anwenden
             if self.filter_callback:
-                self.filter_callback(parsed_date, date_input)
+                self.filter_callback(parsed_range, date_input)
         else:
             # Ungültiges Datum
             self.validation_label.config(
@@ -241,44 +343,33 @@ class DateReferenceFilter:
         if self.filter_callback:
             self.filter_callback(None, None)
     
-    def get_current_date(self) -> Optional[datetime]:
-        """Gibt das aktuell eingegebene Datum zurück"""
+    def get_current_date(self) -> Optional[DateRange]:
+        """Gibt den aktuell eingegebenen Zeitraum zurück"""
         return self.current_date if self.is_valid else None
     
     def get_current_iso_date(self) -> Optional[str]:
-        """Gibt das aktuelle Datum im ISO-Format (yyyy-mm-dd) zurück"""
+        """Gibt den aktuellen Zeitraum als eb-Feldwert (yyyy-mm-dd bzw. von..bis) zurück"""
         if self.current_date:
-            return self.parser.format_date_iso(self.current_date)
+            return self.current_date.query_value()
         return None
 
 
-def filter_tsv_rows_by_date(rows: List[List[str]], target_date: datetime) -> List[List[str]]:
+def filter_tsv_rows_by_date(rows: List[List[str]], target_range: DateRange) -> List[List[str]]:
     """
     Filtert TSV-Zeilen nach Datum in Spalte 0
     
     Args:
         rows: Liste von TSV-Zeilen als String-Listen
-        target_date: Ziel-Datum für den Filter
+        target_range: Zeitraum für den Filter
         
     Returns:
         Gefilterte Liste von Zeilen
     """
-    if not target_date:
+    if not target_range:
         return rows
     
-    target_iso = DateReferenceParser.format_date_iso(target_date)
-    filtered_rows = []
-    
-    for row in rows:
-        if len(row) > 0:
-            # Spalte 0 ist das Datum
-            row_date = row[0].strip()
-            
-            # Exakter Vergleich mit ISO-Format
-            if row_date.startswith(target_iso):
-                filtered_rows.append(row)
-    
-    return filtered_rows
+    # Spalte 0 ist das Datum, verglichen über die Tagesnummer
+    return [row for row in rows if row and target_range.contains(parse_day(row[0].strip()))]
 
 
 # Test-Funktion für das Modul
@@ -293,6 +384,11 @@ def test_date_parser():
         "31.12.29",  # → 2029-12-31
         "15/03/25",  # Alternative Trenner
         "15-03-25",  # Alternative Trenner
+        "03.85",     # Monat → 1985-03-01..1985-03-31
+        "1985",      # Jahr
+        "01.03.85-31.12.86",  # Bereich
+        "85-86",     # Bereich zweier Jahre
+        "02.24..03.24",       # Bereich zweier Monate
         "invalid",   # Ungültig
         "32.01.25",  # Ungültiger Tag
         "",          # Leer
@@ -300,11 +396,9 @@ def test_date_parser():
     
     print("=== Test der Datums-Parser-Funktionalität ===")
     for test_input in test_cases:
-        result = parser.parse_date_reference(test_input)
+        result = parser.parse_date_range(test_input)
         if result:
-            iso_format = parser.format_date_iso(result)
-            display_format = parser.format_date_for_display(result)
-            print(f"'{test_input}' → {iso_format} (Display: {display_format})")
+            print(f"'{test_input}' → {result.query_value()} (Display: {result.display()})")
         else:
             print(f"'{test_input}' → UNGÜLTIG")
 
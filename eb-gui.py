@@ -65,9 +65,24 @@ except ImportError:
     print("Bitte stellen Sie sicher, dass date_filter.py im gleichen Verzeichnis liegt.")
     sys.exit(1)
 
+from eb_collections import load_collections, remove_duplicates
+from eb_query import FILE_TYPES, compile_node, format_size, parse_day, required_literals
+from eb_sql import (QueryCancelled, ResultCursor, cancellable, check_freshness, has_fts_index,
+                    install_cancel_handler, read_meta)
+from eb_tokens import has_token_index, lookup_words
+from eb_planner import load_statistics, plan_query
+from tsv_scan import scan_tsv
+from result_table import VirtualResultTable
+from ui_queue import MODE_BATCH, MODE_LATEST, UIUpdateQueue
+from ebib_preprocessor import PHASES, BuildCancelled, CancelToken, format_duration, preprocess_to_sqlite
+import multiprocessing
+
 # SQLite-DB für Performance
 SQLITE_DB = Path.home() / 'Documents' / 'ebib_search.db'
 
+# Eintrag der Sammlungs-Auswahl ohne Einschränkung
+ALL_COLLECTIONS = "Alle Sammlungen"
+
 FIELD_MAP = {
     "datum": 0,
     "name": 3,
@@ -82,71 +97,109 @@ FIELD_ALIASES = {
 }
 
 def check_and_build_sqlite_db():
-    """Prüft SQLite-DB und baut sie automatisch auf falls nötig"""
+    """
+    Prüft die SQLite-DB in konstanter Zeit über ihre Tabelle meta
+    (kein COUNT(*) über 2.5M Zeilen beim Start)
+
+    Returns:
+        (db_exists, status, record_count) mit status 'ok', 'stale'
+        (TSV-Datei neuer, inkrementelles Update anbieten) oder 'rebuild'
+    """
     db_path = Path(SQLITE_DB)
 
     print(f"[INFO] Prüfe SQLite-DB: {db_path}")
 
     if not db_path.exists():
         print(f"[INFO] SQLite-DB nicht gefunden, muss aufgebaut werden")
-        return False, True, 0
+        return False, 'rebuild', 0
 
     try:
-        conn = sqlite3.connect(str(db_path))
-        cursor = conn.cursor()
-        cursor.execute("SELECT COUNT(*) FROM files")
-        record_count = cursor.fetchone()[0]
+        conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+        meta = read_meta(conn)
         conn.close()
-
-        if record_count == 0:
-            print(f"[WARNING] SQLite-DB ist leer, muss neu aufgebaut werden")
-            return True, True, 0
-
-        print(f"[INFO] SQLite-DB OK: {record_count:,} Records")
-        return True, False, record_count
-
     except Exception as e:
         print(f"[ERROR] SQLite-DB defekt: {e}")
-        return True, True, 0
-
-def build_sqlite_db_async(callback=None):
-    """Baut SQLite-DB im Hintergrund auf"""
+        return True, 'rebuild', 0
+
+    record_count = int(meta.get('row_count', 0))
+    status, reason = check_freshness(meta, INPUT_FILE)
+
+    if status == 'rebuild':
+        print(f"[WARNING] SQLite-DB muss aufgebaut werden: {reason}")
+    elif status == 'stale':
+        print(f"[INFO] SQLite-DB veraltet ({record_count:,} Records): {reason}")
+    else:
+        print(f"[INFO] SQLite-DB OK: {record_count:,} Records (aufgebaut {meta.get('built_at', '?')} "
+              f"in {meta.get('build_seconds', '?')}s)")
+    return True, status, record_count
+
+def build_sqlite_db_async(callback=None, progress=None, cancel=None):
+    """
+    Baut die SQLite-DB im Hintergrund-Thread auf (ebib_preprocessor, im
+    eigenen Prozess - funktioniert so auch im PyInstaller-Binary)
+
+    Args:
+        callback: Callback(success, message) nach Abschluss, aus dem Build-Thread
+        progress: Callback(BuildProgress) aus dem Build-Thread
+        cancel: CancelToken zum Abbrechen
+    """
     def build_process():
         try:
             print(f"[INFO] Starte SQLite-DB Aufbau...")
+            result = preprocess_to_sqlite(input_file=INPUT_FILE, db_path=SQLITE_DB,
+                                          progress=progress, cancel=cancel)
+            print(f"[SUCCESS] SQLite-DB erfolgreich erstellt: {SQLITE_DB}")
+            if callback:
+                callback(True, result.describe_phases())
 
-            # Prüfe ob Preprocessor-Script existiert
-            preprocessor_script = Path(__file__).parent / 'csv-2-sqlite-conversion.py'
-            if not preprocessor_script.exists():
-                raise FileNotFoundError(f"csv-2-sqlite-conversion.py nicht gefunden")
-
-            # Rufe Preprocessor auf mit Umgebungsvariable für DB-Pfad
-            env = os.environ.copy()
-            env['EBIB_SQLITE_PATH'] = str(SQLITE_DB)
-
-            result = subprocess.run([
-                'python3', str(preprocessor_script)
-            ], input='1\n', text=True, capture_output=True, env=env)
-
-            if result.returncode == 0:
-                print(f"[SUCCESS] SQLite-DB erfolgreich erstellt: {SQLITE_DB}")
-                if callback:
-                    callback(True)
-            else:
-                print(f"[ERROR] Preprocessor fehlgeschlagen: {result.stderr}")
-                if callback:
-                    callback(False)
-
+        except BuildCancelled:
+            print(f"[INFO] SQLite-DB Aufbau abgebrochen")
+            if callback:
+                callback(False, "abgebrochen")
         except Exception as e:
             print(f"[ERROR] Fehler beim DB-Aufbau: {e}")
             if callback:
-                callback(False)
+                callback(False, str(e))
 
     thread = threading.Thread(target=build_process, daemon=True)
     thread.start()
     return thread
 
 
+class SearchOptions:
+    """
+    Filter-Einstellungen einer Suche, beim Start im Tk-Thread kopiert:
+    der Such-Thread liest keine Tk-Variablen, und Änderungen in der
+    Oberfläche während der Suche wirken erst auf die nächste.
+    """
+
+    def __init__(self, types=(), date_filter=None, collection=None, remove_duplicates=False):
+        self.types = tuple(types)          # aktive Dateitypen aus FILE_TYPES
+        self.date_filter = date_filter     # DateRange oder None
+        self.collection = collection       # Sammlungsname oder None
+        self.remove_duplicates = remove_duplicates
+
+    @property
+    def has_date_filter(self):
+        return self.date_filter is not None
+
+    @property
+    def has_type_filter(self):
+        return bool(self.types)
+
+    def describe(self, query):
+        """Aktive Filter als Texte, z.B. ["Text: 'x'", 'Typ: Text+Audio']"""
+        filter_info = []
+        if query.strip():
+            filter_info.append(f"Text: '{query.strip()}'")
+        if self.date_filter:
+            filter_info.append(f"Datum: {self.date_filter.query_value()}")
+        if self.types:
+            filter_info.append(f"Typ: {'+'.join(t.capitalize() for t in self.types)}")
+        if self.collection:
+            filter_info.append(f"Sammlung: {self.collection}")
+        return filter_info
+
 
 class EBibGUI:
     def __init__(self, root):
@@ -177,18 +230,39 @@ class EBibGUI:
         # Variablen für die Suche
         self.search_running = False
         self.search_thread = None
-        self.found_rows = []
+        self.search_cancel = None  # CancelToken der laufenden Suche
+        self.found_rows = []  # Liste (TSV-Modus) oder eb_sql.ResultCursor (SQLite)
+        self.result_count = 0
+        self.last_query = ""
+        self.output_file = None  # ODS-Datei der aktuellen Treffer, erst beim Öffnen erstellt
+        self.result_totals = None  # (Anzahl, Anzahl ohne Duplikate, Summe, Durchschnitt der Größe) aller Treffer
+        self.last_options = SearchOptions()  # Filter der letzten Suche (Statistik, ODS-Dateiname)
 
         # Neue Variable für Datums-Filter
         self.current_date_filter = None
 
         # SQLite-DB Management
         self.sqlite_db = str(SQLITE_DB)
+        self.query_stats = None  # Statistik für den Query-Planer, lazy geladen
+        self.db_conn = None      # Lese-Verbindung, siehe get_db_connection
+        self.db_generation = None
         self.db_ready = False
         self.building_db = False
+        self.build_cancel = None  # CancelToken des laufenden DB-Aufbaus
 
         self.setup_ui()
 
+        # Einziger Weg von Such-/Aufbau-Threads zur Oberfläche: Ereignisse in
+        # ui_updates, im Tk-Thread getaktet zugestellt (kein root.after je Ereignis)
+        self.ui_updates = UIUpdateQueue(self.root)
+        self.ui_updates.register('status', lambda text: self.status_label.config(text=text), MODE_LATEST)
+        self.ui_updates.register('log', self.append_log, MODE_BATCH)
+        self.ui_updates.register('results', self.show_results)
+        self.ui_updates.register('error', self.search_error)
+        self.ui_updates.register('build_progress', self.show_build_progress, MODE_LATEST)
+        self.ui_updates.register('build_finished', self.db_build_finished)
+        self.ui_updates.start()
+
         # SQLite-DB beim Start prüfen und ggf. aufbauen
         self.init_sqlite_with_auto_build()
 
@@ -389,7 +463,7 @@ class EBibGUI:
         # Such-Button - GROSS und SICHTBAR
         self.search_button = tk.Button(button_frame,
                                       text="🔍 SUCHE STARTEN",
-                                      command=self.start_search,
+                                      command=self.toggle_search,
                                       bg=self.colors['highlight'],
                                       fg='white',
                                       font=('Arial', 14, 'bold'),
@@ -425,9 +499,17 @@ class EBibGUI:
                                     font=('Arial', 11))
         self.status_label.grid(row=3, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=(10, 0))
 
-        # Ergebnisse Textfeld mit Dark Mode
+        # Ergebnisse: virtuelle Treffertabelle und Protokoll als Tabs
+        self.results_notebook = ttk.Notebook(main_frame)
+        self.results_notebook.grid(row=4, column=0, columnspan=2, sticky=(tk.W, tk.E, tk.N, tk.S), pady=(10, 0))
+
+        self.result_table = VirtualResultTable(self.results_notebook, self.colors,
+                                               source_callback=self.on_result_sort)
+        self.results_notebook.add(self.result_table.frame, text="📋 Treffer")
+
+        # Protokoll-Textfeld mit Dark Mode
         self.results_text = scrolledtext.ScrolledText(
-            main_frame,
+            self.results_notebook,
             height=15,  # Zurück auf 15
             width=90,
             bg=self.colors['entry_bg'],
@@ -439,11 +521,27 @@ class EBibGUI:
             relief='solid',
             font=('Consolas', 10)
         )
-        self.results_text.grid(row=4, column=0, columnspan=2, sticky=(tk.W, tk.E, tk.N, tk.S), pady=(10, 0))
+        self.results_notebook.add(self.results_text, text="📝 Protokoll")
+
+        # Fortschritt des DB-Aufbaus - nur sichtbar, solange er läuft
+        self.build_frame = tk.Frame(main_frame, bg=self.colors['bg'])
+        self.build_frame.grid(row=5, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=(10, 0))
+        self.build_progressbar = ttk.Progressbar(self.build_frame, mode='determinate', length=250, maximum=1000)
+        self.build_progressbar.grid(row=0, column=0, padx=(0, 15))
+        self.build_label = tk.Label(self.build_frame, text="", bg=self.colors['bg'], fg=self.colors['fg'],
+                                    font=('Arial', 10), anchor='w')
+        self.build_label.grid(row=0, column=1, sticky=(tk.W, tk.E))
+        self.build_cancel_button = tk.Button(self.build_frame, text="⏹️ Aufbau abbrechen",
+                                             command=self.cancel_db_build,
+                                             bg=self.colors['button_bg'], fg=self.colors['fg'],
+                                             relief='raised', borderwidth=2, cursor='hand2')
+        self.build_cancel_button.grid(row=0, column=2, padx=(15, 0))
+        self.build_frame.columnconfigure(1, weight=1)
+        self.build_frame.grid_remove()
 
         # Grid-Konfiguration für Responsive Design
         main_frame.columnconfigure(0, weight=1)
-        main_frame.rowconfigure(4, weight=1)  # Textfeld kann sich ausdehnen
+        main_frame.rowconfigure(4, weight=1)  # Ergebnisbereich kann sich ausdehnen
         button_frame.columnconfigure(1, weight=1)
         self.root.columnconfigure(0, weight=1)
         self.root.rowconfigure(0, weight=1)
@@ -462,120 +560,205 @@ class EBibGUI:
     def init_sqlite_with_auto_build(self):
         """SQLite-DB prüfen und automatisch aufbauen falls nötig"""
 
-        db_exists, needs_rebuild, record_count = check_and_build_sqlite_db()
+        db_exists, status, record_count = check_and_build_sqlite_db()
 
-        if not needs_rebuild:
-            # DB ist bereit
+        if status != 'rebuild':
+            # DB ist bereit (ggf. auf dem Stand der vorigen TSV-Datei)
             self.db_ready = True
             self.status_label.config(text=f"✅ SQLite-DB bereit - {record_count:,} Records für ultra-schnelle Suche")
-            return
+            if status == 'ok' or not messagebox.askyesno(
+                    "TSV-Datei geändert",
+                    "Die TSV-Datei ist neuer als die SQLite-DB.\n\n"
+                    "Jetzt inkrementell aktualisieren? Bis dahin wird die bisherige DB durchsucht."):
+                return
 
         if self.building_db:
             return  # Bereits im Aufbau
 
         # DB muss aufgebaut werden
         self.building_db = True
-        self.db_ready = False
 
-        if db_exists:
+        if status == 'stale':
+            message = "🔄 SQLite-DB wird aktualisiert - Suche läuft mit der bisherigen DB weiter..."
+        elif db_exists:
+            self.db_ready = False
             message = "🔄 SQLite-DB wird repariert - Suche läuft im Hintergrund..."
         else:
+            self.db_ready = False
             message = "🔄 SQLite-DB wird erstellt - Dies kann einige Minuten dauern..."
 
         self.status_label.config(text=message)
         self.results_text.insert(tk.END, f"{message}\n")
-        self.results_text.insert(tk.END, f"💡 Sie können bereits suchen - TSV-Fallback ist aktiv\n\n")
+        if not self.db_ready:
+            self.results_text.insert(tk.END, f"💡 Sie können bereits suchen - TSV-Fallback ist aktiv\n\n")
 
         # Starte DB-Aufbau im Hintergrund
-        def build_complete(success):
-            """Callback nach DB-Aufbau"""
-            self.building_db = False
-
-            if success:
-                # Prüfe neue DB
-                _, _, record_count = check_and_build_sqlite_db()
-                self.db_ready = True
-                self.root.after(0, lambda: self.status_label.config(
-                    text=f"✅ SQLite-DB aufgebaut - {record_count:,} Records - Ultra-schnelle Suche verfügbar!"
-                ))
-                self.root.after(0, lambda: self.results_text.insert(
-                    tk.END, f"🚀 SQLite-DB fertig - {record_count:,} Records - Nächste Suche wird ultra-schnell!\n\n"
-                ))
-            else:
-                self.root.after(0, lambda: self.status_label.config(
-                    text="❌ SQLite-DB Aufbau fehlgeschlagen - TSV-Fallback aktiv"
-                ))
-                self.root.after(0, lambda: self.results_text.insert(
-                    tk.END, "❌ SQLite-DB Aufbau fehlgeschlagen - verwende TSV-Suche\n\n"
-                ))
+        def build_complete(success, message):
+            """Callback nach DB-Aufbau (Build-Thread)"""
+            self.ui_updates.post('build_finished', success, message)
+
+        def build_progress(progress):
+            """Fortschritt des Aufbaus (Build-Thread) - nur Werte kopieren, Anzeige im Tk-Thread"""
+            self.ui_updates.post('build_progress', progress.phase, progress.bytes_done, progress.bytes_total,
+                                 progress.rows, progress.rows_per_second, progress.eta)
 
         # Starte Aufbau
-        build_sqlite_db_async(build_complete)
+        self.build_cancel = CancelToken()
+        self.build_progressbar['value'] = 0
+        self.build_label.config(text="Vorbereitung...")
+        self.build_cancel_button.config(state='normal')
+        self.build_frame.grid()
+        build_sqlite_db_async(build_complete, build_progress, self.build_cancel)
+
+    def show_build_progress(self, phase, bytes_done, bytes_total, rows, rows_per_second, eta):
+        """Zeigt Phase, gelesene Bytes, Records/s und Restzeit des DB-Aufbaus"""
+        if phase is None:
+            return
+        if phase == 'parse':
+            share = bytes_done / bytes_total if bytes_total else 0
+            self.build_progressbar['value'] = int(share * 1000)
+            self.build_label.config(
+                text=f"🔄 DB-Aufbau: {PHASES['parse']}/{PHASES['insert']} - "
+                     f"{bytes_done / 1024 / 1024:,.0f} von {bytes_total / 1024 / 1024:,.0f} MB, "
+                     f"{rows:,} Records ({rows_per_second:,.0f}/s), Rest ~{format_duration(eta)}"
+            )
+        else:
+            self.build_progressbar['value'] = 1000
+            self.build_label.config(text=f"🔄 DB-Aufbau: {PHASES[phase]} ({rows:,} Records)...")
+
+    def cancel_db_build(self):
+        """Bricht den DB-Aufbau ab; ein Vollaufbau wird beim nächsten Start fortgesetzt"""
+        if self.build_cancel is not None:
+            self.build_cancel.cancel()
+            self.build_cancel_button.config(state='disabled')
+            self.build_label.config(text="⏹️ DB-Aufbau wird abgebrochen...")
+
+    def db_build_finished(self, success, message):
+        """Ergebnis des DB-Aufbaus anzeigen (Tk-Thread)"""
+        self.building_db = False
+        self.build_cancel = None
+        self.build_frame.grid_remove()
 
+        if success:
+            # Prüfe neue DB
+            _, _, record_count = check_and_build_sqlite_db()
+            self.query_stats = None
+            self.db_ready = True
+            self.status_label.config(
+                text=f"✅ SQLite-DB aufgebaut - {record_count:,} Records - Ultra-schnelle Suche verfügbar!"
+            )
+            self.results_text.insert(
+                tk.END, f"🚀 SQLite-DB fertig - {record_count:,} Records - Nächste Suche wird ultra-schnell!\n"
+                        f"⏱️  {message}\n\n"
+            )
+        else:
+            fallback = "bisherige DB aktiv" if self.db_ready else "TSV-Fallback aktiv"
+            if message == "abgebrochen":
+                self.status_label.config(text=f"⏸️ SQLite-DB Aufbau abgebrochen - {fallback}")
+                self.results_text.insert(
+                    tk.END, "⏸️ SQLite-DB Aufbau abgebrochen - wird beim nächsten Start fortgesetzt\n\n"
+                )
+            else:
+                self.status_label.config(text=f"❌ SQLite-DB Aufbau fehlgeschlagen - {fallback}")
+                self.results_text.insert(
+                    tk.END, f"❌ SQLite-DB Aufbau fehlgeschlagen ({message}) - {fallback}\n\n"
+                )
 
-    def search_sqlite(self, query, has_date_filter, has_type_filter):
-        """Ultra-schnelle SQLite-Suche"""
+    def search_sqlite(self, query, options):
+        """
+        Ultra-schnelle SQLite-Suche mit den Filtern aus options (SearchOptions);
+        mit options.remove_duplicates je md5 nur die bevorzugte Kopie.
+        Liefert einen ResultCursor: Zeilen werden seitenweise über files.id
+        geholt, die Gesamtzahl getrennt über ResultCursor.totals().
+        """
         if not self.db_ready:
-            return []
+            return None
 
-        conn = sqlite3.connect(self.sqlite_db)
-        cursor = conn.cursor()
+        conn = self.get_db_connection()
 
-        # SQL-Query dynamisch aufbauen
+        # Bedingungen als eb-AST sammeln, Reihenfolge bestimmt der Planer
         conditions = []
-        params = []
 
-        # Text-Suche (falls vorhanden)
-        if query.strip():
-            conditions.append("filename_lower LIKE ?")
-            params.append(f"%{query.lower()}%")
+        # Mehrere Wörter über den Token-Index (alle müssen vorkommen), sonst
+        # Teilstring-Suche in Pfad + Dateiname, ab 3 Zeichen über files_fts
+        if len(query.split()) > 1 and has_token_index(conn):
+            conditions.append(('rowids', tuple(lookup_words(conn, query))))
+        elif query.strip():
+            conditions.append(('text', query.strip().lower()))
 
-        # Datums-Filter
-        if has_date_filter and self.current_date_filter:
-            date_str = self.current_date_filter.strftime("%Y-%m-%d")
-            conditions.append("date_of_work LIKE ?")
-            params.append(f"{date_str}%")
+        conditions.extend(self.build_filter_conditions(options))
 
-        # Dateityp-Filter
-        if has_type_filter:
-            type_conditions = []
-            if self.type_vars['text'].get():
-                type_conditions.append("file_type = 'text'")
-            if self.type_vars['audio'].get():
-                type_conditions.append("file_type = 'audio'")
-            if self.type_vars['graphik'].get():
-                type_conditions.append("file_type = 'graphik'")
-            if self.type_vars['video'].get():
-                type_conditions.append("file_type = 'video'")
-            if self.type_vars['sonstige'].get():
-                type_conditions.append("file_type = 'sonstige'")
-
-            if type_conditions:
-                conditions.append(f"({' OR '.join(type_conditions)})")
-
-        # SQL zusammensetzen
-        base_query = """
-            SELECT date_of_work, link, path, filename, extension, size, date, hash
-            FROM files
-        """
+        if self.query_stats is None:
+            self.query_stats = load_statistics(conn)
+        fts = has_fts_index(conn)
 
+        plan = None
+        node = None
         if conditions:
-            sql = base_query + " WHERE " + " AND ".join(conditions)
-        else:
-            sql = base_query
+            node = conditions[0] if len(conditions) == 1 else ('and', tuple(conditions))
+            plan = plan_query(node, self.query_stats, fts=fts)
+            print(f"[DEBUG] {plan.describe()}")
 
-        # Limit für Performance
-        sql += " LIMIT 50000"
+        return ResultCursor(conn, node, plan, fts=fts, unique=options.remove_duplicates)
 
-        start_time = time.time()
-        cursor.execute(sql, params)
-        results = cursor.fetchall()
-        query_time = (time.time() - start_time) * 1000
+    def get_db_connection(self):
+        """
+        Liefert die Lese-Verbindung zur SQLite-DB. Hat der Preprocessor
+        inzwischen eine neue DB-Generation eingespielt (atomarer Austausch,
+        erkennbar an Inode/mtime), wird die Verbindung neu geöffnet und die
+        Planer-Statistik verworfen.
+        """
+        stat = os.stat(self.sqlite_db)
+        generation = (stat.st_ino, stat.st_mtime_ns)
+
+        if self.db_conn is not None and generation != self.db_generation:
+            print("[INFO] Neue SQLite-DB-Generation erkannt - Verbindung wird neu geöffnet")
+            self.db_conn.close()
+            self.db_conn = None
+            self.query_stats = None
+
+        if self.db_conn is None:
+            # Suchen laufen im Such-Thread, jeweils nur eine gleichzeitig
+            self.db_conn = sqlite3.connect(f"file:{self.sqlite_db}?mode=ro", uri=True, check_same_thread=False)
+            install_cancel_handler(self.db_conn)  # STOPPEN bricht laufende Abfragen ab
+            self.db_generation = generation
+        return self.db_conn
+
+    def build_filter_conditions(self, options):
+        """Datums-, Dateityp- und Sammlungs-Filter aus SearchOptions als eb-AST-Knoten (für SQLite und TSV)"""
+        conditions = []
 
-        conn.close()
+        # Datums-Filter
+        if options.date_filter:
+            # Tag, Monat, Jahr oder Bereich -> indizierte BETWEEN-Abfrage über work_day
+            conditions.append(('field', 'datum', options.date_filter.query_value()))
+
+        # Dateityp-Filter
+        type_conditions = [('type', t) for t in options.types]
+        if len(type_conditions) == 1:
+            conditions.append(type_conditions[0])
+        elif type_conditions:
+            conditions.append(('or', tuple(type_conditions)))
+
+        # Sammlungs-Filter (indizierte Spalte collection_id statt Pfad-Teilstring)
+        if options.collection:
+            conditions.append(('field', 'sammlung', options.collection.lower()))
+
+        return conditions
+
+    def search_options(self):
+        """Momentaufnahme der Filter-Einstellungen (nur im Tk-Thread aufrufen)"""
+        return SearchOptions(
+            types=[t for t in FILE_TYPES if self.type_vars[t].get()],
+            date_filter=self.current_date_filter,
+            collection=self.selected_collection(),
+            remove_duplicates=self.remove_duplicates_var.get(),
+        )
 
-        print(f"[DEBUG] SQLite-Query: {len(results)} Ergebnisse in {query_time:.1f}ms")
-        return results
+    def selected_collection(self):
+        """In der GUI gewählte Sammlung oder None"""
+        value = self.collection_var.get()
+        return value if value and value != ALL_COLLECTIONS else None
 
     def switch_to_tab(self, tab_index):
         """Wechselt zwischen den Tabs (0=Einfach, 1=Erweitert)"""
@@ -651,6 +834,14 @@ class EBibGUI:
         ttk.Checkbutton(type_frame, text="📋 Sonstige",
                        variable=self.type_vars['sonstige']).grid(row=2, column=1, sticky=tk.W, padx=5, pady=5)
 
+        # Sammlungs-Filter (Sammlungen.csv.txt)
+        tk.Label(type_frame, text="📚 Sammlung:",
+                 bg=self.colors['bg'], fg=self.colors['fg']).grid(row=3, column=0, sticky=tk.W, padx=5, pady=5)
+        self.collection_var = tk.StringVar(value=ALL_COLLECTIONS)
+        ttk.Combobox(type_frame, textvariable=self.collection_var, state='readonly', width=20,
+                     values=[ALL_COLLECTIONS] + load_collections().names()).grid(
+            row=3, column=1, sticky=tk.W, padx=5, pady=5)
+
         # Beispiele
         examples_frame = tk.Frame(self.simple_frame, bg=self.colors['bg'], relief='solid', bd=1)
         examples_frame.grid(row=4, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=10, padx=5)
@@ -854,14 +1045,13 @@ class EBibGUI:
         Callback für Änderungen im Datums-Filter
 
         Args:
-            parsed_date: datetime-Objekt oder None
+            parsed_date: date_filter.DateRange oder None
             original_input: Original-Eingabe des Benutzers
         """
         self.current_date_filter = parsed_date
 
         if parsed_date:
-            iso_date = parsed_date.strftime("%Y-%m-%d")
-            self.status_label.config(text=f"Datums-Filter aktiv: {iso_date}")
+            self.status_label.config(text=f"Datums-Filter aktiv: {parsed_date.query_value()}")
         else:
             if hasattr(self, 'current_date_filter') and self.current_date_filter is not None:
                 self.status_label.config(text="Datums-Filter entfernt")
@@ -965,219 +1155,207 @@ class EBibGUI:
         return " ".join(terms)
 
     def remove_duplicates_by_md5(self, rows):
-        """Entfernt Duplikate basierend auf MD5-Hash"""
-        seen_md5 = set()
-        unique_rows = []
-        duplicates_count = 0
-
-        for row in rows:
-            md5_hash = row[7] if len(row) > 7 else ""  # MD5 ist in Spalte 7
-
-            if md5_hash and md5_hash != "":
-                if md5_hash in seen_md5:
-                    duplicates_count += 1
-                    continue
-                seen_md5.add(md5_hash)
-
-            unique_rows.append(row)
-
-        return unique_rows, duplicates_count
+        """
+        Entfernt Duplikate basierend auf MD5-Hash (TSV-Modus); behalten wird
+        die Kopie aus der Sammlung mit der höchsten Priorität
+        """
+        return remove_duplicates(rows)
 
-    def start_search(self):
-        """Startet die Suche in einem separaten Thread - ERWEITERT"""
+    def toggle_search(self):
+        """Such-Button: startet eine Suche bzw. stoppt die laufende"""
         if self.search_running:
             self.stop_search()
-            return
+        else:
+            self.start_search()
 
+    def start_search(self):
+        """
+        Startet die Suche in einem separaten Thread; eine laufende Suche
+        (Enter/F5 während der Suche) wird abgebrochen und ersetzt
+        """
         query = self.build_query_from_gui()
+        options = self.search_options()
 
         # Prüfe ob mindestens ein Filter aktiv ist
-        has_text_query = bool(query.strip())
-        has_date_filter = self.current_date_filter is not None
-        has_type_filter = any([
-            self.type_vars['text'].get(),
-            self.type_vars['audio'].get(),
-            self.type_vars['graphik'].get(),
-            self.type_vars['video'].get(),
-            self.type_vars['sonstige'].get()
-        ])
-
-        if not has_text_query and not has_date_filter and not has_type_filter:
+        if not query.strip() and not options.has_date_filter and not options.has_type_filter and not options.collection:
             messagebox.showwarning("Keine Eingabe", "Bitte geben Sie einen Suchbegriff ein oder setzen Sie einen Filter.")
             return
 
         # Debug-Info anzeigen
         print(f"[DEBUG] Starte Suche mit Query: '{query}'")
-        if has_date_filter:
-            print(f"[DEBUG] Datums-Filter aktiv: {self.current_date_filter.strftime('%Y-%m-%d')}")
-        if has_type_filter:
-            active_types = [k for k, v in self.type_vars.items() if k != 'all' and v.get()]
-            print(f"[DEBUG] Dateityp-Filter aktiv: {active_types}")
+        if options.has_date_filter:
+            print(f"[DEBUG] Datums-Filter aktiv: {options.date_filter.query_value()}")
+        if options.has_type_filter:
+            print(f"[DEBUG] Dateityp-Filter aktiv: {list(options.types)}")
+
+        # Laufende Suche abbrechen; der neue Such-Thread wartet auf ihr Ende
+        previous = self.search_thread if self.search_running else None
+        if self.search_cancel is not None:
+            self.search_cancel.cancel()
+        self.search_cancel = CancelToken()
 
         self.search_running = True
         self.search_button.config(text="⏹️ STOPPEN", bg='#d73527')  # Rot für Stop
         self.progress.start()
         self.open_button.config(state='disabled')
         self.results_text.delete(1.0, tk.END)
+        self.results_notebook.select(self.results_text)
+        self.result_table.clear()
+        self.output_file = None
 
         # Sofort Feedback geben
-        filter_info = []
-        if has_text_query:
-            filter_info.append(f"Text: '{query}'")
-        if has_date_filter:
-            filter_info.append(f"Datum: {self.current_date_filter.strftime('%Y-%m-%d')}")
-        if has_type_filter:
-            active_types = [k.capitalize() for k, v in self.type_vars.items() if v.get()]
-            filter_info.append(f"Typ: {'+'.join(active_types)}")
-
-        filter_text = " + ".join(filter_info)
+        filter_text = " + ".join(options.describe(query))
         self.status_label.config(text=f"Starte Suche mit: {filter_text}")
         self.results_text.insert(tk.END, f"🔍 Suche mit: {filter_text}\n")
         self.results_text.insert(tk.END, f"🚀 SQLite-DB bereit\n\n")
 
-        # Suche in separatem Thread starten
-        self.search_thread = threading.Thread(target=self.perform_search, args=(query,))
+        # Suche in separatem Thread starten - er bekommt die kopierten Filter, keine Tk-Variablen
+        self.search_thread = threading.Thread(target=self.perform_search,
+                                              args=(query, options, self.search_cancel, previous))
         self.search_thread.daemon = True
         self.search_thread.start()
 
     def stop_search(self):
-        """Stoppt die laufende Suche"""
+        """Stoppt die laufende Suche; eine laufende SQLite-Abfrage bricht in Millisekunden ab"""
+        if self.search_cancel is not None:
+            self.search_cancel.cancel()
         self.search_running = False
         self.search_button.config(text="🔍 SUCHE STARTEN", bg=self.colors['highlight'])
         self.progress.stop()
         self.status_label.config(text="Suche gestoppt")
 
-    def perform_search(self, query):
-        """Führt die eigentliche Suche durch - KORRIGIERT für SQLite"""
-        try:
-            # Filter-Informationen sammeln
-            has_text_query = bool(query.strip())
-            has_date_filter = self.current_date_filter is not None
-            has_type_filter = any([
-                self.type_vars['text'].get(),
-                self.type_vars['audio'].get(),
-                self.type_vars['graphik'].get(),
-                self.type_vars['video'].get(),
-                self.type_vars['sonstige'].get()
-            ])
-
-            # Filter-Text für Anzeige erstellen
-            filter_info = []
-            if has_text_query:
-                filter_info.append(f"Text: '{query}'")
-            if has_date_filter:
-                filter_info.append(f"Datum: {self.current_date_filter.strftime('%Y-%m-%d')}")
-            if has_type_filter:
-                active_types = [k.capitalize() for k, v in self.type_vars.items() if v.get()]
-                filter_info.append(f"Typ: {'+'.join(active_types)}")
-
-            filter_text = " + ".join(filter_info)
-
-            self.root.after(0, lambda: self.status_label.config(text=f"Suche mit: {filter_text}"))
-            self.root.after(0, lambda: self.results_text.insert(tk.END, f"🔍 Kombinierte Suche: {filter_text}\n"))
-
-            # SQLite-Suche verwenden wenn verfügbar
-            if self.db_ready:
-                self.root.after(0, lambda: self.results_text.insert(tk.END, f"⚡ Ultra-schnelle SQLite-Suche\n\n"))
-
-                # SQLite-Suche durchführen
-                start_time = time.time()
-                sqlite_results = self.search_sqlite(query, has_date_filter, has_type_filter)
-                search_time = (time.time() - start_time) * 1000
-
-                self.root.after(0, lambda: self.status_label.config(text=f"SQLite-Suche: {len(sqlite_results)} Ergebnisse in {search_time:.1f}ms"))
-
-                # SQLite-Ergebnisse in das erwartete Format konvertieren
-                found_rows = []
-                for row in sqlite_results:
-                    # SQLite: date_of_work, link, path, filename, extension, size, date, hash
-                    # TSV:    datum, hyperlink, pfad, name, ext, größe, datum, md5
-                    converted_row = [
-                        row[0],  # date_of_work -> datum
-                        row[1],  # link -> hyperlink
-                        row[2],  # path -> pfad
-                        row[3],  # filename -> name
-                        row[4],  # extension -> ext
-                        str(row[5]) if row[5] else "",  # size -> größe
-                        row[6],  # date -> datum
-                        row[7]   # hash -> md5
-                    ]
-                    found_rows.append(converted_row)
-
-                # Zeige erste Treffer sofort an
-                for i, row in enumerate(found_rows[:5]):
-                    if not self.search_running:
-                        break
-                    date_str = row[0][:10] if len(row[0]) >= 10 else row[0]
-                    self.root.after(0, lambda r=row, d=date_str:
-                                self.results_text.insert(tk.END, f"✓ {d} - {r[3]}\n"))
-
-            else:
-                # Fallback: TSV-Datei durchsuchen
-                self.root.after(0, lambda: self.results_text.insert(tk.END, f"📊 Durchsuche TSV-Datei: {INPUT_FILE}\n\n"))
-
-                # Prüfe ob Input-Datei existiert
-                if not os.path.exists(INPUT_FILE):
-                    self.root.after(0, lambda: self.search_error(f"Input-Datei nicht gefunden: {INPUT_FILE}"))
-                    return
-
-                # TSV-Suche durchführen
-                found_rows = []
-                row_count = 0
-
-                with open(INPUT_FILE, 'r', encoding='utf-8') as f:
-                    for line_num, line in enumerate(f, 1):
-                        if not self.search_running:
-                            break
-
-                        row_count += 1
-                        if row_count % 10000 == 0:
-                            self.root.after(0, lambda c=row_count: self.status_label.config(text=f"Verarbeitet: {c:,} Zeilen"))
-                            if row_count % 50000 == 0:
-                                self.root.after(0, lambda c=row_count: self.results_text.insert(tk.END, f"⏳ {c:,} Zeilen verarbeitet...\n"))
-
-                        # Robustes TSV-Parsing
-                        try:
-                            row = self.parse_tsv_line_robust(line)
-
-                            if len(row) >= 4 and self.matches_all_filters(row, query, has_date_filter, has_type_filter):
-                                found_rows.append(row)
-                                # Zeige erste paar Treffer sofort an
-                                if len(found_rows) <= 5:
-                                    date_str = row[0][:10] if len(row[0]) >= 10 else row[0]
-                                    self.root.after(0, lambda r=row, d=date_str:
-                                                self.results_text.insert(tk.END, f"✓ {d} - {r[3]}\n"))
-                        except Exception as e:
-                            # Zeile überspringen bei Parse-Fehlern
-                            continue
-
-            if not self.search_running:
-                return
+    def perform_search(self, query, options, cancel, previous=None):
+        """
+        Führt die eigentliche Suche durch (Such-Thread). Alle Anzeigen gehen
+        als Ereignisse über self.ui_updates an den Tk-Thread. SQLite-Abfragen
+        brechen über eb_sql.cancellable ab, sobald cancel gesetzt wird.
 
-            self.root.after(0, lambda: self.status_label.config(text="Verarbeite Ergebnisse..."))
+        Args:
+            cancel: CancelToken dieser Suche (STOPPEN oder neue Suche)
+            previous: Thread einer ersetzten Suche; er endet nach dem Abbruch
+                      in Millisekunden, erst dann wird die DB-Verbindung genutzt
+        """
+        def post(kind, *args):
+            # Eine abgebrochene Suche meldet nichts mehr
+            if not cancel.cancelled:
+                self.ui_updates.post(kind, *args)
 
-            # Duplikate entfernen falls gewünscht
-            original_count = len(found_rows)
-            duplicates_removed = 0
+        if previous is not None:
+            previous.join()
+        try:
+            with cancellable(cancel):
+                has_text_query = bool(query.strip())
+                filter_text = " + ".join(options.describe(query))
+
+                post('status', f"Suche mit: {filter_text}")
+                post('log', f"🔍 Kombinierte Suche: {filter_text}\n")
+
+                # SQLite-Suche verwenden wenn verfügbar
+                if self.db_ready:
+                    post('log', f"⚡ Ultra-schnelle SQLite-Suche\n\n")
+
+                    # SQLite-Suche durchführen
+                    start_time = time.time()
+                    # Duplikate entfernt die Query selbst (files.copy_rank)
+                    found_rows = self.search_sqlite(query, options)
+                    first_page = found_rows.first_page()
+                    search_time = (time.time() - start_time) * 1000
+
+                    estimate = found_rows.estimate()
+                    estimate_text = f", geschätzt ~{estimate:,} Treffer" if estimate is not None else ""
+                    post('status', f"SQLite-Suche: erste {len(first_page)} Ergebnisse in {search_time:.1f}ms{estimate_text}")
+
+                    # Zeige erste Treffer sofort an (Zeilen bereits im TSV-Format)
+                    for row in first_page[:5]:
+                        date_str = row[0][:10] if len(row[0]) >= 10 else row[0]
+                        post('log', f"✓ {date_str} - {row[3]}\n")
+
+                    # Exakte Anzahl (mit/ohne Duplikate), Summe und Durchschnitt der Größe aller Treffer
+                    result_totals = found_rows.totals()
+
+                else:
+                    # Fallback: TSV-Datei durchsuchen
+                    post('log', f"📊 Durchsuche TSV-Datei: {INPUT_FILE}\n\n")
+
+                    # Prüfe ob Input-Datei existiert
+                    if not os.path.exists(INPUT_FILE):
+                        post('error', f"Input-Datei nicht gefunden: {INPUT_FILE}")
+                        return
 
-            if self.remove_duplicates_var.get():
-                found_rows, duplicates_removed = self.remove_duplicates_by_md5(found_rows)
+                    # TSV-Suche durchführen - parallel über alle CPU-Kerne
+                    conditions = self.build_filter_conditions(options)
+                    if has_text_query:
+                        # Mehrere Wörter: jedes muss in Pfad + Dateiname vorkommen
+                        conditions[0:0] = [('text', word) for word in query.lower().split()]
+                    node = conditions[0] if len(conditions) == 1 else ('and', tuple(conditions))
+                    plan = plan_query(node, load_statistics(), use_index=False)
+                    print(f"[DEBUG] {plan.describe()}")
+
+                    def report_progress(bytes_done, bytes_total, rows_done, matches_done):
+                        # Häufige Meldungen kosten nichts: pro Takt zählt nur die letzte
+                        post('status', f"Verarbeitet: {rows_done:,} Zeilen ({bytes_done / bytes_total:.0%}) "
+                                       f"- {matches_done:,} Treffer")
+
+                    found_rows = []
+                    total_size = sized_rows = 0
+                    for rows in scan_tsv(INPUT_FILE, compile_node, (plan.node,),
+                                         literals=required_literals(plan.node), progress=report_progress,
+                                         should_stop=lambda: cancel.cancelled):
+                        # Zeige erste paar Treffer sofort an
+                        for row in rows[:max(0, 5 - len(found_rows))]:
+                            date_str = row[0][:10] if len(row[0]) >= 10 else row[0]
+                            post('log', f"✓ {date_str} - {row[3]}\n")
+                        found_rows.extend(rows)
+                        sizes = [int(row[5]) for row in rows if row[5].isdigit()]
+                        total_size += sum(sizes)
+                        sized_rows += len(sizes)
+                    original_count = len(found_rows)
+                    if options.remove_duplicates:
+                        found_rows, _ = self.remove_duplicates_by_md5(found_rows)
+                    result_totals = (original_count, len(found_rows), total_size if sized_rows else None,
+                                     total_size / sized_rows if sized_rows else None)
+
+                if cancel.cancelled:
+                    return
 
-            self.found_rows = found_rows
-
-            if found_rows:
-                self.root.after(0, lambda q=query, oc=original_count, dr=duplicates_removed:
-                            self.create_ods_file(q, oc, dr))
-            else:
-                self.root.after(0, lambda: self.search_completed(0, 0, 0))
+                post('status', "Verarbeite Ergebnisse...")
+                # Ergebnis-Attribute setzt der Tk-Thread (show_results), nicht der Such-Thread
+                post('results', cancel, query, options, found_rows, result_totals)
 
+        except QueryCancelled:
+            print(f"[DEBUG] Suche abgebrochen: '{query}'")
         except Exception as e:
             error_msg = f"Fehler bei der Suche: {str(e)}"
             print(f"[ERROR] {error_msg}")
             import traceback
             traceback.print_exc()
-            self.root.after(0, lambda msg=error_msg: self.search_error(msg))
-
+            post('error', error_msg)
+
+    def append_log(self, batch):
+        """Hängt die Protokollzeilen eines Takts mit einem einzigen insert an (Tk-Thread)"""
+        self.results_text.insert(tk.END, "".join(text for text, in batch))
+
+    def show_results(self, cancel, query, options, found_rows, result_totals):
+        """Übernimmt das Ergebnis des Such-Threads (Tk-Thread)"""
+        if cancel is not self.search_cancel or cancel.cancelled:
+            return  # inzwischen gestoppt oder durch eine neue Suche ersetzt
+
+        # Entfernte Duplikate (SQLite: in der Query, TSV: nach dem Scan)
+        original_count, unique_count = result_totals[:2]
+        duplicates_removed = original_count - unique_count if options.remove_duplicates else 0
+
+        self.found_rows = found_rows
+        self.result_totals = result_totals
+        self.result_count = unique_count if options.remove_duplicates else original_count
+        self.last_query = query
+        self.last_options = options
+
+        # Keine ODS-Datei mehr nach jeder Suche: die Tabelle zeigt alle Treffer,
+        # exportiert wird erst mit '📊 CALC ÖFFNEN'
+        if self.result_count:
+            self.search_completed(self.result_count, original_count, duplicates_removed)
+        else:
+            self.search_completed(0, 0, 0)
 
     def matches_all_filters(self, row, query, has_date_filter, has_type_filter):
         """Prüft ob eine Zeile alle Filter erfüllt (für TSV-Fallback)"""
@@ -1189,8 +1367,7 @@ class EBibGUI:
 
         # Datums-Filter
         if has_date_filter and self.current_date_filter:
-            target_date = self.current_date_filter.strftime("%Y-%m-%d")
-            if not row[0].startswith(target_date):
+            if not self.current_date_filter.contains(parse_day(row[0])):
                 return False
 
         # Dateityp-Filter
@@ -1219,8 +1396,8 @@ class EBibGUI:
 
         return True
 
-    def create_meaningful_filename(self, query, has_date_filter, has_type_filter):
-        """Erstellt sprechenden Dateinamen basierend auf Suchparametern"""
+    def create_meaningful_filename(self, query, options):
+        """Erstellt sprechenden Dateinamen basierend auf Suchparametern (SearchOptions)"""
         parts = ["ebib"]
 
         # Suchbegriff hinzufügen (bereinigt)
@@ -1230,27 +1407,18 @@ class EBibGUI:
             parts.append(clean_query)
 
         # Datums-Filter hinzufügen
-        if has_date_filter:
-            date_str = self.current_date_filter.strftime("%Y%m%d")
-            parts.append(f"date_{date_str}")
+        if options.has_date_filter:
+            parts.append(f"date_{options.date_filter.compact()}")
 
         # Dateityp-Filter hinzufügen
-        if has_type_filter:
-            active_types = []
-            if self.type_vars['text'].get():
-                active_types.append("text")
-            if self.type_vars['audio'].get():
-                active_types.append("audio")
-            if self.type_vars['graphik'].get():
-                active_types.append("graphik")
-            if self.type_vars['video'].get():
-                active_types.append("video")
-            if self.type_vars['sonstige'].get():
-                active_types.append("sonstige")
+        if options.has_type_filter:
+            types_str = "+".join(options.types)
+            parts.append(f"type_{types_str}")
 
-            if active_types:
-                types_str = "+".join(active_types)
-                parts.append(f"type_{types_str}")
+        # Sammlungs-Filter hinzufügen
+        if options.collection:
+            clean_collection = re.sub(r'[^\w\-]', '_', options.collection)
+            parts.append(f"sammlung_{clean_collection}")
 
         # Fallback: Timestamp wenn nichts spezifisches
         if len(parts) == 1:  # Nur "ebib"
@@ -1265,25 +1433,27 @@ class EBibGUI:
 
         return filename
 
-    def create_ods_file(self, query, original_count, duplicates_removed):
-        """Erstellt die ODS-Datei mit Hyperlinks"""
+    def on_result_sort(self, source):
+        """Neue Sortierung in der Treffertabelle: der ODS-Export folgt ihr"""
+        self.found_rows = source
+        self.output_file = None
+
+    def create_ods_file(self, query):
+        """
+        Erstellt die ODS-Datei mit Hyperlinks aus allen Treffern (in der
+        Sortierung der Tabelle)
+
+        Returns:
+            True bei Erfolg
+        """
         try:
             self.status_label.config(text="Erstelle ODS-Datei...")
 
             # Temporäre TSV-Datei erstellen
             temp_file = Path('/tmp/ebib-gui-search.tsv')
 
-            # Sprechenden Dateinamen erstellen
-            has_date_filter = self.current_date_filter is not None
-            has_type_filter = any([
-                self.type_vars['text'].get(),
-                self.type_vars['audio'].get(),
-                self.type_vars['graphik'].get(),
-                self.type_vars['video'].get(),
-                self.type_vars['sonstige'].get()
-            ])
-
-            filename = self.create_meaningful_filename(query, has_date_filter, has_type_filter)
+            # Sprechenden Dateinamen aus den Filtern der Suche erstellen (nicht der aktuellen Auswahl)
+            filename = self.create_meaningful_filename(query, self.last_options)
             self.output_file = Path(OUTPUT_DIR) / filename
 
             with open(temp_file, 'w', encoding='utf-8') as f:
@@ -1299,13 +1469,14 @@ class EBibGUI:
                 # Fallback: Einfache ODS-Erstellung
                 self.create_simple_ods(self.output_file)
 
-            result_count = len(self.found_rows)
-            self.root.after(0, lambda rc=result_count, oc=original_count, dr=duplicates_removed:
-                          self.search_completed(rc, oc, dr))
+            self.results_text.insert(tk.END, f"\n💾 Ergebnisse gespeichert in: {self.output_file}\n")
+            return True
 
         except Exception as e:
             error_msg = f"Fehler beim Erstellen der ODS-Datei: {str(e)}"
-            self.root.after(0, lambda msg=error_msg: self.search_error(msg))
+            print(f"[ERROR] {error_msg}")
+            messagebox.showerror("Fehler", error_msg)
+            return False
 
     def create_enhanced_ods(self, temp_file, output_file, query):
         """Erstellt ODS mit fixierter Kopfzeile, korrekten Spaltenbreiten und Hyperlinks"""
@@ -1435,7 +1606,7 @@ class EBibGUI:
 
             # Dokument speichern
             doc.save(str(output_file))
-            print(f"[INFO] ODS erstellt mit {len(self.found_rows)} Zeilen: {output_file}")
+            print(f"[INFO] ODS erstellt mit {self.result_count} Zeilen: {output_file}")
 
         except ImportError as e:
             print(f"[WARNING] ODF-Library nicht verfügbar: {e}")
@@ -1472,32 +1643,8 @@ class EBibGUI:
         self.progress.stop()
 
         if result_count > 0:
-            # **ERWEITERTE STATUS-MELDUNG mit ALLEN Filter-Infos**
-            filter_info = []
-            current_query = self.build_query_from_gui()
-            if current_query.strip():
-                filter_info.append(f"Text: '{current_query.strip()}'")
-            if self.current_date_filter:
-                date_str = self.current_date_filter.strftime("%Y-%m-%d")
-                filter_info.append(f"Datum: {date_str}")
-
-            # Dateityp-Filter Info
-            if any([self.type_vars['text'].get(), self.type_vars['audio'].get(),
-                   self.type_vars['graphik'].get(), self.type_vars['video'].get(),
-                   self.type_vars['sonstige'].get()]):
-                active_types = []
-                if self.type_vars['text'].get():
-                    active_types.append("Text")
-                if self.type_vars['audio'].get():
-                    active_types.append("Audio")
-                if self.type_vars['graphik'].get():
-                    active_types.append("Graphik")
-                if self.type_vars['video'].get():
-                    active_types.append("Video")
-                if self.type_vars['sonstige'].get():
-                    active_types.append("Sonstige")
-                if active_types:
-                    filter_info.append(f"Typ: {'+'.join(active_types)}")
+            # **ERWEITERTE STATUS-MELDUNG mit ALLEN Filter-Infos** (Filter dieser Suche)
+            filter_info = self.last_options.describe(self.last_query)
 
             filter_text = " | ".join(filter_info) if filter_info else "keine Filter"
             self.status_label.config(text=f"✅ Suche abgeschlossen: {result_count:,} Ergebnisse ({filter_text})")
@@ -1508,6 +1655,10 @@ class EBibGUI:
             if duplicates_removed > 0:
                 stats_text += f"   • Duplikate entfernt: {duplicates_removed:,}\n"
             stats_text += f"   • Eindeutige Dateien: {result_count:,}\n"
+            if self.result_totals:
+                total_count, _, total_size, avg_size = self.result_totals
+                stats_text += (f"   • Gesamtgröße: {format_size(total_size)} "
+                               f"(Ø {format_size(avg_size)} über {total_count:,} Treffer)\n")
 
             # ALLE Filter-Infos hinzufügen
             if filter_info:
@@ -1517,18 +1668,12 @@ class EBibGUI:
 
             self.results_text.insert(tk.END, stats_text)
 
-            # Erste Ergebnisse anzeigen
-            self.results_text.insert(tk.END, "📁 ERSTE ERGEBNISSE:\n")
-            for i, row in enumerate(self.found_rows[:10]):
-                if len(row) >= 5:
-                    result_line = f"   {i+1:2d}. {row[3]} ({row[4]}) - {row[0]}\n"
-                    self.results_text.insert(tk.END, result_line)
-
-            if result_count > 10:
-                self.results_text.insert(tk.END, f"   ... und {result_count - 10:,} weitere Ergebnisse\n")
-
-            self.results_text.insert(tk.END, f"\n💾 Ergebnisse gespeichert in: {self.output_file}\n")
-            self.results_text.insert(tk.END, f"👆 Klicken Sie auf '📊 CALC ÖFFNEN' zum Anzeigen\n")
+            # Alle Treffer in der virtuellen Tabelle; Zeilen werden beim Scrollen nachgeladen
+            self.result_table.set_source(self.found_rows, result_count)
+            self.results_notebook.select(self.result_table.frame)
+            self.results_text.insert(tk.END, "📋 Alle Treffer im Tab 'Treffer' (Spaltenkopf klicken = sortieren, "
+                                             "Doppelklick = Datei öffnen)\n")
+            self.results_text.insert(tk.END, f"👆 '📊 CALC ÖFFNEN' erstellt die ODS-Datei und öffnet sie\n")
 
             # Button aktivieren - KRITISCH für CALC-ÖFFNEN!
             self.open_button.config(state='normal', bg=self.colors['highlight'])
@@ -1547,8 +1692,11 @@ class EBibGUI:
         self.results_text.insert(tk.END, f"\n❌ Fehler: {error_msg}\n")
 
     def open_results(self):
-        """Öffnet die Ergebnisdatei mit LibreOffice Calc"""
-        if not hasattr(self, 'output_file') or not self.output_file.exists():
+        """Erstellt bei Bedarf die ODS-Datei und öffnet sie mit LibreOffice Calc"""
+        if self.output_file is None or not self.output_file.exists():
+            if not self.create_ods_file(self.last_query):
+                return
+        if self.output_file is None or not self.output_file.exists():
             messagebox.showerror("Fehler", "Keine Ergebnisdatei verfügbar")
             return
 
@@ -1611,6 +1759,8 @@ class EBibGUI:
 
 def main():
     """Hauptfunktion - startet die GUI"""
+    multiprocessing.freeze_support()  # Worker-Prozesse im PyInstaller-Binary
+
     try:
         print("=== eBib GUI mit automatischem SQLite-Aufbau ===")
         print(f"SQLite-DB Pfad: {SQLITE_DB}")
@@ -9,71 +9,49 @@ from odf.table import Table, TableRow, TableCell, TableColumn
 from odf.text import P, A
 from odf.style import Style, TextProperties, TableColumnProperties
 import time
-import shlex
-from boolean import BooleanAlgebra
+import itertools
+import multiprocessing
 import re
+from eb_query import (FIELD_MAP, FIELD_ALIASES, TAG_DEFS, QuerySyntaxError, parse_query, compile_query,
+                      compile_node, required_literals, literal_search_term, format_size)
+from eb_collections import remove_duplicates
+from eb_duplicates import REPORT_COLUMNS, iter_duplicate_groups_db, iter_duplicate_groups_tsv
+from eb_sql import SQLITE_DB, FTS_MIN_LENGTH, has_fts_index, open_results, open_search_db
+from eb_planner import load_statistics, plan_query
+from tsv_scan import scan_tsv, search_literal
 
 # Konfiguration
 INPUT_FILE = '/media/synology/files/projekte/kd0089 my eBib & DMS/Compare-n-Share/s_250518-list-of-all-files-in-eBib-HDD-v032.tsv'
 OUTPUT_DIR = Path.home() / 'Downloads'
-
-algebra = BooleanAlgebra()
-
-FIELD_MAP = {
-    "datum": 0,
-    "name": 3,
-    "ext": 4,
-}
-
-FIELD_ALIASES = {
-    "dateiname": "name",
-    "docdatum": "datum",
-}
-
-TAG_DEFS = {
-    "#text": {"pdf", "doc", "docx", "txt", "djvu", "odt"},
-    "#audio": {"mp3", "wav", "flac", "ogg", "m4a"},
-    "#image": {"jpg", "jpeg", "png", "gif", "bmp", "svg", "tiff"},
-}
+UNIQUE_FLAGS = ('--eindeutig', '--unique')  # je md5 nur die bevorzugte Kopie
+DUPLICATE_FLAGS = ('--duplikate', '--duplicates')  # Duplikat-Bericht über die ganze Bibliothek
 
 def validate_and_sanitize_query(query):
     """
-    Validiert und bereinigt die Suchanfrage für bessere Kompatibilität
+    Validiert und bereinigt die Suchanfrage für bessere Kompatibilität.
+    Anführungszeichen und Bindestriche werden vom Parser unterstützt;
+    nur ein nicht geschlossenes Anführungszeichen wird entfernt.
     """
     print(f"[DEBUG] Original Query: '{query}'")
 
-    # Problematische Zeichen identifizieren
-    problematic_chars = ['-', '"', "'", ':', '(', ')', '#']
-    found_issues = []
-
-    # Check für problematische Patterns
-    if '"' in query or "'" in query:
-        found_issues.append("Anführungszeichen werden nicht unterstützt. Verwenden Sie stattdessen Leerzeichen oder Unterstriche.")
-
-    if '-' in query and not any(op in query.upper() for op in ['AND', 'OR', 'NOT']):
-        found_issues.append("Bindestriche (-) sind in einfachen Suchen problematisch. Verwenden Sie Leerzeichen oder boolesche Operatoren.")
-
-    # Sanitize: Entferne Anführungszeichen
-    sanitized = query.replace('"', '').replace("'", "")
-
-    # Warnung bei komplexen Queries mit Sonderzeichen
-    if found_issues:
-        print("\n⚠️  EINGABE-WARNUNG:")
-        for issue in found_issues:
-            print(f"   - {issue}")
-        print(f"\n📝 Bereinigte Query: '{sanitized}'")
-        print("\n💡 Tipps für bessere Suchen:")
-        print("   ✓ Einfach: eb ark")
-        print("   ✓ Feld-Suche: eb 'name:archive'")
-        print("   ✓ Boolean: eb '(name:ark OR name:arc) AND ext:pdf'")
-        print("   ✓ Tags: eb '#text AND name:manual'")
-        print("   ✗ Problematisch: eb 'name:\"ark-bruch\"'")
-        print()
-
-        response = input("Möchten Sie mit der bereinigten Query fortfahren? (j/N): ")
-        if response.lower() not in ['j', 'ja', 'y', 'yes']:
-            print("Suche abgebrochen.")
-            sys.exit(0)
+    if query.count('"') % 2 == 0:
+        return query
+
+    sanitized = query.replace('"', '')
+    print("\n⚠️  EINGABE-WARNUNG:")
+    print("   - Nicht geschlossenes Anführungszeichen (\")")
+    print(f"\n📝 Bereinigte Query: '{sanitized}'")
+    print("\n💡 Tipps für bessere Suchen:")
+    print("   ✓ Einfach: eb ark")
+    print("   ✓ Phrase: eb '\"ark bruch\"'")
+    print("   ✓ Feld-Suche: eb 'name:\"ark-bruch\"'")
+    print("   ✓ Boolean: eb '(name:ark OR name:arc) AND ext:pdf'")
+    print()
+
+    response = input("Möchten Sie mit der bereinigten Query fortfahren? (j/N): ")
+    if response.lower() not in ['j', 'ja', 'y', 'yes']:
+        print("Suche abgebrochen.")
+        sys.exit(0)
 
     return sanitized
 
@@ -82,94 +60,35 @@ def test_query_parsing(query):
     Testet ob eine Query erfolgreich geparst werden kann
     """
     try:
-        # Test mit #tag preprocessing
-        processed_query = query
-        for tag in TAG_DEFS.keys():
-            if tag in processed_query:
-                processed_query = processed_query.replace(tag, "TRUE")
-
-        expr = algebra.parse(processed_query)
+        expr = parse_query(query)
         print(f"✓ Query erfolgreich geparst: {expr}")
         return True, None
-    except Exception as e:
+    except QuerySyntaxError as e:
         return False, str(e)
 
 def line_matches_query(line, query_expr):
-    # Vorverarbeitung für #tags - ersetze sie vor dem Parsing
-    processed_query = query_expr
-    for tag in TAG_DEFS.keys():
-        if tag in processed_query:
-            # Erstelle eine temporäre OR-Klausel für die Extensions
-            ext = line[FIELD_MAP["ext"]].lower()
-            tag_match = ext in TAG_DEFS[tag]
-            # Ersetze #tag durch einen booleschen Wert basierend auf Extension
-            if tag_match:
-                processed_query = processed_query.replace(tag, "TRUE")
-            else:
-                processed_query = processed_query.replace(tag, "FALSE")
-
-    # Wenn die Query TRUE oder FALSE enthält, verwende einfache Auswertung
-    if "TRUE" in processed_query or "FALSE" in processed_query:
-        # Einfache Ersetzung für boolesche Ausdrücke
-        processed_query = processed_query.replace("TRUE", "1").replace("FALSE", "0")
-        try:
-            return eval(processed_query.replace("OR", "or").replace("AND", "and").replace("NOT", "not"))
-        except:
-            pass
-
-    expr = algebra.parse(processed_query)
-    values = set(c.lower() for c in line)
-
-    ext = line[FIELD_MAP["ext"]].lower()
-    for tag, extensions in TAG_DEFS.items():
-        if ext in extensions:
-            values.add(tag.lower())
-
-    # Spezialbehandlung für einfache Symbole
-    if isinstance(expr, algebra.Symbol):
-        lit = expr.obj.lower()
-        if ':' in lit:
-            field, val = lit.split(':', 1)
-            field = FIELD_ALIASES.get(field, field)
-            idx = FIELD_MAP.get(field)
-            if idx is not None:
-                return val.lower() in line[idx].lower()
-            return False
-        else:
-            return lit in values
-
-    # Für komplexere Ausdrücke: Rekursive Auswertung
-    def evaluate_expr(node):
-        if isinstance(node, algebra.Symbol):
-            lit_raw = node.obj
-            lit = lit_raw.lower()
-
-            if ':' in lit:
-                field, val = lit.split(':', 1)
-                field = FIELD_ALIASES.get(field, field)
-                idx = FIELD_MAP.get(field)
-                if idx is not None:
-                    return val.lower() in line[idx].lower()
-                else:
-                    return False
-            else:
-                return lit in values
-
-        elif hasattr(node, 'args'):  # AND, OR, NOT Operationen
-            if node.__class__.__name__ == 'AND':
-                return all(evaluate_expr(arg) for arg in node.args)
-            elif node.__class__.__name__ == 'OR':
-                return any(evaluate_expr(arg) for arg in node.args)
-            elif node.__class__.__name__ == 'NOT':
-                return not evaluate_expr(node.args[0])
+    """Kompatibler Wrapper: die Query wird nur beim ersten Aufruf kompiliert"""
+    return compile_query(query_expr)(line)
 
-        return False
+def create_ods_with_hyperlinks(input_file, output_file, search_term, use_filter=True):
+    print(f"[DEBUG] Filter aktiv? {use_filter}")
+    found_rows = []
+    with open(input_file, 'r', encoding='utf-8') as f:
+        for row in csv.reader(f, delimiter='\t'):
+            if not use_filter or line_matches_query(row, search_term):
+                found_rows.append(row)
+    write_ods_rows(found_rows, output_file)
+    return found_rows
 
-    return evaluate_expr(expr)
+def write_ods_rows(rows, output_file, preview_size=10, extra_columns=()):
+    """
+    Schreibt Trefferzeilen direkt aus einem Iterable in die ODS-Datei;
+    extra_columns sind (Name, Breite) zusätzlicher Spalten hinter den TSV-Spalten
 
-def create_ods_with_hyperlinks(input_file, output_file, search_term, use_filter=True):
+    Returns:
+        (Anzahl Zeilen, die ersten preview_size Zeilen für die Schnellansicht)
+    """
     print("Starte ODS-Erstellung...")
-    print(f"[DEBUG] Filter aktiv? {use_filter}")
     start_time = time.time()
     doc = odf.opendocument.OpenDocumentSpreadsheet()
 
@@ -184,6 +103,7 @@ def create_ods_with_hyperlinks(input_file, output_file, search_term, use_filter=
     table = Table(name="Sheet1")
 
     column_widths = ["2.25cm", "2.25cm", "2.25cm", "12cm", "1cm", "2cm", "1cm", "2cm"]
+    column_widths += [width for _, width in extra_columns]
     for i, width in enumerate(column_widths):
         col_style = Style(name=f"ColStyle{i}", family="table-column")
         col_style.addElement(TableColumnProperties(columnwidth=width))
@@ -191,6 +111,7 @@ def create_ods_with_hyperlinks(input_file, output_file, search_term, use_filter=
         table.addElement(TableColumn(stylename=col_style))
 
     header = ["DocDatum", "Hyperlink", "Pfad", "Dateiname", "ext", "Größe", "Datum", "md5"]
+    header += [name for name, _ in extra_columns]
     header_row = TableRow()
     for cell_content in header:
         cell = TableCell(stylename=header_style)
@@ -198,31 +119,30 @@ def create_ods_with_hyperlinks(input_file, output_file, search_term, use_filter=
         header_row.addElement(cell)
     table.addElement(header_row)
 
-    found_rows = []
+    preview = []
     row_count = 0
     print("Verarbeite Zeilen...")
-    with open(input_file, 'r', encoding='utf-8') as f:
-        reader = csv.reader(f, delimiter='\t')
-        for row in reader:
-            if not use_filter or line_matches_query(row, search_term):
-                table_row = TableRow()
-                found_rows.append(row)
+    for row in rows:
+        row_count += 1
+        if len(preview) < preview_size:
+            preview.append(row)
+
+        table_row = TableRow()
+        for i, cell_content in enumerate(row):
+            cell = TableCell()
+            if i == 1:
+                path = row[2]
+                filename = row[3]
+                full_path = os.path.join(path, filename)
+                href = f"file://{full_path}"
+                p = P()
+                p.addElement(A(href=href, text=filename, stylename=hyperlink_style))
+                cell.addElement(p)
+            else:
+                cell.addElement(P(text=cell_content))
+            table_row.addElement(cell)
 
-                for i, cell_content in enumerate(row):
-                    cell = TableCell()
-                    if i == 1:
-                        path = row[2]
-                        filename = row[3]
-                        full_path = os.path.join(path, filename)
-                        href = f"file://{full_path}"
-                        p = P()
-                        p.addElement(A(href=href, text=filename, stylename=hyperlink_style))
-                        cell.addElement(p)
-                    else:
-                        cell.addElement(P(text=cell_content))
-                    table_row.addElement(cell)
-
-                table.addElement(table_row)
+        table.addElement(table_row)
 
     doc.spreadsheet.addElement(table)
     print(f"Speichere ODS-Datei: {output_file}")
@@ -230,15 +150,81 @@ def create_ods_with_hyperlinks(input_file, output_file, search_term, use_filter=
 
     end_time = time.time()
     print(f"ODS-Erstellung abgeschlossen. Dauer: {end_time - start_time:.2f} Sekunden")
-    print(f"Gefundene Zeilen: {len(found_rows)}")
-    return found_rows
+    print(f"Gefundene Zeilen: {row_count}")
+    return row_count, preview
+
+def iter_scan_rows(chunks):
+    """Flacht die Trefferlisten aus tsv_scan zu einzelnen Zeilen ab"""
+    for rows in chunks:
+        yield from rows
+
+def duplicate_report(limit=None):
+    """
+    eb --duplikate [N]: alle md5-Gruppen (bzw. die N größten) in
+    ebib-duplikate.ods, die größte Verschwendung zuerst
+    """
+    output_file = Path(OUTPUT_DIR) / 'ebib-duplikate.ods'
+    start_time = time.time()
+
+    conn, reason = open_search_db(SQLITE_DB, INPUT_FILE)
+    if conn is not None:
+        print(f"⚡ Duplikat-Bericht aus md5_groups: {SQLITE_DB}")
+        groups = iter_duplicate_groups_db(conn)
+    else:
+        print(f"ℹ️  {reason} - sortiere die TSV-Datei extern nach md5")
+        groups = iter_duplicate_groups_tsv(INPUT_FILE)
+
+    totals = {'groups': 0, 'copies': 0, 'wasted': 0}
+    top_groups = []
+
+    def report_rows():
+        for number, group in enumerate(itertools.islice(groups, limit), 1):
+            totals['groups'] += 1
+            totals['copies'] += group.copies - 1
+            totals['wasted'] += group.wasted_bytes
+            if len(top_groups) < 10:
+                top_groups.append(group)
+            yield from group.report_rows(number)
+
+    try:
+        found_count, _ = write_ods_rows(report_rows(), output_file, preview_size=0, extra_columns=REPORT_COLUMNS)
+    finally:
+        groups.close()
+        if conn is not None:
+            conn.close()
+
+    print(f"✅ Bericht erstellt. Dauer: {time.time() - start_time:.2f} Sekunden")
+    print(f"🧬 {totals['groups']:,} md5-Gruppen, {totals['copies']:,} überzählige Kopien, "
+          f"{format_size(totals['wasted'])} freizugeben")
+    print("\n📋 Größte Verschwendung:")
+    for group in top_groups:
+        print(f"   {format_size(group.wasted_bytes):>10}  {group.copies}×  {group.rows[0][3]}  "
+              f"({', '.join(group.collection_names()) or 'ohne Sammlung'})")
+
+    if found_count:
+        print(f"\n🎉 Bericht gespeichert in {output_file}")
+        print("🚀 Öffne LibreOffice...")
+        subprocess.Popen(["libreoffice", "--calc", str(output_file)])
+    else:
+        print("🔍 Keine Duplikate gefunden.")
 
 def main():
-    if len(sys.argv) < 2:
+    multiprocessing.freeze_support()  # Worker-Prozesse im PyInstaller-Binary
+
+    if len(sys.argv) > 1 and sys.argv[1] in DUPLICATE_FLAGS:
+        limit = int(sys.argv[2]) if len(sys.argv) > 2 and sys.argv[2].isdigit() else None
+        duplicate_report(limit)
+        return
+
+    args = [arg for arg in sys.argv[1:] if arg not in UNIQUE_FLAGS]
+    unique = len(args) < len(sys.argv) - 1
+
+    if not args:
         print("""
 🔍 EB - eBib Search Tool
 
-Verwendung: eb 'Suchbegriff oder Ausdruck'
+Verwendung: eb [--eindeutig] 'Suchbegriff oder Ausdruck'
+            eb --duplikate [N]   # Duplikat-Bericht (N größte md5-Gruppen)
 
 📖 BEISPIELE:
 
@@ -250,6 +236,8 @@ Feld-spezifische Suche:
   eb 'name:archive'          # Nur im Dateinamen
   eb 'ext:pdf'               # Nur PDF-Dateien
   eb 'datum:2023'            # Dateien von 2023
+  eb 'datum:1985-03..1986'   # Zeitraum März 1985 bis Ende 1986
+  eb 'ext:pdf AND size:>50MB'  # Große PDFs (auch size:100KB..2MB, size:<=1GB)
 
 Boolean-Operatoren:
   eb 'name:ark OR name:arc'              # ODER-Verknüpfung
@@ -264,22 +252,20 @@ Spezial-Tags:
 Komplexe Beispiele:
   eb '#text AND name:manual AND NOT name:backup'
   eb '(ext:pdf OR ext:doc) AND name:2023'
+  eb 'sammlung:RONS AND pfad:/media/synology/eBib-HDD/eBib'
+  eb --eindeutig '#text AND name:manual'  # Je md5 nur eine Kopie (höchste Sammlungs-Priorität)
 
-⚠️  VERMEIDEN SIE:
-  ✗ eb 'name:"ark-bruch"'    # Anführungszeichen problematisch
-  ✗ eb 'ark-bruch'           # Bindestriche in einfacher Suche
-
-✅ VERWENDEN SIE STATTDESSEN:
-  ✓ eb 'name:ark AND name:bruch'
-  ✓ eb 'arkbruch'            # Ohne Bindestrich
-  ✓ eb 'ark bruch'           # Mit Leerzeichen
+Bindestriche und Anführungszeichen:
+  eb ark-bruch               # Fester Begriff mit Bindestrich
+  eb '"ark bruch"'           # Phrase mit Leerzeichen
+  eb 'name:"ark-bruch"'      # Feld-Suche mit Sonderzeichen
 
-Feldnamen: datum, name, ext
+Feldnamen: datum, dateidatum, name, ext, size, pfad, sammlung
 Operatoren: AND, OR, NOT (Groß-/Kleinschreibung egal)
         """)
         sys.exit(1)
 
-    search_term = ' '.join(sys.argv[1:]).strip()
+    search_term = ' '.join(args).strip()
     if not search_term:
         print("❌ Fehler: Der Suchbegriff darf nicht leer sein.")
         sys.exit(1)
@@ -293,97 +279,93 @@ Operatoren: AND, OR, NOT (Groß-/Kleinschreibung egal)
         print(f"\n❌ PARSE-FEHLER in Query '{search_term}':")
         print(f"   {error}")
         print("\n💡 Mögliche Lösungen:")
-        print("   - Entfernen Sie Sonderzeichen wie -, \", '")
+        print("   - Prüfen Sie Klammern und Anführungszeichen")
         print("   - Verwenden Sie einfachere Begriffe")
         print("   - Nutzen Sie Boolean-Operatoren: AND, OR, NOT")
-        print("   - Beispiel: statt 'ark-bruch' → 'ark AND bruch'")
+        print("   - Beispiel: name:\"ark-bruch\" (mit schließendem Anführungszeichen)")
         sys.exit(1)
 
     output_file = Path(OUTPUT_DIR) / 'ebib-search.ods'
-    temp_file = Path('/tmp/ebib-search-temp.tsv')
 
-    USE_GREP = not any(op in search_term.upper() for op in ["AND", "OR", "NOT", ":", "(", ")", "#"])
+    # Einfache Suche: fester Begriff in der ganzen Zeile (früher grep -i)
+    literal_term = literal_search_term(search_term)
 
-    if USE_GREP:
-        escaped_search_term = shlex.quote(search_term)
-        grep_command = f"grep -i {escaped_search_term} '{INPUT_FILE}'"
-        print(f"🔍 Führe grep-Befehl aus: {grep_command}")
-        try:
-            start_time = time.time()
-            result = subprocess.run(grep_command, shell=True, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
-            end_time = time.time()
+    # Suche bevorzugt über die SQLite-DB, TSV nur als Fallback
+    conn, reason = open_search_db(SQLITE_DB, INPUT_FILE)
+    fts = conn is not None and has_fts_index(conn)
+    if conn is None:
+        print(f"ℹ️  {reason} - verwende TSV-Suche")
+    elif literal_term is not None and not (fts and len(literal_term) >= FTS_MIN_LENGTH):
+        # Kurze Begriffe bzw. DB ohne Trigram-Index: Byte-Suche in der TSV
+        conn.close()
+        conn = None
 
-            with open(temp_file, 'w', encoding='utf-8') as f:
-                f.write(result.stdout)
+    scan_stats = {'rows': 0}
 
-            found_lines = result.stdout.count('\n')
-            print(f"✅ grep-Befehl abgeschlossen. Dauer: {end_time - start_time:.2f} Sekunden")
-            print(f"📊 Anzahl gefundener Zeilen: {found_lines}")
+    def report_progress(bytes_done, bytes_total, rows_done, matches_done):
+        scan_stats['rows'] = rows_done
+        print(f"🔄 Verarbeitet: {rows_done} Zeilen ({bytes_done / bytes_total:.0%}), Treffer: {matches_done}")
 
-            if found_lines == 0:
-                print(f"🔍 Keine Ergebnisse gefunden für '{search_term}'.")
-                sys.exit(0)
+    start_time = time.time()
+    if conn is not None:
+        if literal_term is not None:
+            print(f"⚡ Teilstring-Suche in Pfad und Dateiname über Trigram-Index: {SQLITE_DB}")
+            node = ('text', literal_term.lower())
+        else:
+            print(f"⚡ Boolesche Suche über SQLite-DB: {SQLITE_DB}")
+            node = parse_query(search_term)
+        plan = plan_query(node, load_statistics(conn), fts=fts)
+        print(f"[DEBUG] {plan.describe()}")
+        # Seitenweise über files.id, die Zeilen fließen direkt in die ODS-Erstellung
+        rows = iter(open_results(conn, node, plan, unique=unique))
 
-        except subprocess.CalledProcessError as e:
-            if e.returncode == 1 and not e.stdout:
-                print(f"🔍 Keine Ergebnisse gefunden für '{search_term}'.")
-            else:
-                print(f"❌ Fehler beim Ausführen des grep-Befehls: {e}")
-                print(f"Stderr: {e.stderr}")
-            sys.exit(1)
+    elif literal_term is not None:
+        print(f"🔍 Volltextsuche nach '{literal_term}' in: {INPUT_FILE}")
+        rows = iter_scan_rows(search_literal(INPUT_FILE, literal_term, progress=report_progress))
 
     else:
         print("🧠 Schalte auf internen Filtermodus (boolesche Suche)...")
-        with open(INPUT_FILE, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
-
-        filtered = []
-        reader = csv.reader(lines, delimiter='\t')
-
-        row_total = 0
-        row_matched = 0
-
-        print("⚙️  Starte boolesche Filterung...")
-
-        for row in reader:
-            row_total += 1
-            if row_total % 100000 == 0:
-                print(f"🔄 Verarbeitet: {row_total} Zeilen")
-            try:
-                if line_matches_query(row, search_term):
-                    row_matched += 1
-                    filtered.append('\t'.join(row))
-                    if row_matched <= 10:
-                        print(f"✔️  {row[0]} | {row[3]} | {row[4]}")
-            except Exception as e:
-                if row_total == 1:  # Nur beim ersten Fehler anzeigen
-                    print(f"⚠️  Fehler beim Verarbeiten von Zeile {row_total}: {e}")
-                    print("   (Weitere Fehler werden unterdrückt)")
-
-        print(f"✅ Boolesche Suche abgeschlossen. Geprüfte Zeilen: {row_total}, Treffer: {row_matched}")
-
-        if not filtered:
-            print(f"🔍 Keine Ergebnisse gefunden für '{search_term}'.")
+        plan = plan_query(parse_query(search_term), load_statistics(), use_index=False)
+        print(f"[DEBUG] {plan.describe()}")
+        literals = required_literals(plan.node)
+        if literals:
+            print(f"[DEBUG] Vorauswahl über Byte-Suche nach: {', '.join(literals)}")
+        # Paralleler mmap-Scan, Treffer fließen direkt in die ODS-Erstellung
+        rows = iter_scan_rows(scan_tsv(INPUT_FILE, compile_node, (plan.node,), literals=literals,
+                                       progress=report_progress))
+
+    if unique and conn is None:
+        # TSV-Modus: Duplikate erst nach dem vollständigen Scan bekannt
+        unique_rows, removed = remove_duplicates(list(rows))
+        print(f"🧬 {removed} Duplikate (gleicher md5) entfernt")
+        rows = iter(unique_rows)
+
+    first_row = next(rows, None)
+    if first_row is None:
+        print(f"🔍 Keine Ergebnisse gefunden für '{search_term}'.")
+        if literal_term is None:
             print("\n💡 Versuchen Sie:")
             print("   - Andere Suchbegriffe")
             print("   - Weniger spezifische Kriterien")
             print("   - Boolean-Operatoren: OR statt AND")
-            sys.exit(0)
+        sys.exit(0)
 
-        with open(temp_file, 'w', encoding='utf-8') as f:
-            f.write('\n'.join(filtered))
-
-        print(f"📝 {row_matched} Zeilen nach boolescher Suche übernommen.")
-
-    found_rows = create_ods_with_hyperlinks(temp_file, output_file, search_term, use_filter=False)
+    try:
+        found_count, preview = write_ods_rows(itertools.chain([first_row], rows), output_file)
+    finally:
+        if conn is not None:
+            conn.close()
+    print(f"✅ Suche abgeschlossen. Dauer: {time.time() - start_time:.2f} Sekunden")
+    if scan_stats['rows']:
+        print(f"📊 Geprüfte Zeilen: {scan_stats['rows']}, Treffer: {found_count}")
 
     print(f"\n🎉 Suchergebnisse gespeichert in {output_file}")
     print("\n📋 Quickview der gefundenen Zeilen:")
-    for row in found_rows[:10]:
+    for row in preview:
         print(" | ".join(row))
 
-    if len(found_rows) > 10:
-        print(f"... und {len(found_rows) - 10} weitere Zeilen")
+    if found_count > len(preview):
+        print(f"... und {found_count - len(preview)} weitere Zeilen")
 
     if output_file.exists():
         print("🚀 Öffne LibreOffice...")
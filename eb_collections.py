@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+eb_collections.py - Sammlungen aus Sammlungen.csv.txt
+Ordnet jedem Verzeichnis über den längsten passenden Pfad-Präfix eine
+Sammlung (KSW-Lib, RONS, Qual, IngAG, ...) mit Priorität zu. Genutzt vom
+Preprocessor (Spalte files.collection_id, kanonische md5-Kopien), vom
+TSV-Compiler für das Feld 'sammlung:' und von der GUI (Sammlungs-Filter).
+Priorität 1 ist die höchste; Dateien ohne Sammlung kommen zuletzt.
+"""
+
+import csv
+from functools import lru_cache
+from pathlib import Path
+
+COLLECTIONS_FILE = Path(__file__).parent / 'Sammlungen.csv.txt'
+
+# Präfixe stehen in der Datei als Hyperlink-Ziel
+URL_PREFIX = 'file://'
+
+# collection_id für Dateien außerhalb aller Sammlungen (nicht NULL, damit NOT sammlung:x sie trifft)
+NO_COLLECTION = 0
+
+# Rang für Dateien ohne Sammlung bei der Wahl der kanonischen Kopie
+NO_COLLECTION_PRIORITY = 1 << 30
+
+MD5_COLUMN = 7  # TSV-Spalte mit dem md5-Hash
+PATH_COLUMN = 2
+
+
+class Collection:
+    """Eine Sammlung mit ihrer ID (files.collection_id) und Priorität"""
+
+    def __init__(self, collection_id, name, priority):
+        self.id = collection_id
+        self.name = name
+        self.priority = priority
+
+
+class CollectionMap:
+    """Pfad-Präfixe -> Sammlung, Auflösung per längstem Präfix"""
+
+    def __init__(self, entries=()):
+        """
+        Args:
+            entries: (präfix, name, priorität)-Tupel; die IDs werden in der
+                     Reihenfolge des ersten Auftretens ab 1 vergeben
+        """
+        self.collections = {}
+        self.prefixes = {}
+        for prefix, name, priority in entries:
+            collection = self.collections.get(name)
+            if collection is None:
+                collection = self.collections[name] = Collection(len(self.collections) + 1, name, priority)
+            self.prefixes[prefix.rstrip('/')] = collection
+        self._cache = {}
+
+    @classmethod
+    def from_file(cls, csv_path=COLLECTIONS_FILE):
+        """
+        Liest Sammlungen.csv.txt (ohne Kopfzeile):
+        präfix-url, sammlung, priorität, bezeichnung
+        """
+        entries = []
+        try:
+            with open(csv_path, 'r', encoding='utf-8', newline='') as f:
+                for row in csv.reader(f):
+                    if len(row) < 3 or not row[0].strip():
+                        continue
+                    prefix = row[0].strip()
+                    if prefix.startswith(URL_PREFIX):
+                        prefix = prefix[len(URL_PREFIX):]
+                    try:
+                        priority = int(row[2])
+                    except ValueError:
+                        priority = 0
+                    entries.append((prefix, row[1].strip(), priority))
+        except OSError as e:
+            print(f"[DEBUG] Sammlungen nicht lesbar ({csv_path}): {e}")
+        return cls(entries)
+
+    def resolve(self, path):
+        """
+        Sammlung eines Verzeichnisses über den längsten Präfix, der an
+        einer Verzeichnisgrenze endet ('/a/KSW-Library' passt nicht auf
+        '/a/KSW-Library - about it')
+
+        Returns:
+            Collection oder None
+        """
+        if path in self._cache:
+            return self._cache[path]
+        candidate = path.rstrip('/')
+        collection = None
+        while candidate:
+            collection = self.prefixes.get(candidate)
+            if collection is not None:
+                break
+            candidate = candidate.rpartition('/')[0]
+        self._cache[path] = collection
+        return collection
+
+    def resolve_id(self, path):
+        """collection_id eines Verzeichnisses (NO_COLLECTION ohne Sammlung)"""
+        collection = self.resolve(path)
+        return collection.id if collection else NO_COLLECTION
+
+    def priority(self, path):
+        """Rang eines Verzeichnisses für die Wahl der kanonischen Kopie (kleiner = bevorzugt)"""
+        collection = self.resolve(path)
+        return collection.priority if collection else NO_COLLECTION_PRIORITY
+
+    def names(self):
+        """Namen aller Sammlungen nach Priorität (höchste zuerst), z.B. für die GUI"""
+        return [c.name for c in sorted(self.collections.values(), key=lambda c: (c.priority, c.name))]
+
+
+@lru_cache(maxsize=1)
+def load_collections(csv_path=COLLECTIONS_FILE):
+    """Einmal je Prozess geladene CollectionMap (auch in den Parser-Workern)"""
+    return CollectionMap.from_file(csv_path)
+
+
+def remove_duplicates(rows, collections=None):
+    """
+    Behält je md5 nur eine Zeile (TSV-Format): die aus der Sammlung mit der
+    höchsten Priorität, bei Gleichstand die erste - dieselbe Regel wie
+    files.copy_rank in der SQLite-DB. Für den TSV-Modus ohne DB.
+
+    Returns:
+        (eindeutige Zeilen in ursprünglicher Reihenfolge, Anzahl entfernter Duplikate)
+    """
+    collections = collections or load_collections()
+    best = {}
+    for position, row in enumerate(rows):
+        md5_hash = row[MD5_COLUMN] if len(row) > MD5_COLUMN else ""
+        if not md5_hash:
+            continue
+        rank = (collections.priority(row[PATH_COLUMN]), position)
+        if md5_hash not in best or rank < best[md5_hash]:
+            best[md5_hash] = rank
+    keep = {position for _, position in best.values()}
+    unique_rows = [row for position, row in enumerate(rows)
+                   if position in keep or not (len(row) > MD5_COLUMN and row[MD5_COLUMN])]
+    return unique_rows, len(rows) - len(unique_rows)
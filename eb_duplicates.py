@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+eb_duplicates.py - Duplikat-Bericht über die ganze Bibliothek
+Liefert alle md5-Gruppen mit mehr als einer Kopie, die größte Verschwendung
+zuerst: Kopien je Gruppe, beteiligte Sammlungen und freizugebende Bytes.
+Mit SQLite-DB ein einziger sortierter Durchlauf über md5_groups
+(idx_md5_groups_wasted), ohne DB ein externer Sort über die TSV-Datei in
+temporären Läufen - in keinem Fall ein Python-dict über alle Hashes.
+Genutzt von eb.py (eb --duplikate).
+"""
+
+import heapq
+import itertools
+import os
+import tempfile
+
+from eb_collections import MD5_COLUMN, PATH_COLUMN, load_collections
+from eb_sql import ROW_COLUMNS, ROW_SOURCE
+from tsv_scan import split_tsv_line
+
+RUN_SIZE = 500_000  # Zeilen pro sortiertem Lauf im TSV-Modus
+
+# Zusatzspalten je Zeile im Bericht (Name, Spaltenbreite für die ODS-Datei)
+REPORT_COLUMNS = (
+    ("Gruppe", "1.5cm"),
+    ("Kopie", "1.2cm"),        # 1 = kanonische Kopie
+    ("Kopien", "1.5cm"),
+    ("Verschwendet", "2.5cm"),
+    ("Sammlung", "2.5cm"),
+    ("Sammlungen", "4cm"),     # alle Sammlungen der Gruppe
+)
+
+# Sortierschlüssel im TSV-Modus: Zahlen mit fester Breite, damit die
+# Textsortierung der Läufe der numerischen entspricht
+_INVERT_BASE = 10 ** 20
+
+
+class DuplicateGroup:
+    """Eine md5-Gruppe: Zeilen im TSV-Format, kanonische Kopie zuerst"""
+
+    def __init__(self, md5_hash, rows, collections, wasted_bytes):
+        self.hash = md5_hash
+        self.rows = rows
+        self.collections = collections  # Sammlung je Zeile ('' ohne Sammlung)
+        self.wasted_bytes = wasted_bytes
+
+    @property
+    def copies(self):
+        return len(self.rows)
+
+    def collection_names(self):
+        """Beteiligte Sammlungen in der Reihenfolge der Kopien, ohne Wiederholung"""
+        return [name for name in dict.fromkeys(self.collections) if name]
+
+    def report_rows(self, number):
+        """Zeilen für den Bericht: TSV-Spalten plus REPORT_COLUMNS"""
+        names = ", ".join(self.collection_names())
+        for rank, (row, collection) in enumerate(zip(self.rows, self.collections), 1):
+            yield row + [str(number), str(rank), str(self.copies), str(self.wasted_bytes), collection, names]
+
+
+def iter_duplicate_groups_db(conn):
+    """
+    Alle md5-Gruppen aus der DB, sortiert nach verschwendeten Bytes
+    (absteigend), innerhalb der Gruppe nach files.copy_rank
+
+    Yields:
+        DuplicateGroup
+    """
+    sql = f"""
+        SELECT g.wasted_bytes, c.name, {ROW_COLUMNS}
+        FROM {ROW_SOURCE}
+        JOIN md5_groups g USING (hash)
+        LEFT JOIN collections c ON c.collection_id = files.collection_id
+        ORDER BY g.wasted_bytes DESC, g.file_count DESC, g.hash, files.copy_rank
+    """
+    rows = conn.execute(sql)
+    for _, group in itertools.groupby(rows, key=lambda row: row[-1]):
+        group = list(group)
+        yield DuplicateGroup(
+            group[0][-1],
+            [[("" if v is None else str(v)) for v in row[2:]] for row in group],
+            [row[1] or "" for row in group],
+            int(group[0][0] or 0),
+        )
+
+
+def _write_run(lines, directory):
+    """Sortiert einen Lauf im Speicher und schreibt ihn in eine temporäre Datei"""
+    lines.sort()
+    fd, path = tempfile.mkstemp(dir=directory, suffix='.run')
+    with os.fdopen(fd, 'w', encoding='utf-8', newline='\n') as f:
+        f.writelines(lines)
+    return path
+
+
+def _external_sort(lines, directory, run_size):
+    """
+    Sortiert Textzeilen (mit Zeilenende) in Läufen zu je run_size Zeilen
+    und mischt die Läufe per heapq.merge
+
+    Yields:
+        Zeilen in sortierter Reihenfolge
+    """
+    runs = []
+    buffer = []
+    for line in lines:
+        buffer.append(line)
+        if len(buffer) >= run_size:
+            runs.append(_write_run(buffer, directory))
+            buffer = []
+    if buffer:
+        runs.append(_write_run(buffer, directory))
+
+    # newline='\n': ein '\r' in Dateinamen beendet keine Zeile
+    files = [open(path, 'r', encoding='utf-8', newline='\n') for path in runs]
+    try:
+        yield from heapq.merge(*files)
+    finally:
+        for f in files:
+            f.close()
+        for path in runs:
+            os.remove(path)
+
+
+def _size(row):
+    return int(row[5]) if row[5].isdigit() else 0
+
+
+def iter_duplicate_groups_tsv(path, collections=None, run_size=RUN_SIZE):
+    """
+    Alle md5-Gruppen aus der TSV-Datei über zwei externe Sortierläufe:
+    erst nach md5 (Gruppen bilden, kanonische Kopie wie files.copy_rank:
+    höchste Sammlungs-Priorität, dann Dateireihenfolge), dann nach
+    verschwendeten Bytes. Im Speicher liegt höchstens ein Lauf.
+
+    Yields:
+        DuplicateGroup
+    """
+    collections = collections or load_collections()
+
+    def by_hash(f):
+        for position, line in enumerate(f):
+            line = line.rstrip('\n')
+            row = split_tsv_line(line)
+            if row[MD5_COLUMN]:
+                yield f"{row[MD5_COLUMN]}\t{position:012d}\t{line}\n"
+
+    def by_waste(sorted_lines):
+        for md5_hash, group in itertools.groupby(sorted_lines, key=lambda line: line.split('\t', 1)[0]):
+            lines = [line.rstrip('\n').split('\t', 2)[2] for line in group]
+            if len(lines) < 2:
+                continue
+            rows = [split_tsv_line(line) for line in lines]
+            order = sorted(range(len(rows)), key=lambda i: (collections.priority(rows[i][PATH_COLUMN]), i))
+            wasted = sum(_size(rows[i]) for i in order[1:])
+            key = f"{_INVERT_BASE - wasted:021d}\t{_INVERT_BASE - len(rows):021d}\t{md5_hash}"
+            for rank, i in enumerate(order):
+                yield f"{key}\t{rank:09d}\t{lines[i]}\n"
+
+    with tempfile.TemporaryDirectory(prefix='eb-duplikate-') as directory:
+        with open(path, 'r', encoding='utf-8', errors='replace', newline='\n') as f:
+            sorted_by_waste = _external_sort(
+                by_waste(_external_sort(by_hash(f), directory, run_size)), directory, run_size)
+            split_lines = (line.rstrip('\n').split('\t', 4) for line in sorted_by_waste)
+            try:
+                for _, group in itertools.groupby(split_lines, key=lambda parts: parts[:3]):
+                    group = list(group)
+                    rows = [split_tsv_line(parts[4]) for parts in group]
+                    resolved = [collections.resolve(row[PATH_COLUMN]) for row in rows]
+                    yield DuplicateGroup(
+                        group[0][2],
+                        rows,
+                        [collection.name if collection else "" for collection in resolved],
+                        _INVERT_BASE - int(group[0][0]),
+                    )
+            finally:
+                sorted_by_waste.close()  # Läufe löschen, bevor das Verzeichnis entfernt wird
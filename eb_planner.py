@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+"""
+eb_planner.py - Kostenbasierte Reihenfolge der Prädikate einer eb-Query
+Schätzt die Selektivität jedes Prädikats aus gespeicherten Statistiken
+(Tabelle stats der SQLite-DB oder extensions_analysis_clean.csv) und
+ordnet UND/ODER-Verknüpfungen so, dass früh abgebrochen werden kann.
+Für SQL wird zusätzlich das selektivste indizierte Prädikat als Einstieg gewählt.
+"""
+
+import csv
+import sqlite3
+from datetime import date
+from pathlib import Path
+
+from eb_query import DATE_FIELDS, TAG_DEFS, get_file_type, parse_date_range, parse_size_range
+from eb_sql import is_fts_searchable
+
+EXTENSION_STATS_FILE = Path(__file__).parent / 'extensions_analysis_clean.csv'
+
+# Relativer Aufwand pro Zeile im TSV-Modus
+NODE_COSTS = {
+    'rowids': 1.0,
+    'tag': 1.0,
+    'type': 1.0,
+    'field': 2.0,
+    'text': 3.0,
+    'term': 8.0,
+}
+
+# Indizierte Prädikate lohnen sich nur, wenn sie genug Zeilen ausschließen
+INDEX_SELECTIVITY_LIMIT = 0.25
+
+# Annahmen für Teilstring-Suchen ohne Statistik (nach Länge des Suchbegriffs)
+SUBSTRING_SELECTIVITY = {1: 0.5, 2: 0.2, 3: 0.05}
+DEFAULT_SUBSTRING_SELECTIVITY = 0.02
+
+
+class QueryStatistics:
+    """Häufigkeiten für die Selektivitätsschätzung"""
+
+    def __init__(self, total=0, extensions=None, years=None, file_types=None, collections=None, sizes=None,
+                 source="keine"):
+        self.total = total
+        self.extensions = extensions or {}
+        self.years = years or {}
+        self.file_types = file_types or {}
+        self.collections = collections or {}
+        self.sizes = sizes or {}  # Stellenzahl der Größe -> Anzahl
+        self.source = source
+
+    @classmethod
+    def from_db(cls, conn):
+        """Liest die vom Preprocessor geschriebene Tabelle stats"""
+        stats = cls(source="SQLite stats")
+        try:
+            rows = conn.execute("SELECT kind, value, count FROM stats").fetchall()
+        except sqlite3.Error:
+            return None
+        for kind, value, count in rows:
+            if kind == 'total':
+                stats.total = count
+            elif kind == 'ext':
+                stats.extensions[value] = count
+            elif kind == 'year':
+                stats.years[str(value)] = count
+            elif kind == 'type':
+                stats.file_types[value] = count
+            elif kind == 'collection':
+                stats.collections[value] = count
+            elif kind == 'size':
+                stats.sizes[int(value)] = count
+        return stats if stats.total else None
+
+    @classmethod
+    def from_extension_csv(cls, csv_path=EXTENSION_STATS_FILE):
+        """Liest Extension-Häufigkeiten aus extension_analyzer.py-Ausgabe"""
+        stats = cls(source=Path(csv_path).name)
+        try:
+            with open(csv_path, 'r', encoding='utf-8') as f:
+                for row in csv.DictReader(f):
+                    try:
+                        count = int(row['Count'])
+                    except (KeyError, ValueError):
+                        continue
+                    ext = row['Extension'].lower()
+                    stats.extensions[ext] = stats.extensions.get(ext, 0) + count
+        except OSError:
+            return cls()
+        stats.total = sum(stats.extensions.values())
+        for ext, count in stats.extensions.items():
+            file_type = get_file_type(ext)
+            stats.file_types[file_type] = stats.file_types.get(file_type, 0) + count
+        return stats
+
+
+def load_statistics(conn=None):
+    """Statistik aus der DB, sonst aus extensions_analysis_clean.csv"""
+    if conn is not None:
+        stats = QueryStatistics.from_db(conn)
+        if stats:
+            return stats
+    return QueryStatistics.from_extension_csv()
+
+
+def estimate_selectivity(node, stats):
+    """Geschätzter Anteil der Zeilen (0..1), für die der Knoten wahr ist"""
+    kind = node[0]
+    total = stats.total
+
+    if kind == 'and':
+        selectivity = 1.0
+        for child in node[1]:
+            selectivity *= estimate_selectivity(child, stats)
+        return selectivity
+
+    if kind == 'or':
+        return min(1.0, sum(estimate_selectivity(child, stats) for child in node[1]))
+
+    if kind == 'not':
+        return 1.0 - estimate_selectivity(node[1], stats)
+
+    if kind == 'rowids':
+        return len(node[1]) / total if total else 0.01
+
+    if kind == 'tag':
+        if total:
+            return sum(stats.extensions.get(ext, 0) for ext in TAG_DEFS[node[1]]) / total
+        return 0.2
+
+    if kind == 'type':
+        if total and stats.file_types:
+            return stats.file_types.get(node[1], 0) / total
+        return 0.2
+
+    if kind == 'field':
+        field, val = node[1], node[2]
+        if field == 'ext':
+            if total and stats.extensions:
+                return stats.extensions.get(val.lstrip('.'), 0) / total
+            return 0.05
+        if field in DATE_FIELDS and parse_date_range(val):
+            return estimate_date_range(parse_date_range(val), stats if field == 'datum' else None)
+        if field == 'size' and parse_size_range(val):
+            return estimate_size_range(parse_size_range(val), stats)
+        if field == 'sammlung':
+            if total and stats.collections:
+                return stats.collections.get(val, 0) / total
+            return 0.2
+        if field == 'pfad' and val.startswith('/'):
+            # Teilbaum: je tiefer der Pfad, desto weniger Dateien
+            return 0.5 ** max(val.rstrip('/').count('/'), 1)
+        return SUBSTRING_SELECTIVITY.get(len(val), DEFAULT_SUBSTRING_SELECTIVITY)
+
+    if kind == 'text':
+        return SUBSTRING_SELECTIVITY.get(len(node[1]), DEFAULT_SUBSTRING_SELECTIVITY)
+
+    if kind == 'term':
+        return 0.01
+
+    return 0.5
+
+
+def estimate_date_range(day_range, stats=None):
+    """Anteil der Zeilen in einem Bereich von Tagesnummern, je Jahr anteilig nach Tagen"""
+    first, last = day_range
+    start_year, end_year = date.fromordinal(first).year, date.fromordinal(last).year
+    if end_year - start_year > 200:
+        return 1.0  # offener Bereich (..1986, 2000..)
+    share = 0.0
+    for year in range(start_year, end_year + 1):
+        year_first = max(first, date(year, 1, 1).toordinal())
+        year_last = min(last, date(year, 12, 31).toordinal())
+        if stats is not None and stats.total and stats.years:
+            year_share = stats.years.get(str(year), 0) / stats.total
+        else:
+            year_share = 0.02
+        share += year_share * (year_last - year_first + 1) / 365
+    return min(share, 1.0)
+
+
+def estimate_size_range(size_range, stats):
+    """Anteil der Zeilen in einem Größenbereich, je Größenordnung (Stellenzahl) linear anteilig"""
+    if not (stats.total and stats.sizes):
+        return 0.1
+    low, high = size_range
+    share = 0.0
+    for digits, count in stats.sizes.items():
+        bucket_low = 10 ** (digits - 1) if digits > 1 else 0
+        bucket_high = 10 ** digits - 1
+        overlap = min(high, bucket_high) - max(low, bucket_low) + 1
+        if overlap > 0:
+            share += count / stats.total * overlap / (bucket_high - bucket_low + 1)
+    return min(share, 1.0)
+
+
+def estimate_cost(node):
+    """Relativer Aufwand, einen Knoten für eine Zeile auszuwerten"""
+    kind = node[0]
+    if kind in ('and', 'or'):
+        return sum(estimate_cost(child) for child in node[1])
+    if kind == 'not':
+        return estimate_cost(node[1])
+    return NODE_COSTS.get(kind, 2.0)
+
+
+def is_indexed(node, fts=False):
+    """Kann das Prädikat über einen Index der files-Tabelle (oder files_fts) beantwortet werden?"""
+    kind = node[0]
+    if kind in ('rowids', 'tag', 'type'):
+        return True
+    if kind == 'or':
+        return all(is_indexed(child, fts) for child in node[1])
+    if fts and is_fts_searchable(node):
+        return True
+    if kind == 'field':
+        if node[1] in DATE_FIELDS:
+            return parse_date_range(node[2]) is not None
+        if node[1] == 'size':
+            return parse_size_range(node[2]) is not None
+        return node[1] in ('ext', 'pfad', 'sammlung')
+    return False
+
+
+def order_node(node, stats):
+    """Sortiert UND/ODER-Kinder rekursiv nach Kosten und Selektivität"""
+    kind = node[0]
+    if kind == 'not':
+        return ('not', order_node(node[1], stats))
+    if kind not in ('and', 'or'):
+        return node
+
+    children = [order_node(child, stats) for child in node[1]]
+    if kind == 'and':
+        # Zuerst, was billig ist und viele Zeilen ausschließt
+        rank = lambda c: estimate_cost(c) / max(1.0 - estimate_selectivity(c, stats), 1e-6)
+    else:
+        # Zuerst, was billig ist und oft zutrifft
+        rank = lambda c: estimate_cost(c) / max(estimate_selectivity(c, stats), 1e-6)
+    return (kind, tuple(sorted(children, key=rank)))
+
+
+class QueryPlan:
+    """Geordneter AST plus gewähltes Index-Prädikat (driver) für SQL"""
+
+    def __init__(self, node, driver, stats, use_index=True, fts=False):
+        self.node = node
+        self.driver = driver
+        self.stats = stats
+        self.use_index = use_index
+        self.fts = fts
+
+    def estimated_count(self):
+        """Geschätzte Trefferzahl (ohne Duplikat-Entfernung)"""
+        return int(estimate_selectivity(self.node, self.stats) * self.stats.total)
+
+    def describe(self):
+        """Lesbare Beschreibung für die Debug-Ausgabe"""
+        conjuncts = self.node[1] if self.node[0] == 'and' else (self.node,)
+        lines = [f"Plan (Statistik: {self.stats.source}, {self.stats.total:,} Zeilen):"]
+        for step, child in enumerate(conjuncts, 1):
+            role = "INDEX " if child is self.driver else "FILTER"
+            selectivity = estimate_selectivity(child, self.stats)
+            lines.append(f"  {step}. {role} {format_node(child)}  (~{selectivity:.2%})")
+        if self.driver is None and self.use_index:
+            lines.append("  -> kein ausreichend selektiver Index, vollständiger Scan")
+        return "\n".join(lines)
+
+
+def format_node(node):
+    """Gibt einen AST-Knoten wieder als eb-Query-Text aus"""
+    kind = node[0]
+    if kind in ('and', 'or'):
+        return "(" + f" {kind.upper()} ".join(format_node(child) for child in node[1]) + ")"
+    if kind == 'not':
+        return f"NOT {format_node(node[1])}"
+    if kind == 'field':
+        return f"{node[1]}:{node[2]}"
+    if kind == 'type':
+        return f"typ:{node[1]}"
+    if kind == 'text':
+        return f"text:{node[1]}"
+    if kind == 'rowids':
+        return f"<Token-Index: {len(node[1]):,} IDs>"
+    return node[1]
+
+
+def plan_query(node, stats, use_index=True, fts=False):
+    """
+    Erstellt einen QueryPlan für einen AST aus eb_query.parse_query
+
+    Mit use_index wird das selektivste indizierte Prädikat der obersten
+    UND-Ebene als Index-Einstieg gewählt, sofern es unter
+    INDEX_SELECTIVITY_LIMIT liegt. Mit fts zählen auch Teilstring-Suchen
+    ab 3 Zeichen (Trigram-Index files_fts) als indiziert. Für den TSV-Scan
+    (use_index=False) wird nur die Auswertungsreihenfolge bestimmt.
+    """
+    ordered = order_node(node, stats)
+    conjuncts = ordered[1] if ordered[0] == 'and' else (ordered,)
+
+    candidates = [c for c in conjuncts if is_indexed(c, fts)] if use_index else []
+    driver = None
+    if candidates:
+        best = min(candidates, key=lambda c: estimate_selectivity(c, stats))
+        if estimate_selectivity(best, stats) <= INDEX_SELECTIVITY_LIMIT:
+            driver = best
+
+    if driver is not None and ordered[0] == 'and':
+        # Index-Einstieg an den Anfang, Rest bleibt in Kostenreihenfolge
+        rest = tuple(c for c in conjuncts if c is not driver)
+        ordered = ('and', (driver,) + rest)
+
+    return QueryPlan(ordered, driver, stats, use_index, fts)
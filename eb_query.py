@@ -0,0 +1,466 @@
+#!/usr/bin/env python3
+"""
+eb_query.py - Parser und Compiler für die eb-Abfragesprache
+Die Query wird genau EINMAL geparst und in eine Prädikat-Funktion übersetzt,
+die danach pro TSV-Zeile nur noch Python-Vergleiche ausführt.
+"""
+
+import calendar
+import re
+from datetime import date
+from functools import lru_cache
+
+from eb_collections import load_collections
+
+FIELD_MAP = {
+    "datum": 0,
+    "pfad": 2,
+    "sammlung": 2,  # über den Pfad aufgelöst, siehe eb_collections.py
+    "name": 3,
+    "ext": 4,
+    "size": 5,
+    "dateidatum": 6,
+}
+
+FIELD_ALIASES = {
+    "dateiname": "name",
+    "docdatum": "datum",
+    "path": "pfad",
+    "collection": "sammlung",
+    "dateiaenderung": "dateidatum",
+    "groesse": "size",
+    "größe": "size",
+}
+
+# Felder mit Datumsbereichen (Tagesnummern work_day/file_day in der DB)
+DATE_FIELDS = ("datum", "dateidatum")
+DATE_RANGE_SEPARATOR = ".."
+DATE_RE = re.compile(r'(\d{4})(?:-(\d{1,2})(?:-(\d{1,2}))?)?')
+
+TAG_DEFS = {
+    "#text": {"pdf", "doc", "docx", "txt", "djvu", "odt"},
+    "#audio": {"mp3", "wav", "flac", "ogg", "m4a"},
+    "#image": {"jpg", "jpeg", "png", "gif", "bmp", "svg", "tiff"},
+}
+
+# Dateityp-Kategorien des SQLite-Preprocessors (Tabelle file_types)
+FILE_TYPE_DEFS = {
+    "text": {"pdf", "doc", "docx", "txt", "djvu", "odt", "rtf", "html", "htm", "epub", "mobi",
+             "tex", "md", "chm", "shtml", "mht", "url", "memo", "wps", "hlp", "man", "info",
+             "rst", "ods", "xls", "xlsx", "csv", "tsv"},
+    "audio": {"mp3", "wav", "flac", "ogg", "m4a", "aac", "wma", "opus", "mp2", "ra", "rm", "au",
+              "mid", "midi", "frf", "m3u", "ram", "aiff", "cda"},
+    "graphik": {"jpg", "jpeg", "png", "gif", "bmp", "svg", "tiff", "tif", "webp", "ico",
+                "psd", "raw", "cr2", "nef", "pcx", "emz", "thm", "eps", "wmf", "emf", "pct", "pic"},
+    "video": {"mp4", "avi", "mkv", "mov", "wmv", "flv", "webm", "m4v", "3gp", "ogv", "rm",
+              "asf", "vob", "bup", "ifo", "mpg", "mpeg", "divx", "xvid", "ogm"}
+}
+FILE_TYPES = ("text", "audio", "graphik", "video", "sonstige")
+FILE_TYPE_IDS = {name: type_id for type_id, name in enumerate(FILE_TYPES)}  # Spalte files.type_id
+
+# Extension -> Kategorie (erste passende Kategorie gewinnt, z.B. rm -> audio)
+EXTENSION_FILE_TYPES = {}
+for _file_type, _extensions in FILE_TYPE_DEFS.items():
+    for _ext in _extensions:
+        EXTENSION_FILE_TYPES.setdefault(_ext, _file_type)
+
+
+def get_file_type(extension):
+    """Ordnet eine Extension einer Dateityp-Kategorie zu"""
+    return EXTENSION_FILE_TYPES.get(extension.lower(), "sonstige")
+
+
+@lru_cache(maxsize=65536)
+def parse_day(text):
+    """
+    Tagesnummer (date.toordinal) eines Datums-Textes wie in der TSV-Liste:
+    '2023-03-15', '2023-03-15 10:00', '2023-03' oder '2023'. Unvollständige
+    Angaben zählen als erster Tag des Monats bzw. Jahres.
+
+    Returns:
+        int oder None, wenn der Text mit keinem gültigen Datum beginnt
+    """
+    match = DATE_RE.match(text) if text else None
+    if not match:
+        return None
+    year, month, day = (int(part) if part else 1 for part in match.groups())
+    try:
+        return date(year, month, day).toordinal()
+    except ValueError:
+        return None
+
+
+def parse_date_bound(text, last=False):
+    """Tagesnummer für 'JJJJ', 'JJJJ-MM' oder 'JJJJ-MM-TT'; mit last der letzte Tag des Zeitraums"""
+    match = DATE_RE.fullmatch(text)
+    if not match:
+        return None
+    year, month, day = match.groups()
+    year = int(year)
+    try:
+        if day:
+            return date(year, int(month), int(day)).toordinal()
+        if month:
+            month = int(month)
+            return date(year, month, calendar.monthrange(year, month)[1] if last else 1).toordinal()
+        return date(year, 12, 31).toordinal() if last else date(year, 1, 1).toordinal()
+    except ValueError:
+        return None
+
+
+def parse_date_range(val):
+    """
+    Wert eines Datumsfelds als Bereich von Tagesnummern:
+    'JJJJ', 'JJJJ-MM', 'JJJJ-MM-TT' oder zwei davon mit '..' (z.B.
+    '1985-03..1986'); eine offene Seite ('..1986') reicht bis zum Rand
+
+    Returns:
+        (erster Tag, letzter Tag) oder None, wenn val kein Datum ist
+    """
+    if DATE_RANGE_SEPARATOR in val:
+        start_text, end_text = val.split(DATE_RANGE_SEPARATOR, 1)
+        first = parse_date_bound(start_text) if start_text else date.min.toordinal()
+        last = parse_date_bound(end_text, last=True) if end_text else date.max.toordinal()
+    else:
+        first, last = parse_date_bound(val), parse_date_bound(val, last=True)
+    if first is None or last is None or first > last:
+        return None
+    return first, last
+
+
+def format_date_range(first, last):
+    """Bereich von Tagesnummern als eb-Feldwert ('2023-03-15' bzw. '1985-03-01..1986-12-31')"""
+    start = date.fromordinal(first).isoformat()
+    return start if first == last else f"{start}{DATE_RANGE_SEPARATOR}{date.fromordinal(last).isoformat()}"
+
+
+# Größenangaben für size: (Binärpräfixe wie im Dateimanager)
+SIZE_UNITS = {"": 1, "b": 1, "k": 1024, "kb": 1024, "m": 1024 ** 2, "mb": 1024 ** 2,
+              "g": 1024 ** 3, "gb": 1024 ** 3, "t": 1024 ** 4, "tb": 1024 ** 4}
+SIZE_RE = re.compile(r'(\d+(?:[.,]\d+)?)\s*([kmgt]?b?)')
+SIZE_MAX = 2 ** 63 - 1  # größter SQLite-INTEGER
+
+
+def parse_size(text):
+    """'10MB', '1.5gb', '512' -> Bytes (int) oder None"""
+    match = SIZE_RE.fullmatch(text.strip().lower())
+    if not match:
+        return None
+    number, unit = match.groups()
+    return int(float(number.replace(',', '.')) * SIZE_UNITS[unit])
+
+
+def parse_size_range(val):
+    """
+    Wert des Felds size: als Bereich in Bytes (jeweils einschließlich):
+    '>10MB', '>=1GB', '<100kb', '<=2mb', '100KB..2MB' (offene Seite
+    erlaubt) oder eine genaue Größe
+
+    Returns:
+        (minimum, maximum) oder None, wenn val keine Größenangabe ist
+    """
+    for operator, make_range in (('>=', lambda n: (n, SIZE_MAX)), ('<=', lambda n: (0, n)),
+                                 ('>', lambda n: (n + 1, SIZE_MAX)), ('<', lambda n: (0, n - 1))):
+        if val.startswith(operator):
+            size = parse_size(val[len(operator):])
+            return make_range(size) if size is not None else None
+    if DATE_RANGE_SEPARATOR in val:
+        low_text, high_text = val.split(DATE_RANGE_SEPARATOR, 1)
+        low = parse_size(low_text) if low_text else 0
+        high = parse_size(high_text) if high_text else SIZE_MAX
+        if low is None or high is None or low > high:
+            return None
+        return low, high
+    size = parse_size(val)
+    return (size, size) if size is not None else None
+
+
+def format_size(size):
+    """Bytes lesbar, z.B. 1536 -> '1.5 KB'"""
+    if size is None:
+        return "-"
+    for unit in ("B", "KB", "MB", "GB"):
+        if abs(size) < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} TB"
+
+
+OPERATORS = {
+    "and": "and", "&": "and",
+    "or": "or", "|": "or",
+    "not": "not", "!": "not", "~": "not",
+}
+
+# Klammer, Anführungszeichen-String, "feld:" vor einem Anführungszeichen oder Wort
+TOKEN_RE = re.compile(r'\s*(?:(\()|(\))|"([^"]*)"|\'([^\']*)\'|([^\s()"\']*:(?=["\'])|[^\s()]+))')
+
+
+class QuerySyntaxError(ValueError):
+    """Fehler beim Parsen einer eb-Query"""
+
+
+def tokenize(query):
+    """
+    Zerlegt eine Query in Tokens
+
+    Returns:
+        Liste von (typ, wert)-Tupeln mit typ in
+        'lpar', 'rpar', 'and', 'or', 'not', 'word'
+    """
+    tokens = []
+    pos = 0
+    query = query.strip()
+    while pos < len(query):
+        match = TOKEN_RE.match(query, pos)
+        if not match or match.end() == pos:
+            raise QuerySyntaxError(f"Unerwartetes Zeichen an Position {pos}: '{query[pos:]}'")
+        pos = match.end()
+        lpar, rpar, dquoted, squoted, word = match.groups()
+        if lpar:
+            tokens.append(('lpar', lpar))
+        elif rpar:
+            tokens.append(('rpar', rpar))
+        elif dquoted is not None or squoted is not None:
+            tokens.append(('word', dquoted if dquoted is not None else squoted))
+        else:
+            op = OPERATORS.get(word.lower())
+            if op:
+                tokens.append((op, word))
+            else:
+                # field:"wert mit leerzeichen" zusammenführen
+                if word.endswith(':') and pos < len(query) and query[pos] in '"\'':
+                    quote = query[pos]
+                    end = query.find(quote, pos + 1)
+                    if end == -1:
+                        raise QuerySyntaxError(f"Fehlendes schließendes {quote} in '{query}'")
+                    word = word + query[pos + 1:end]
+                    pos = end + 1
+                tokens.append(('word', word))
+    return tokens
+
+
+def literal_search_term(query):
+    """
+    Erkennt einfache Suchen ohne Operatoren, Felder und Tags
+
+    Operatoren zählen nur als eigenständige Wörter ("notes" ist keine
+    NOT-Query). Anführungszeichen werden entfernt, Bindestriche bleiben.
+
+    Returns:
+        Suchbegriff für die Volltextsuche in der Zeile oder None
+    """
+    try:
+        tokens = tokenize(query)
+    except QuerySyntaxError:
+        return None
+    words = []
+    for kind, value in tokens:
+        if kind != 'word':
+            return None
+        if value.startswith('#') or (':' in value and value.split(':', 1)[0].isalpha()):
+            return None
+        words.append(value)
+    return ' '.join(words) or None
+
+
+def make_leaf(word):
+    """Erstellt den AST-Knoten für ein einzelnes Wort"""
+    lit = word.lower()
+    if lit in TAG_DEFS:
+        return ('tag', lit)
+    if ':' in lit:
+        field, val = lit.split(':', 1)
+        field = FIELD_ALIASES.get(field, field)
+        return ('field', field, val)
+    return ('term', lit)
+
+
+@lru_cache(maxsize=256)
+def parse_query(query):
+    """
+    Parst eine eb-Query in einen AST aus Tupeln:
+
+        ('and', (kinder...)), ('or', (kinder...)), ('not', kind),
+        ('field', feld, wert), ('tag', '#text'), ('term', wert)
+
+    Zusätzlich kennt der Compiler ('type', kategorie) für die
+    Dateityp-Kategorien aus FILE_TYPE_DEFS und ('text', wert) für die
+    Teilstring-Suche in Pfad + Dateiname (beide werden von der GUI erzeugt).
+
+    Präzedenz: NOT vor AND vor OR. Nebeneinanderstehende Begriffe
+    ohne Operator werden mit AND verknüpft.
+    """
+    tokens = tokenize(query)
+    if not tokens:
+        raise QuerySyntaxError("Leere Query")
+    pos = 0
+
+    def peek():
+        return tokens[pos][0] if pos < len(tokens) else None
+
+    def parse_or():
+        nonlocal pos
+        children = [parse_and()]
+        while peek() == 'or':
+            pos += 1
+            children.append(parse_and())
+        return children[0] if len(children) == 1 else ('or', tuple(children))
+
+    def parse_and():
+        nonlocal pos
+        children = [parse_not()]
+        while peek() in ('and', 'not', 'word', 'lpar'):
+            if peek() == 'and':
+                pos += 1
+            children.append(parse_not())
+        return children[0] if len(children) == 1 else ('and', tuple(children))
+
+    def parse_not():
+        nonlocal pos
+        if peek() == 'not':
+            pos += 1
+            return ('not', parse_not())
+        return parse_atom()
+
+    def parse_atom():
+        nonlocal pos
+        kind = peek()
+        if kind == 'lpar':
+            pos += 1
+            node = parse_or()
+            if peek() != 'rpar':
+                raise QuerySyntaxError(f"Fehlende schließende Klammer in '{query}'")
+            pos += 1
+            return node
+        if kind == 'word':
+            pos += 1
+            return make_leaf(tokens[pos - 1][1])
+        if kind is None:
+            raise QuerySyntaxError(f"Unerwartetes Ende der Query '{query}'")
+        raise QuerySyntaxError(f"Unerwartetes Token '{tokens[pos][1]}' in '{query}'")
+
+    node = parse_or()
+    if pos != len(tokens):
+        raise QuerySyntaxError(f"Unerwartetes Token '{tokens[pos][1]}' in '{query}'")
+    return node
+
+
+def compile_node(node):
+    """Übersetzt einen AST-Knoten in eine Funktion row -> bool"""
+    kind = node[0]
+
+    if kind == 'and':
+        preds = tuple(compile_node(child) for child in node[1])
+        return lambda row: all(p(row) for p in preds)
+
+    if kind == 'or':
+        preds = tuple(compile_node(child) for child in node[1])
+        return lambda row: any(p(row) for p in preds)
+
+    if kind == 'not':
+        pred = compile_node(node[1])
+        return lambda row: not pred(row)
+
+    if kind == 'tag':
+        extensions = frozenset(TAG_DEFS[node[1]])
+        idx = FIELD_MAP["ext"]
+        return lambda row: len(row) > idx and row[idx].lower() in extensions
+
+    if kind == 'type':
+        file_type = node[1]
+        idx = FIELD_MAP["ext"]
+        return lambda row: len(row) > idx and EXTENSION_FILE_TYPES.get(row[idx].lower(), "sonstige") == file_type
+
+    if kind == 'text':
+        val = node[1]
+        return lambda row: len(row) > 3 and val in f"{row[2]} {row[3]}".lower()
+
+    if kind == 'field':
+        field, val = node[1], node[2]
+        idx = FIELD_MAP.get(field)
+        if idx is None:
+            return lambda row: False
+        if field in DATE_FIELDS:
+            day_range = parse_date_range(val)
+            if day_range is not None:
+                first, last = day_range
+                return lambda row: len(row) > idx and first <= (parse_day(row[idx]) or 0) <= last
+        if field == 'size':
+            size_range = parse_size_range(val)
+            if size_range is None:
+                return lambda row: False
+            low, high = size_range
+            return lambda row: len(row) > idx and row[idx].isdigit() and low <= int(row[idx]) <= high
+        if field == 'sammlung':
+            collections = load_collections()
+            return lambda row: len(row) > idx and getattr(collections.resolve(row[idx]), 'name', '').lower() == val
+        if field == 'pfad' and val.startswith('/'):
+            # Absoluter Pfad: das Verzeichnis selbst und alle Unterordner
+            val = val.rstrip('/')
+            prefix = val + '/'
+            return lambda row: len(row) > idx and (row[idx].lower() == val or row[idx].lower().startswith(prefix))
+        return lambda row: len(row) > idx and val in row[idx].lower()
+
+    if kind == 'term':
+        # Exakter Vergleich mit einem Spaltenwert (bzw. Tag-Name) wie bisher
+        lit = node[1]
+        return lambda row: any(lit == cell.lower() for cell in row)
+
+    raise QuerySyntaxError(f"Unbekannter Knotentyp: {kind}")
+
+
+def required_literals(node):
+    """
+    Ermittelt Literale, von denen jede passende Zeile mindestens eines
+    (kleingeschrieben) enthalten muss - für die Vorauswahl im TSV-Scan
+
+    Returns:
+        Tupel von Strings oder None, wenn keine Aussage möglich ist
+    """
+    kind = node[0]
+
+    if kind == 'and':
+        # Das längste Pflicht-Literal schließt die meisten Zeilen aus
+        candidates = [lits for lits in map(required_literals, node[1]) if lits]
+        if not candidates:
+            return None
+        return max(candidates, key=lambda lits: min(len(lit) for lit in lits))
+
+    if kind == 'or':
+        alternatives = []
+        for child in node[1]:
+            lits = required_literals(child)
+            if not lits:
+                return None
+            alternatives.extend(lits)
+        return tuple(dict.fromkeys(alternatives))
+
+    if kind in ('field', 'text', 'term'):
+        if kind == 'field' and node[1] in ('sammlung', 'size'):
+            return None  # Sammlungsname bzw. Größenbereich steht nicht wörtlich in der Zeile
+        val = node[-1]
+        if kind == 'field' and node[1] in DATE_FIELDS and parse_date_range(val):
+            # Jede Zeile im Bereich beginnt mit ihrem Jahr
+            first, last = parse_date_range(val)
+            start_year, end_year = date.fromordinal(first).year, date.fromordinal(last).year
+            return (str(start_year),) if start_year == end_year and start_year >= 1000 else None
+        if kind == 'field' and node[1] == 'pfad' and val.startswith('/'):
+            val = val.rstrip('/')  # das Verzeichnis selbst steht ohne / in der Zeile
+        # Nur ASCII: bytes.lower() faltet keine Umlaute.
+        # Bei 'text' steht zwischen Pfad und Name in der Zeile ein Tab statt Leerzeichen.
+        if val and val.isascii() and not (kind == 'text' and ' ' in val):
+            return (val,)
+
+    return None
+
+
+@lru_cache(maxsize=256)
+def compile_query(query):
+    """
+    Parst und kompiliert eine eb-Query einmalig
+
+    Returns:
+        Funktion row -> bool für TSV-Zeilen (Liste von Spaltenwerten)
+    """
+    return compile_node(parse_query(query))
@@ -0,0 +1,648 @@
+#!/usr/bin/env python3
+"""
+eb_sql.py - Übersetzt eb-Queries in parametrisiertes SQL für die SQLite-DB
+Die DB wird von ebib_preprocessor.py aus der TSV-Liste aufgebaut.
+"""
+
+import hashlib
+import itertools
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+
+from eb_query import FILE_TYPE_IDS, QuerySyntaxError, parse_date_range, parse_query, parse_size_range
+
+SQLITE_DB = Path(os.environ.get('EBIB_SQLITE_PATH', Path.home() / 'Documents' / 'ebib_search.db'))
+
+# eb-Tags -> Dateityp-Kategorien des Preprocessors (Tabelle file_types)
+TAG_FILE_TYPES = {
+    "#text": ("text",),
+    "#audio": ("audio",),
+    "#image": ("graphik",),
+}
+
+# FTS5-Trigram-Index über Dateiname und Pfad (ebib_preprocessor.py)
+FTS_TABLE = "files_fts"
+FTS_MIN_LENGTH = 3  # Trigramme brauchen mindestens 3 Zeichen
+
+# Version des DB-Schemas (meta.schema_version); ältere DBs werden neu aufgebaut
+# 2: size INTEGER, hash als 16-Byte-BLOB, Extension-Wörterbuch, type_id,
+#    link nur gespeichert, wenn er nicht aus Pfad + Dateiname folgt
+# 3: Verzeichnis-Wörterbuch directories (files.dir_id) mit Teilbaum-Summen
+# 4: Sammlung je Datei (files.collection_id, Tabelle collections)
+# 5: Tagesnummern work_day/file_day für Datumsbereiche
+# 6: md5-Gruppen (md5_groups) und files.copy_rank für Duplikate
+SCHEMA_VERSION = 6
+
+# Datumsfelder -> (Spalte mit Tagesnummer, Textspalte für Teilstring-Suchen)
+DATE_COLUMNS = {
+    "datum": ("work_day", "date_of_work"),
+    "dateidatum": ("file_day", "date"),
+}
+
+# Stichproben für den Inhalts-Fingerabdruck der TSV-Datei (Anfang, Mitte, Ende)
+FINGERPRINT_SAMPLE = 64 * 1024
+
+PAGE_SIZE = 1000  # Zeilen je Seite der ResultCursor
+PAGE_CACHE_SIZE = 20  # zwischengespeicherte Seiten je ResultCursor (Scrollen in der GUI)
+
+# SQLite-VM-Schritte zwischen zwei Prüfungen des Abbruch-Signals (siehe cancellable);
+# auch ein voller LIKE-Scan bricht so nach wenigen Millisekunden ab
+CANCEL_CHECK_STEPS = 1000
+
+# Sortierbare Spalten der Trefferliste (ResultCursor.sorted_by) -> SQL-Ausdruck;
+# ohne Datum steht 0 in work_day/file_day, ohne Größe sortiert -1 zuerst
+SORT_EXPRESSIONS = {
+    "datum": "work_day",
+    "name": "filename COLLATE NOCASE",
+    "ext": "extension_lower",
+    "size": "COALESCE(size, -1)",
+    "dateidatum": "file_day",
+    "pfad": "path COLLATE NOCASE",
+}
+
+# Hyperlink, wie ihn die TSV-Liste für path/filename enthält (siehe derive_link)
+LINK_SQL = """'=HYPERLINK("file://' || path || '/' || filename || '";"' || filename || '")'"""
+
+# Ausdrücke in TSV-Reihenfolge: datum, hyperlink, pfad, name, ext, größe, datum, md5
+ROW_EXPRESSIONS = (
+    "date_of_work",
+    f"COALESCE(link, {LINK_SQL})",
+    "path",
+    "filename",
+    "extension",
+    "size",
+    "date",
+    "CASE WHEN typeof(hash) = 'blob' THEN lower(hex(hash)) ELSE hash END",
+)
+ROW_COLUMNS = ", ".join(ROW_EXPRESSIONS)
+
+# Zeilenquelle für ROW_COLUMNS: files plus Verzeichnis- und Extension-Wörterbuch
+# (Spaltennamen überschneiden sich nicht)
+ROW_SOURCE = "files JOIN directories USING (dir_id) JOIN extensions USING (ext_id)"
+
+
+# Anzahl, Anzahl ohne md5-Duplikate, Summe und Durchschnitt der Größe;
+# Texte (ungültige Größen) zählen nicht mit
+AGGREGATE_COLUMNS = ("COUNT(*), "
+                     "COALESCE(SUM(copy_rank = 0), 0) + COUNT(DISTINCT CASE WHEN copy_rank > 0 THEN hash END), "
+                     "SUM(CASE WHEN typeof(size) = 'integer' THEN size END), "
+                     "AVG(CASE WHEN typeof(size) = 'integer' THEN size END)")
+
+
+def derive_link(path, filename):
+    """Hyperlink-Spalte der TSV-Liste; der Preprocessor speichert nur Abweichungen davon"""
+    return f'=HYPERLINK("file://{path}/{filename}";"{filename}")'
+
+
+def escape_like(value):
+    """Maskiert LIKE-Sonderzeichen (ESCAPE '\\')"""
+    return value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+def like_patterns(value, max_variants=16):
+    """
+    LIKE-Muster '%value%'. SQLite ignoriert Groß-/Kleinschreibung nur bei
+    ASCII, daher je eine Variante pro Schreibweise der Umlaute (Ä/ä, ...).
+    """
+    options = [(c.lower(), c.upper()) if not c.isascii() and c.lower() != c.upper() else (c,) for c in value]
+    variants = [''.join(combo) for combo in itertools.islice(itertools.product(*options), max_variants + 1)]
+    if len(variants) > max_variants:
+        variants = [value]
+    return [f"%{escape_like(variant)}%" for variant in variants]
+
+
+def like_any(columns, value):
+    """(sql, params): eine der Spalten enthält value (siehe like_patterns)"""
+    patterns = like_patterns(value)
+    sql = " OR ".join(f"{column} LIKE ? ESCAPE '\\'" for _ in patterns for column in columns)
+    return sql, [pattern for pattern in patterns for _ in columns]
+
+
+def is_fts_searchable(node):
+    """Kann der Knoten über den Trigram-Index files_fts beantwortet werden?"""
+    if node[0] == 'text':
+        return len(node[1]) >= FTS_MIN_LENGTH
+    if node[0] == 'field' and node[1] == 'name':
+        return len(node[2]) >= FTS_MIN_LENGTH
+    return False
+
+
+def fts_phrase(value, column=None):
+    """Baut einen FTS5-MATCH-Ausdruck für einen Teilstring (optional auf eine Spalte beschränkt)"""
+    phrase = '"' + value.replace('"', '""') + '"'
+    return f"{column} : {phrase}" if column else phrase
+
+
+def has_fts_index(conn):
+    """Prüft, ob die DB den Trigram-Index enthält (ältere DBs haben ihn nicht)"""
+    row = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (FTS_TABLE,)).fetchone()
+    return row is not None
+
+
+def node_to_sql(node, plan=None, fts=False):
+    """
+    Übersetzt einen AST-Knoten aus eb_query.parse_query in SQL
+
+    Args:
+        node: AST-Knoten
+        plan: Optionaler eb_planner.QueryPlan. Dann wird nur plan.driver über
+              seinen Index ausgewertet; bei allen anderen indizierten Spalten
+              verhindert ein unäres + die Indexnutzung.
+        fts: Teilstring-Suchen ab FTS_MIN_LENGTH Zeichen über files_fts beantworten
+
+    Returns:
+        (sql, params) - WHERE-Fragment und Parameterliste
+    """
+    kind = node[0]
+    if plan is not None and node is plan.driver:
+        plan = None  # Index-Einstieg: unverändert übersetzen
+    col = '+' if plan is not None else ''
+
+    if kind in ('and', 'or'):
+        parts = [node_to_sql(child, plan, fts) for child in node[1]]
+        sql = f" {kind.upper()} ".join(f"({part_sql})" for part_sql, _ in parts)
+        params = [p for _, part_params in parts for p in part_params]
+        return sql, params
+
+    if kind == 'not':
+        sql, params = node_to_sql(node[1], plan, fts)
+        return f"NOT ({sql})", params
+
+    if kind == 'rowids':
+        # Bereits aufgelöste Treffer, z.B. aus eb_tokens.lookup_words
+        return f"{col}id IN (SELECT value FROM json_each(?))", [json.dumps(list(node[1]))]
+
+    if fts and is_fts_searchable(node):
+        column = 'filename' if kind == 'field' else None
+        return (f"{col}id IN (SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH ?)",
+                [fts_phrase(node[-1], column)])
+
+    if kind == 'tag':
+        types = TAG_FILE_TYPES.get(node[1], ())
+        if not types:
+            return "0", []
+        return f"{col}type_id IN ({', '.join('?' * len(types))})", [FILE_TYPE_IDS[t] for t in types]
+
+    if kind == 'type':
+        return f"{col}type_id = ?", [FILE_TYPE_IDS.get(node[1], -1)]
+
+    if kind == 'text':
+        return like_any(('filename', 'path'), node[1])
+
+    if kind == 'field':
+        field, val = node[1], node[2]
+        if field == 'name':
+            return like_any(('filename',), val)
+        if field == 'pfad':
+            return directory_to_sql(val, col)
+        if field == 'size':
+            size_range = parse_size_range(val)
+            if size_range is None:
+                return "0", []
+            # IS NOT NULL: ohne Größe ist das Prädikat falsch statt NULL (wichtig unter NOT)
+            return f"{col}size BETWEEN ? AND ? AND size IS NOT NULL", list(size_range)
+        if field == 'sammlung':
+            # Beim Aufbau per längstem Pfad-Präfix aufgelöst (eb_collections.py)
+            return f"{col}collection_id IN (SELECT collection_id FROM collections WHERE name_lower = ?)", [val]
+        if field == 'ext':
+            # Das Wörterbuch ist winzig; der Index liegt auf files.ext_id
+            return f"{col}ext_id IN (SELECT ext_id FROM extensions WHERE extension_lower = ?)", [val.lstrip('.')]
+        if field in DATE_COLUMNS:
+            day_column, text_column = DATE_COLUMNS[field]
+            day_range = parse_date_range(val)
+            if day_range is not None:
+                # Jahr, Monat, Tag oder Bereich als Indexbereich über die Tagesnummer
+                return f"{col}{day_column} BETWEEN ? AND ?", list(day_range)
+            return f"{text_column} LIKE ? ESCAPE '\\'", [f"%{escape_like(val)}%"]
+        return "0", []
+
+    if kind == 'term':
+        # Exakter Vergleich mit einem Spaltenwert wie im TSV-Modus
+        return f"? IN ({', '.join(f'lower({expr})' for expr in ROW_EXPRESSIONS)})", [node[1]]
+
+    raise QuerySyntaxError(f"Unbekannter Knotentyp: {kind}")
+
+
+def directory_to_sql(val, col=''):
+    """
+    pfad:-Feld über das Verzeichnis-Wörterbuch
+
+    Absolute Pfade (/archiv/2023) treffen das Verzeichnis samt Unterordnern:
+    ein Präfixbereich über idx_directories_path_lower, '0' folgt in der
+    Sortierung direkt auf '/'. Alles andere ist eine Teilstring-Suche, die
+    nur die (wenigen) Verzeichnisse statt aller Dateien durchsucht.
+    """
+    if val.startswith('/'):
+        val = val.rstrip('/')
+        return (f"{col}dir_id IN (SELECT dir_id FROM directories "
+                f"WHERE path_lower = ? OR (path_lower >= ? AND path_lower < ?))",
+                [val, val + '/', val + '0'])
+    return (f"{col}dir_id IN (SELECT dir_id FROM directories WHERE path_lower LIKE ? ESCAPE '\\')",
+            [f"%{escape_like(val)}%"])
+
+
+def unique_filter(where, params):
+    """
+    Bedingung, die von mehreren Treffern mit gleichem md5 nur den mit dem
+    kleinsten files.copy_rank (Sammlungs-Priorität, vom Preprocessor
+    berechnet) durchlässt. Einzige Kopien (copy_rank 0) brauchen keinen
+    Vergleich; nur Treffer aus md5_groups werden gruppiert.
+
+    Returns:
+        (sql, params)
+    """
+    sql = (f"(copy_rank = 0 OR id IN (SELECT id FROM ("
+           f"SELECT id, ROW_NUMBER() OVER (PARTITION BY hash ORDER BY copy_rank) AS copy "
+           f"FROM {ROW_SOURCE} WHERE copy_rank > 0 AND ({where})) WHERE copy = 1))")
+    return sql, list(params)
+
+
+def build_where(node, plan=None, fts=False, unique=False):
+    """
+    WHERE-Bedingung für einen AST-Knoten (None = alle Zeilen).
+    Mit plan wird dessen geordneter AST (plan.node) und plan.fts verwendet,
+    mit unique bleibt je md5 nur die bevorzugte Kopie (siehe unique_filter).
+
+    Returns:
+        (sql oder None ohne Bedingung, params)
+    """
+    if plan is not None:
+        node = plan.node
+        fts = plan.fts
+    if node is None:
+        # ohne Filter bleibt die kanonische Kopie jeder Gruppe
+        return ("copy_rank <= 1" if unique else None), []
+    where, params = node_to_sql(node, plan, fts)
+    if unique:
+        unique_sql, unique_params = unique_filter(where, params)
+        where, params = f"({where}) AND {unique_sql}", params + unique_params
+    return where, params
+
+
+def build_select(node, plan=None, limit=None, fts=False, unique=False):
+    """
+    Baut die SELECT-Anweisung für einen AST-Knoten (None = alle Zeilen),
+    Parameter wie build_where
+
+    Returns:
+        (sql, params)
+    """
+    sql = f"SELECT {ROW_COLUMNS} FROM {ROW_SOURCE}"
+    where, params = build_where(node, plan, fts, unique)
+    if where is not None:
+        sql += f" WHERE {where}"
+    sql += " ORDER BY id"
+    if limit:
+        sql += f" LIMIT {int(limit)}"
+    return sql, params
+
+
+def build_aggregate(node, plan=None, fts=False):
+    """
+    Wie build_select, liefert aber nur Anzahl, Anzahl ohne md5-Duplikate,
+    Summe und Durchschnitt der Größe aller Treffer (ohne LIMIT) in einer Zeile
+
+    Returns:
+        (sql, params)
+    """
+    if plan is not None:
+        node = plan.node
+        fts = plan.fts
+    sql = f"SELECT {AGGREGATE_COLUMNS} FROM {ROW_SOURCE}"
+    params = []
+    if node is not None:
+        where, params = node_to_sql(node, plan, fts)
+        sql += f" WHERE {where}"
+    return sql, params
+
+
+class ResultCursor:
+    """
+    Trefferliste mit Keyset-Paginierung: jede Seite ist eine eigene Abfrage
+    '(sortierschlüssel, id) > letzter Schlüssel ORDER BY ... LIMIT n', die
+    erste Seite steht also nach wenigen Millisekunden bereit, weitere werden
+    erst beim Weiterblättern bzw. Scrollen (rows_at) geholt; der Export
+    iteriert in einer gestreamten Abfrage.
+    Sortiert wird in SQL (SORT_EXPRESSIONS, sorted_by), ohne Sortierung
+    nach files.id. Die Gesamtzahl kommt getrennt über totals() (exakt, eine
+    Aggregat-Abfrage) oder estimate() (Planer). Zeilen im TSV-Format.
+    """
+
+    def __init__(self, conn, node=None, plan=None, fts=False, unique=False, page_size=PAGE_SIZE,
+                 order=None, descending=False):
+        self.conn = conn
+        self.node = node
+        self.plan = plan
+        self.fts = fts
+        self.unique = unique
+        self.page_size = page_size
+        self.order = order
+        self.descending = descending
+        self.where, self.params = build_where(node, plan, fts, unique)
+        key_columns = [SORT_EXPRESSIONS[order], "id"] if order else ["id"]
+        direction = " DESC" if descending else ""
+        self.key_sql = ", ".join(key_columns)
+        self.key_count = len(key_columns)
+        self.order_sql = ", ".join(column + direction for column in key_columns)
+        self.after_sql = f"({self.key_sql}) {'<' if descending else '>'} ({', '.join('?' * self.key_count)})"
+        self.last_key = None      # Keyset für next_page()
+        self.exhausted = False
+        self._pages = OrderedDict()  # Seitennummer -> Zeilen, höchstens PAGE_CACHE_SIZE
+        self._page_keys = {}         # Seitennummer -> Schlüssel der letzten Zeile
+        self._totals = None
+
+    def sorted_by(self, order, descending=False):
+        """Dieselbe Trefferliste in anderer Sortierung (order: Schlüssel aus SORT_EXPRESSIONS oder None)"""
+        cursor = ResultCursor(self.conn, self.node, self.plan, self.fts, self.unique, self.page_size,
+                              order, descending)
+        cursor._totals = self._totals
+        return cursor
+
+    def select_sql(self, after_key=None, limit=None, offset=0):
+        """
+        SELECT mit Schlüsselspalten vor ROW_COLUMNS, ab after_key bzw. offset
+
+        Returns:
+            (sql, params)
+        """
+        conditions = [f"({self.where})"] if self.where else []
+        params = list(self.params)
+        if after_key is not None:
+            conditions.append(self.after_sql)
+            params.extend(after_key)
+        sql = f"SELECT {self.key_sql}, {ROW_COLUMNS} FROM {ROW_SOURCE}"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += f" ORDER BY {self.order_sql}"
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+            if offset:
+                sql += f" OFFSET {int(offset)}"
+        return sql, params
+
+    def fetch_page(self, after_key=None, size=None, offset=0):
+        """
+        Eine Seite nach dem Schlüssel after_key (None = von vorn), ohne
+        Schlüssel optional ab Zeile offset
+
+        Returns:
+            (Zeilen im TSV-Format, Schlüssel der letzten Zeile oder None ohne Zeilen)
+        """
+        sql, params = self.select_sql(after_key, size or self.page_size, 0 if after_key else offset)
+        rows = self.conn.execute(sql, params).fetchall()
+        last_key = tuple(rows[-1][:self.key_count]) if rows else None
+        return [[("" if v is None else str(v)) for v in row[self.key_count:]] for row in rows], last_key
+
+    def page(self, index):
+        """
+        Seite index (zwischengespeichert). Ist der Schlüssel der vorigen
+        Seite bekannt, per Keyset, sonst einmalig per OFFSET (Sprung mit
+        dem Scrollbalken)
+        """
+        if index in self._pages:
+            self._pages.move_to_end(index)
+            return self._pages[index]
+        if index == 0:
+            rows, last_key = self.fetch_page()
+        elif index - 1 in self._page_keys:
+            rows, last_key = self.fetch_page(self._page_keys[index - 1])
+        else:
+            rows, last_key = self.fetch_page(offset=index * self.page_size)
+        if last_key is not None:
+            self._page_keys[index] = last_key
+        self._pages[index] = rows
+        if len(self._pages) > PAGE_CACHE_SIZE:
+            self._pages.popitem(last=False)
+        return rows
+
+    def rows_at(self, offset, limit):
+        """Zeilen offset bis offset + limit (für eine virtuelle Tabelle)"""
+        rows = []
+        index, skip = divmod(offset, self.page_size)
+        while len(rows) < limit:
+            page = self.page(index)
+            rows.extend(page[skip:skip + limit - len(rows)])
+            if len(page) < self.page_size:
+                break
+            index += 1
+            skip = 0
+        return rows
+
+    def first_page(self):
+        """Erste Seite (zwischengespeichert)"""
+        start_time = time.time()
+        rows = self.page(0)
+        print(f"[DEBUG] Erste Seite: {len(rows)} Zeilen in {(time.time() - start_time) * 1000:.1f}ms")
+        return rows
+
+    def next_page(self):
+        """Nächste Seite nach der zuletzt gelieferten; leere Liste am Ende"""
+        if self.exhausted:
+            return []
+        if self.last_key is None:
+            rows, last_key = self.page(0), self._page_keys.get(0)
+        else:
+            rows, last_key = self.fetch_page(self.last_key)
+        if len(rows) < self.page_size:
+            self.exhausted = True
+        if last_key is not None:
+            self.last_key = last_key
+        return rows
+
+    def __iter__(self):
+        """
+        Alle Treffer von vorn (unabhängig von next_page) in einer einzigen,
+        gestreamten Abfrage - für den Export; eine Abfrage je Seite würde
+        bei sortierten Listen die Treffermenge für jede Seite neu sortieren
+        """
+        sql, params = self.select_sql()
+        for row in self.conn.execute(sql, params):
+            yield [("" if v is None else str(v)) for v in row[self.key_count:]]
+
+    def totals(self):
+        """
+        Exakte Kennzahlen aller Treffer (zwischengespeichert)
+
+        Returns:
+            (Anzahl, Anzahl ohne md5-Duplikate, Summe, Durchschnitt der Größe)
+        """
+        if self._totals is None:
+            sql, params = build_aggregate(self.node, self.plan, self.fts)
+            self._totals = self.conn.execute(sql, params).fetchone()
+        return self._totals
+
+    def count(self):
+        """Exakte Anzahl der gelieferten Zeilen (mit unique ohne Duplikate)"""
+        totals = self.totals()
+        return totals[1] if self.unique else totals[0]
+
+    def estimate(self):
+        """Geschätzte Trefferzahl aus der Planer-Statistik ohne Abfrage (None ohne Plan)"""
+        return self.plan.estimated_count() if self.plan is not None else None
+
+
+class QueryCancelled(Exception):
+    """Eine Abfrage wurde über ihr Abbruch-Signal (cancellable) unterbrochen"""
+
+
+# Abbruch-Signal der Abfragen des aktuellen Threads; der Progress-Handler läuft
+# im Thread, der die Abfrage ausführt, daher trifft ein Abbruch nur dessen Abfragen
+_cancel_scope = threading.local()
+
+
+def _check_cancelled():
+    token = getattr(_cancel_scope, 'token', None)
+    return 1 if token is not None and token.cancelled else 0
+
+
+def install_cancel_handler(conn):
+    """
+    Richtet auf einer Verbindung den Progress-Handler für cancellable ein.
+    Abfragen außerhalb eines cancellable-Blocks (z.B. Blättern in der GUI)
+    laufen unverändert.
+    """
+    conn.set_progress_handler(_check_cancelled, CANCEL_CHECK_STEPS)
+
+
+@contextmanager
+def cancellable(token):
+    """
+    Abfragen dieses Threads auf Verbindungen mit install_cancel_handler
+    brechen ab, sobald token.cancelled gesetzt ist (z.B.
+    ebib_preprocessor.CancelToken), und lösen dann QueryCancelled aus
+    """
+    previous = getattr(_cancel_scope, 'token', None)
+    _cancel_scope.token = token
+    try:
+        yield token
+    except sqlite3.OperationalError as e:
+        if token.cancelled:
+            raise QueryCancelled("Abfrage abgebrochen") from e
+        raise
+    finally:
+        _cancel_scope.token = previous
+
+
+def query_to_sql(query, plan=None, fts=False, unique=False):
+    """
+    Übersetzt eine eb-Query in eine vollständige SELECT-Anweisung
+
+    Args:
+        query: eb-Query-String oder bereits geparster AST-Knoten
+        plan: Optionaler eb_planner.QueryPlan; bestimmt Reihenfolge und Index
+        fts: Trigram-Index verwenden (ohne plan)
+        unique: Je md5 nur die bevorzugte Kopie
+
+    Returns:
+        (sql, params)
+    """
+    node = parse_query(query) if isinstance(query, str) else query
+    return build_select(node, plan, fts=fts, unique=unique)
+
+
+def read_meta(conn):
+    """Schlüssel/Wert-Paare der Tabelle meta (leer bei älteren DBs)"""
+    try:
+        return dict(conn.execute("SELECT key, value FROM meta").fetchall())
+    except sqlite3.Error:
+        return {}
+
+
+def is_build_complete(conn):
+    """Wurde der Aufbau vollständig abgeschlossen? (vom Preprocessor gesetzt)"""
+    return read_meta(conn).get('complete') == '1'
+
+
+def source_fingerprint(path):
+    """
+    Inhalts-Fingerabdruck der TSV-Datei aus Größe und drei Stichproben
+    (Anfang, Mitte, Ende) - konstanter Aufwand auch bei Gigabyte-Listen
+    """
+    size = os.path.getsize(path)
+    digest = hashlib.blake2b(str(size).encode(), digest_size=16)
+    with open(path, 'rb') as f:
+        for offset in (0, max(size // 2 - FINGERPRINT_SAMPLE // 2, 0), max(size - FINGERPRINT_SAMPLE, 0)):
+            f.seek(offset)
+            digest.update(f.read(FINGERPRINT_SAMPLE))
+    return digest.hexdigest()
+
+
+def check_freshness(meta, source_file=None):
+    """
+    Vergleicht die meta-Werte einer DB in konstanter Zeit mit der TSV-Datei
+
+    Größe und mtime genügen im Normalfall; weicht nur die mtime ab (Kopie
+    aufs NAS), entscheidet der Fingerabdruck.
+
+    Returns:
+        (status, grund) mit status 'ok', 'stale' (TSV geändert, Update
+        möglich) oder 'rebuild' (unvollständig oder altes Schema)
+    """
+    if meta.get('complete') != '1':
+        return 'rebuild', "Aufbau nicht abgeschlossen"
+    if meta.get('schema_version', '1') != str(SCHEMA_VERSION):
+        return 'rebuild', f"Schema-Version {meta.get('schema_version', '1')} statt {SCHEMA_VERSION}"
+    if not source_file or not os.path.exists(source_file):
+        return 'ok', None
+
+    stat = os.stat(source_file)
+    try:
+        same_size = int(meta.get('source_size', -1)) == stat.st_size
+        same_mtime = float(meta.get('source_mtime', -1)) == stat.st_mtime
+    except ValueError:
+        same_size = same_mtime = False
+    if same_size and same_mtime:
+        return 'ok', None
+    if same_size and meta.get('source_fingerprint') == source_fingerprint(source_file):
+        return 'ok', None
+    return 'stale', "TSV-Datei wurde seit dem Aufbau geändert"
+
+
+def open_search_db(db_path=SQLITE_DB, source_file=None):
+    """
+    Öffnet die SQLite-DB, falls sie existiert und aktuell ist
+
+    Returns:
+        (connection, None) oder (None, grund)
+    """
+    db_path = Path(db_path)
+    if not db_path.exists():
+        return None, f"SQLite-DB nicht gefunden: {db_path}"
+
+    try:
+        conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+        conn.execute("SELECT 1 FROM files LIMIT 1").fetchone()
+    except sqlite3.Error as e:
+        return None, f"SQLite-DB nicht lesbar: {e}"
+
+    status, reason = check_freshness(read_meta(conn), source_file)
+    if status != 'ok':
+        conn.close()
+        return None, f"SQLite-DB nicht verwendbar: {reason}"
+
+    return conn, None
+
+
+def open_results(conn, query, plan=None, unique=False):
+    """eb-Query (String oder AST) als ResultCursor; nichts wird vorab geladen"""
+    node = parse_query(query) if isinstance(query, str) else query
+    return ResultCursor(conn, node, plan, fts=has_fts_index(conn), unique=unique)
+
+
+def search_db(conn, query, plan=None, unique=False):
+    """
+    Führt eine eb-Query (String oder AST) gegen die DB aus und liefert Zeilen
+    im TSV-Format; mit unique je md5 nur die bevorzugte Kopie
+    """
+    sql, params = query_to_sql(query, plan, fts=has_fts_index(conn), unique=unique)
+    start_time = time.time()
+    rows = [[("" if v is None else str(v)) for v in row] for row in conn.execute(sql, params)]
+    query_time = (time.time() - start_time) * 1000
+    print(f"[DEBUG] SQLite-Query: {len(rows)} Ergebnisse in {query_time:.1f}ms")
+    return rows
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+eb_tokens.py - Wort-Token-Index über Dateiname und Pfad
+Zerlegt Namen in Tokens (Leerzeichen, _, -, ., Groß-/Kleinschreibung und
+Ziffernwechsel, z.B. BE170459 -> be, 170459) und beantwortet Suchen mit
+mehreren Wörtern über die in SQLite gespeicherten Posting-Listen
+(Tabelle tokens, aufgebaut von ebib_preprocessor.py).
+"""
+
+import re
+import sqlite3
+import sys
+from array import array
+from bisect import bisect_left
+
+# Zusammenhängende Buchstaben/Ziffern; alles andere trennt
+WORD_RE = re.compile(r'[^\W_]+')
+
+POSTING_TYPECODE = 'I'  # uint32 Datei-IDs, aufsteigend sortiert
+
+
+def split_word(word):
+    """Teilt ein Wort an Ziffern- und CamelCase-Grenzen (BE170459 -> BE, 170459)"""
+    parts = []
+    start = 0
+    for i in range(1, len(word)):
+        prev, cur = word[i - 1], word[i]
+        if (prev.isdigit() != cur.isdigit()
+                or (prev.islower() and cur.isupper())
+                or (prev.isupper() and cur.isupper() and i + 1 < len(word) and word[i + 1].islower())):
+            parts.append(word[start:i])
+            start = i
+    parts.append(word[start:])
+    return parts
+
+
+def tokenize_name(text):
+    """
+    Zerlegt Dateiname oder Pfad in kleingeschriebene Tokens
+
+    Zusätzlich zu den Teilen bleibt das ganze Wort erhalten, damit
+    'ebib' auch 'eBib' findet.
+
+    Returns:
+        Liste von Tokens (ohne Duplikate, in Textreihenfolge)
+    """
+    tokens = []
+    for word in WORD_RE.findall(text):
+        parts = split_word(word)
+        tokens.extend(part.lower() for part in parts)
+        if len(parts) > 1:
+            tokens.append(word.lower())
+    return list(dict.fromkeys(tokens))
+
+
+def encode_postings(ids):
+    """Sortierte Datei-IDs -> BLOB (uint32, little endian)"""
+    postings = array(POSTING_TYPECODE, ids)
+    if sys.byteorder == 'big':
+        postings.byteswap()
+    return postings.tobytes()
+
+
+def decode_postings(blob):
+    """BLOB aus encode_postings -> array der Datei-IDs"""
+    postings = array(POSTING_TYPECODE)
+    postings.frombytes(blob)
+    if sys.byteorder == 'big':
+        postings.byteswap()
+    return postings
+
+
+def has_token_index(conn):
+    """Prüft, ob die DB den Token-Index enthält (ältere DBs haben ihn nicht)"""
+    row = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'tokens'").fetchone()
+    return row is not None
+
+
+def prefix_postings(conn, prefix):
+    """
+    Posting-Liste aller Tokens, die mit prefix beginnen (ark -> ark, arkiv, ...)
+
+    Returns:
+        Sortierte Liste der Datei-IDs
+    """
+    rows = conn.execute(
+        "SELECT postings FROM tokens WHERE token >= ? AND token < ?",
+        (prefix, prefix + '\U0010ffff')
+    ).fetchall()
+    if len(rows) == 1:
+        return decode_postings(rows[0][0])
+    ids = set()
+    for (blob,) in rows:
+        ids.update(decode_postings(blob))
+    return sorted(ids)
+
+
+def intersect_sorted(candidates, postings):
+    """Schnittmenge zweier sortierter ID-Folgen, kleine Kandidatenmengen per Binärsuche"""
+    if len(candidates) * 20 < len(postings):
+        result = []
+        for file_id in candidates:
+            pos = bisect_left(postings, file_id)
+            if pos < len(postings) and postings[pos] == file_id:
+                result.append(file_id)
+        return result
+    members = set(postings)
+    return [file_id for file_id in candidates if file_id in members]
+
+
+def lookup_words(conn, query):
+    """
+    Sucht Dateien, deren Name oder Pfad ALLE Wörter der Eingabe enthält
+    (jeweils als Token-Präfix). Die Posting-Listen werden nach Länge
+    sortiert geschnitten, die kleinste zuerst.
+
+    Returns:
+        Aufsteigend sortierte Liste der Datei-IDs
+    """
+    words = tokenize_name(query)
+    if not words:
+        return []
+
+    try:
+        counts = []
+        for word in words:
+            row = conn.execute(
+                "SELECT COALESCE(SUM(doc_count), 0) FROM tokens WHERE token >= ? AND token < ?",
+                (word, word + '\U0010ffff')
+            ).fetchone()
+            counts.append((row[0], word))
+    except sqlite3.Error as e:
+        print(f"[DEBUG] Token-Index nicht verwendbar: {e}")
+        return []
+
+    counts.sort()
+    if counts[0][0] == 0:
+        return []
+
+    result = list(prefix_postings(conn, counts[0][1]))
+    for _, word in counts[1:]:
+        if not result:
+            break
+        result = intersect_sorted(result, prefix_postings(conn, word))
+    return result
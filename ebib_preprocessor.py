@@ -0,0 +1,972 @@
+#!/usr/bin/env python3
+"""
+ebib_preprocessor.py - Preprocessing für 2.5M Records
+Erstellt optimierte Such-Indizes für ultra-schnelle Suche
+
+Importierbar: eb-gui.py baut die DB im eigenen Prozess über
+preprocess_to_sqlite() mit Fortschritts-Callback und CancelToken auf.
+Das Konsolen-Menü liegt in csv-2-sqlite-conversion.py.
+"""
+
+import os
+import json
+import pickle
+import sqlite3
+from pathlib import Path
+import re
+from collections import defaultdict
+import time
+import multiprocessing
+import queue
+import threading
+
+from eb_collections import NO_COLLECTION_PRIORITY, load_collections
+from eb_query import FILE_TYPE_IDS, FILE_TYPES, get_file_type, parse_day
+from eb_sql import SCHEMA_VERSION, derive_link, has_fts_index, read_meta, source_fingerprint
+from eb_tokens import tokenize_name, encode_postings, decode_postings, has_token_index
+from tsv_scan import parse_tsv
+
+INPUT_FILE = '/media/synology/files/projekte/kd0089 my eBib & DMS/Compare-n-Share/s_250518-list-of-all-files-in-eBib-HDD-v032.tsv'
+PROCESSED_DB = os.environ.get('EBIB_SQLITE_PATH', Path.home() / 'Documents' / 'ebib_search.db')
+
+# Phasen des Aufbaus in Ablaufreihenfolge (Parsen und Einfügen laufen überlappend)
+PHASES = {
+    'parse': "Parsen",
+    'insert': "Einfügen",
+    'update': "Abgleich",
+    'index': "Indizes",
+    'analyze': "Analyse",
+}
+
+
+class BuildCancelled(Exception):
+    """Der Aufbau wurde über das CancelToken abgebrochen"""
+
+
+class CancelToken:
+    """Thread-sicheres Abbruch-Signal für preprocess_to_sqlite"""
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self):
+        self._event.set()
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+    def check(self):
+        """Löst BuildCancelled aus, falls abgebrochen wurde"""
+        if self._event.is_set():
+            raise BuildCancelled("Aufbau abgebrochen")
+
+
+class BuildProgress:
+    """
+    Fortschritt des Aufbaus, wird nach jedem Bereich und bei jedem
+    Phasenwechsel an den progress-Callback übergeben
+    """
+
+    def __init__(self, bytes_total=0, progress=None, cancel=None):
+        self.started = time.time()
+        self.phase = None
+        self.bytes_total = bytes_total
+        self.bytes_start = 0   # Startposition beim Fortsetzen
+        self.bytes_done = 0
+        self.rows_start = 0    # bereits geladene Zeilen beim Fortsetzen
+        self.rows = 0
+        self.phase_times = dict.fromkeys(PHASES, 0.0)
+        self._phase_started = None
+        self._load_started = None
+        self._progress = progress
+        self._cancel = cancel
+
+    @property
+    def elapsed(self):
+        return time.time() - self.started
+
+    @property
+    def rows_per_second(self):
+        load_time = time.time() - (self._load_started or self.started)
+        return (self.rows - self.rows_start) / max(load_time, 1e-6) if self._load_started else 0.0
+
+    @property
+    def eta(self):
+        """Geschätzte Restzeit des Ladens in Sekunden (None vor dem ersten Bereich)"""
+        done = self.bytes_done - self.bytes_start
+        if not self._load_started or done <= 0:
+            return None
+        rate = done / max(time.time() - self._load_started, 1e-6)
+        return (self.bytes_total - self.bytes_done) / rate
+
+    def check_cancel(self):
+        if self._cancel is not None:
+            self._cancel.check()
+
+    def set_phase(self, phase):
+        """Schließt die laufende Phase ab und startet phase (None = fertig)"""
+        now = time.time()
+        if self.phase in ('index', 'update', 'analyze'):
+            self.phase_times[self.phase] += now - self._phase_started
+        if phase == 'parse' and self._load_started is None:
+            self._load_started = now
+        self.phase = phase
+        self._phase_started = now
+        if phase is not None:
+            self.check_cancel()
+        self.report()
+
+    def add_time(self, phase, seconds):
+        """Zeit der überlappenden Phasen (Parsen, Einfügen) aufsummieren"""
+        self.phase_times[phase] += seconds
+
+    def report(self):
+        if self._progress is not None:
+            self._progress(self)
+
+    def describe_phases(self):
+        """z.B. 'Parsen 12.1s, Einfügen 9.8s, Indizes 30.2s, Analyse 4.0s'"""
+        return ", ".join(f"{PHASES[phase]} {seconds:.1f}s"
+                         for phase, seconds in self.phase_times.items() if seconds)
+
+
+def format_duration(seconds):
+    """Sekunden als m:ss für ETA-Anzeigen"""
+    if seconds is None:
+        return "?"
+    minutes, seconds = divmod(int(seconds), 60)
+    return f"{minutes}:{seconds:02d}"
+
+
+def parse_tsv_line_robust(line):
+    """Robustes TSV-Parsing"""
+    line = line.rstrip('\n\r')
+    while '\t\t' in line:
+        line = line.replace('\t\t', '\t')
+    parts = line.split('\t')
+    while len(parts) < 8:
+        parts.append('')
+    return parts[:8]
+
+def build_md5_groups(cursor):
+    """
+    Fasst Dateien mit gleichem md5 zu Gruppen zusammen (Tabelle md5_groups)
+    und vergibt files.copy_rank: kanonisch ist die Kopie aus der Sammlung
+    mit der höchsten Priorität (Sammlungen.csv.txt), bei Gleichstand die
+    mit der kleinsten id. Setzt die Tabelle collections voraus.
+
+    Returns:
+        (Anzahl Gruppen, überzählige Kopien, verschwendete Bytes)
+    """
+    cursor.execute('UPDATE files SET copy_rank = 0 WHERE copy_rank > 0')
+    cursor.execute('DELETE FROM md5_groups')
+    cursor.execute('''
+        INSERT INTO md5_groups (hash, file_count)
+        SELECT hash, COUNT(*) FROM files WHERE hash IS NOT NULL GROUP BY hash HAVING COUNT(*) > 1
+    ''')
+    cursor.execute(f'''
+        WITH ranked AS (
+            SELECT f.id, ROW_NUMBER() OVER (
+                PARTITION BY f.hash ORDER BY COALESCE(c.priority, {NO_COLLECTION_PRIORITY}), f.id
+            ) AS copy_rank
+            FROM md5_groups g
+            JOIN files f ON f.hash = g.hash
+            LEFT JOIN collections c ON c.collection_id = f.collection_id
+        )
+        UPDATE files SET copy_rank = ranked.copy_rank FROM ranked WHERE files.id = ranked.id
+    ''')
+    cursor.execute('''
+        UPDATE md5_groups SET
+            canonical_id = (SELECT id FROM files f WHERE f.hash = md5_groups.hash AND f.copy_rank = 1),
+            wasted_bytes = (SELECT TOTAL(CASE WHEN typeof(size) = 'integer' THEN size END) FROM files f
+                            WHERE f.hash = md5_groups.hash AND f.copy_rank > 1)
+    ''')
+    groups, copies, wasted = cursor.execute(
+        'SELECT COUNT(*), TOTAL(file_count - 1), TOTAL(wasted_bytes) FROM md5_groups').fetchone()
+    return groups, int(copies), int(wasted)
+
+def write_collections(cursor):
+    """Überträgt die Sammlungen aus Sammlungen.csv.txt in die Tabelle collections"""
+    cursor.execute('DELETE FROM collections')
+    cursor.executemany(
+        'INSERT INTO collections (collection_id, name, name_lower, priority) VALUES (?, ?, ?, ?)',
+        [(c.id, c.name, c.name.lower(), c.priority) for c in load_collections().collections.values()]
+    )
+
+def write_statistics(cursor):
+    """Schreibt Häufigkeiten (Extension, Jahr, Dateityp, Sammlung) in die Tabelle stats"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS stats (
+            kind TEXT,            -- total, ext, year, type, collection, size (Stellenzahl)
+            value TEXT,
+            count INTEGER,
+            PRIMARY KEY (kind, value)
+        )
+    ''')
+    cursor.execute('DELETE FROM stats')
+    cursor.execute("INSERT INTO stats SELECT 'total', '', COUNT(*) FROM files")
+    cursor.execute('''
+        INSERT INTO stats
+        SELECT 'ext', e.extension_lower, SUM(c.count)
+        FROM (SELECT ext_id, COUNT(*) AS count FROM files GROUP BY ext_id) c
+        JOIN extensions e USING (ext_id)
+        GROUP BY e.extension_lower
+    ''')
+    cursor.execute("INSERT INTO stats SELECT 'year', year, COUNT(*) FROM files WHERE year IS NOT NULL GROUP BY year")
+    cursor.execute('''
+        INSERT INTO stats
+        SELECT 'type', t.name, COUNT(*) FROM files f JOIN file_types t ON t.id = f.type_id GROUP BY f.type_id
+    ''')
+    cursor.execute('''
+        INSERT INTO stats
+        SELECT 'collection', c.name_lower, COUNT(*) FROM files f JOIN collections c USING (collection_id)
+        GROUP BY c.name_lower
+    ''')
+    cursor.execute('''
+        INSERT INTO stats
+        SELECT 'size', length(size), COUNT(*) FROM files WHERE typeof(size) = 'integer' GROUP BY length(size)
+    ''')
+
+def build_fts_index(cursor):
+    """Baut den FTS5-Trigram-Index über Dateiname und Pfad für Teilstring-Suchen"""
+    cursor.execute('''
+        CREATE VIRTUAL TABLE IF NOT EXISTS files_fts USING fts5(
+            filename, path,
+            content='file_paths', content_rowid='id',
+            tokenize='trigram'
+        )
+    ''')
+    cursor.execute("INSERT INTO files_fts(files_fts) VALUES ('rebuild')")
+
+def build_token_index(cursor):
+    """Baut die Posting-Listen des Wort-Token-Index (eb_tokens.py) über Dateiname und Pfad"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS tokens (
+            id INTEGER PRIMARY KEY,
+            token TEXT UNIQUE,
+            doc_count INTEGER,
+            postings BLOB         -- Datei-IDs, uint32 aufsteigend
+        )
+    ''')
+    cursor.execute('DELETE FROM tokens')
+
+    postings = defaultdict(list)
+    path_tokens = {}  # Pfade wiederholen sich, nur einmal zerlegen
+    for file_id, filename, path in cursor.execute('SELECT id, filename, path FROM file_paths ORDER BY id'):
+        tokens = path_tokens.get(path)
+        if tokens is None:
+            tokens = path_tokens[path] = tokenize_name(path or '')
+        for token in set(tokens).union(tokenize_name(filename or '')):
+            postings[token].append(file_id)
+
+    cursor.executemany(
+        'INSERT INTO tokens (token, doc_count, postings) VALUES (?, ?, ?)',
+        ((token, len(ids), encode_postings(ids)) for token, ids in postings.items())
+    )
+
+FILE_COLUMNS = ('date_of_work', 'link', 'dir_id', 'filename', 'ext_id',
+                'size', 'date', 'hash', 'year', 'type_id', 'collection_id', 'work_day', 'file_day')
+
+def create_files_table(cursor, table='files', temp=False):
+    """
+    Legt die files-Tabelle (bzw. eine temporäre Tabelle gleicher Struktur)
+    und die Wörterbücher extensions und file_types an (Schema v2)
+    """
+    cursor.execute(f'''
+        CREATE {'TEMP ' if temp else ''}TABLE IF NOT EXISTS {table} (
+            id INTEGER PRIMARY KEY,
+            date_of_work TEXT,
+            link TEXT,            -- NULL, wenn gleich eb_sql.derive_link(path, filename)
+            dir_id INTEGER,       -- directories.dir_id
+            filename TEXT,
+            ext_id INTEGER,       -- extensions.ext_id
+            size INTEGER,         -- Bytes
+            date TEXT,
+            hash BLOB,            -- md5, 16 Bytes (Text nur bei ungültigem Wert)
+            year INTEGER,         -- Für Jahr-Filter
+            type_id INTEGER,      -- file_types.id: text, audio, graphik, video, sonstige
+            collection_id INTEGER, -- collections.collection_id, 0 ohne Sammlung
+            work_day INTEGER,     -- date_of_work als Tagesnummer (eb_query.parse_day), 0 ohne Datum
+            file_day INTEGER,     -- date als Tagesnummer, 0 ohne Datum
+            copy_rank INTEGER DEFAULT 0  -- 0: einzige Kopie, sonst Rang unter gleichem md5 (1 = kanonisch)
+        )
+    ''')
+    if temp:
+        return
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS extensions (
+            ext_id INTEGER PRIMARY KEY,
+            extension TEXT UNIQUE,    -- wie in der TSV-Liste
+            extension_lower TEXT      -- für eb 'ext:' und stats
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS file_types (
+            id INTEGER PRIMARY KEY,
+            name TEXT UNIQUE
+        )
+    ''')
+    cursor.executemany('INSERT OR IGNORE INTO file_types (id, name) VALUES (?, ?)',
+                       [(FILE_TYPE_IDS[name], name) for name in FILE_TYPES])
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS collections (
+            collection_id INTEGER PRIMARY KEY,
+            name TEXT,                -- wie in Sammlungen.csv.txt (KSW-Lib, RONS, ...)
+            name_lower TEXT,          -- für eb 'sammlung:'
+            priority INTEGER
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS md5_groups (
+            hash BLOB PRIMARY KEY,    -- md5 mit mindestens zwei Dateien
+            file_count INTEGER,
+            canonical_id INTEGER,     -- files.id der bevorzugten Kopie (copy_rank 1)
+            wasted_bytes INTEGER      -- Größe aller übrigen Kopien
+        ) WITHOUT ROWID
+    ''')
+    # Duplikat-Bericht (eb --duplikate): größte Verschwendung zuerst ohne Sortierung
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_md5_groups_wasted ON md5_groups(wasted_bytes DESC, file_count DESC)')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS directories (
+            dir_id INTEGER PRIMARY KEY,
+            parent_dir_id INTEGER,    -- NULL für oberste Verzeichnisse
+            path TEXT UNIQUE,
+            path_lower TEXT,          -- für eb 'pfad:' (Präfix-Bereich)
+            depth INTEGER,
+            file_count INTEGER,       -- Dateien im ganzen Teilbaum
+            total_size INTEGER        -- Bytes im ganzen Teilbaum
+        )
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_directories_path_lower ON directories(path_lower)')
+    # Dateiname + Pfad je Datei, Inhalt des Trigram-Index und Quelle für Tokens
+    cursor.execute('''
+        CREATE VIEW IF NOT EXISTS file_paths AS
+        SELECT id, filename, path FROM files JOIN directories USING (dir_id)
+    ''')
+
+def create_indexes(cursor):
+    """Indizes für schnelle Suche und für den Abgleich im Update-Modus"""
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_work_day ON files(work_day)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_file_day ON files(file_day)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_size ON files(size)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_copy_rank ON files(copy_rank) WHERE copy_rank > 0')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_ext_id ON files(ext_id)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_type_id ON files(type_id)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_year ON files(year)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_hash ON files(hash)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_dir_filename ON files(dir_id, filename)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_collection_id ON files(collection_id)')
+
+def extract_year(date_str):
+    if date_str and len(date_str) >= 4:
+        try:
+            return int(date_str[:4])
+        except:
+            pass
+    return None
+
+def encode_md5(hash_val):
+    """md5-Hex -> 16 Bytes; andere Werte bleiben Text, leere werden NULL"""
+    try:
+        digest = bytes.fromhex(hash_val)
+    except ValueError:
+        return hash_val or None
+    return digest if len(digest) == 16 and digest.hex() == hash_val else (hash_val or None)
+
+def parse_listing_line(line):
+    """Wandelt eine TSV-Zeile in ein Tupel in FILE_COLUMNS-Reihenfolge (None bei Fehlern)"""
+    try:
+        row = parse_tsv_line_robust(line)
+        date_of_work, link, path, filename, extension, size, date, hash_val = row
+
+        # Preprocessing (Schema v2: kompakte Werte, siehe create_files_table)
+        if link == derive_link(path, filename):
+            link = None
+        size = int(size) if size.isdigit() else (size or None)
+        hash_val = encode_md5(hash_val)
+        year = extract_year(date_of_work)
+        type_id = FILE_TYPE_IDS[get_file_type(extension)]
+        collection_id = load_collections().resolve_id(path)
+        # Tagesnummern für Datumsbereiche; 0 statt NULL, damit NOT datum:... wie im TSV-Modus wirkt
+        work_day = parse_day(date_of_work) or 0
+        file_day = parse_day(date) or 0
+
+        # Pfad und Extension bleiben Text, bulk_load ersetzt sie durch ihre IDs
+        return (
+            date_of_work, link, path, filename, extension, size, date, hash_val,
+            year, type_id, collection_id, work_day, file_day
+        )
+    except Exception:
+        return None
+
+def apply_build_pragmas(conn):
+    """
+    Pragmas für den Aufbau der Nebendatei: WAL mit fsync nur beim
+    Checkpoint - schnell, aber jeder Commit übersteht einen Abbruch,
+    damit der Aufbau fortgesetzt werden kann.
+    """
+    conn.execute('PRAGMA journal_mode = WAL')
+    conn.execute('PRAGMA synchronous = NORMAL')
+    conn.execute('PRAGMA locking_mode = EXCLUSIVE')
+    conn.execute('PRAGMA temp_store = MEMORY')
+    conn.execute('PRAGMA cache_size = -262144')  # 256 MB
+
+def create_build_tables(cursor):
+    """
+    meta (Schlüssel/Wert: complete, schema_version, source*, row_count,
+    build_seconds, ...) und build_state (Checkpoints des Ladens)
+    """
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS meta (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS build_state (
+            batch INTEGER PRIMARY KEY,
+            byte_offset INTEGER,  -- Ende des übernommenen Bereichs in der TSV-Datei
+            row_count INTEGER,    -- Zeilen insgesamt bis hierher
+            committed_at REAL
+        )
+    ''')
+
+def write_meta(cursor, **values):
+    """Setzt Einträge der Tabelle meta"""
+    cursor.executemany('INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)',
+                       [(key, str(value)) for key, value in values.items()])
+
+def source_signature(input_file):
+    """Kennzeichen der TSV-Datei, zu der ein angefangener Aufbau gehört"""
+    stat = os.stat(input_file)
+    return {'source': str(input_file), 'source_size': stat.st_size, 'source_mtime': stat.st_mtime}
+
+def find_resume_point(build_path, input_file):
+    """
+    Prüft, ob ein abgebrochener Vollaufbau in build_path fortgesetzt werden kann
+
+    Returns:
+        (byte_offset, row_count) des letzten Checkpoints oder None
+    """
+    if not os.path.exists(build_path):
+        return None
+    conn = sqlite3.connect(build_path)
+    try:
+        meta = dict(conn.execute('SELECT key, value FROM meta').fetchall())
+        expected = {key: str(value) for key, value in source_signature(input_file).items()}
+        if meta.get('mode') != 'full' or any(meta.get(key) != value for key, value in expected.items()):
+            return None
+        row = conn.execute('SELECT byte_offset, row_count FROM build_state ORDER BY batch DESC LIMIT 1').fetchone()
+        return tuple(row) if row else None
+    except sqlite3.Error:
+        return None
+    finally:
+        conn.close()
+
+def parent_directory(path):
+    """Übergeordnetes Verzeichnis ('/a/b' -> '/a') oder None an der Wurzel"""
+    parent = path.rstrip('/').rpartition('/')[0]
+    return parent if parent and parent != path else None
+
+def with_parent_directories(paths, known):
+    """
+    Ergänzt neue Verzeichnisse um ihre noch unbekannten Eltern
+
+    Returns:
+        Sortierte Liste (Eltern stehen vor ihren Unterverzeichnissen)
+    """
+    result = set()
+    for path in paths:
+        while path is not None and path not in known and path not in result:
+            result.add(path)
+            path = parent_directory(path)
+    return sorted(result)
+
+def update_directory_totals(cursor):
+    """
+    Summiert Dateien und Bytes je Verzeichnis über den ganzen Teilbaum auf
+    und entfernt Verzeichnisse, unter denen keine Datei mehr liegt
+    """
+    totals = {dir_id: [count, size] for dir_id, count, size in cursor.execute(
+        'SELECT dir_id, COUNT(*), TOTAL(size) FROM files GROUP BY dir_id')}
+    directories = cursor.execute('SELECT dir_id, parent_dir_id FROM directories ORDER BY depth DESC').fetchall()
+    for dir_id, parent_id in directories:
+        count, size = totals.setdefault(dir_id, [0, 0])
+        if parent_id is not None:
+            parent = totals.setdefault(parent_id, [0, 0])
+            parent[0] += count
+            parent[1] += size
+    cursor.executemany('UPDATE directories SET file_count = ?, total_size = ? WHERE dir_id = ?',
+                       [(count, int(size), dir_id) for dir_id, (count, size) in totals.items()])
+    cursor.execute('DELETE FROM directories WHERE file_count = 0')
+
+def bulk_load(conn, table, input_file, monitor, checkpoint=False, resume_from=None):
+    """
+    Lädt die TSV-Liste in table: Worker-Prozesse parsen große Bereiche
+    (tsv_scan.parse_tsv), ein einzelner Writer-Thread schreibt sie.
+
+    Mit checkpoint committet der Writer jeden Bereich zusammen mit seiner
+    Endposition in build_state; resume_from=(byte_offset, row_count) setzt
+    dort fort. Ohne checkpoint macht der Aufrufer den Commit.
+    Fortschritt und Abbruch laufen über monitor (BuildProgress).
+
+    Returns:
+        Anzahl geladener Zeilen (inkl. bereits vorher geladener)
+    """
+    lookups = {
+        'dir_id': '(SELECT dir_id FROM directories WHERE path = ?)',
+        'ext_id': '(SELECT ext_id FROM extensions WHERE extension = ?)',
+    }
+    values = ', '.join(lookups.get(col, '?') for col in FILE_COLUMNS)
+    sql = f"INSERT INTO {table} ({', '.join(FILE_COLUMNS)}) VALUES ({values})"
+    dir_index = FILE_COLUMNS.index('dir_id')
+    ext_index = FILE_COLUMNS.index('ext_id')
+    known_extensions = {ext for (ext,) in conn.execute('SELECT extension FROM extensions')}
+    known_directories = {path for (path,) in conn.execute('SELECT path FROM directories')}
+    chunks = queue.Queue(maxsize=4)
+    errors = []
+
+    def writer():
+        cursor = conn.cursor()
+        while True:
+            item = chunks.get()
+            if item is None:
+                return
+            if not errors:
+                try:
+                    end_offset, row_count, rows = item
+                    insert_start = time.time()
+                    # Neue Extensions und Verzeichnisse ins Wörterbuch, im selben Commit wie die Zeilen
+                    new_extensions = {row[ext_index] for row in rows} - known_extensions
+                    cursor.executemany(
+                        'INSERT OR IGNORE INTO extensions (extension, extension_lower) VALUES (?, ?)',
+                        [(ext, ext.lower()) for ext in sorted(new_extensions)]
+                    )
+                    new_directories = with_parent_directories({row[dir_index] for row in rows} - known_directories,
+                                                              known_directories)
+                    cursor.executemany(
+                        'INSERT OR IGNORE INTO directories (parent_dir_id, path, path_lower, depth) '
+                        'VALUES ((SELECT dir_id FROM directories WHERE path = ?), ?, ?, ?)',
+                        [(parent_directory(path), path, path.lower(), path.count('/')) for path in new_directories]
+                    )
+                    cursor.executemany(sql, rows)
+                    if checkpoint:
+                        cursor.execute(
+                            'INSERT INTO build_state (byte_offset, row_count, committed_at) VALUES (?, ?, ?)',
+                            (end_offset, row_count, time.time())
+                        )
+                        conn.commit()
+                    known_extensions.update(new_extensions)
+                    known_directories.update(new_directories)
+                    monitor.add_time('insert', time.time() - insert_start)
+                except Exception as e:
+                    errors.append(e)  # weiter leeren, damit der Parser nicht blockiert
+
+    writer_thread = threading.Thread(target=writer, name='sqlite-writer')
+    writer_thread.start()
+
+    start_offset, row_count = resume_from or (0, 0)
+    monitor.bytes_start = monitor.bytes_done = start_offset
+    monitor.rows_start = monitor.rows = row_count
+    monitor.set_phase('parse')
+    chunk_start = time.time()
+    parsed = parse_tsv(input_file, parse_listing_line, start=start_offset)
+    try:
+        for end_offset, rows in parsed:
+            monitor.add_time('parse', time.time() - chunk_start)
+            row_count += len(rows)
+            chunks.put((end_offset, row_count, rows))
+            monitor.bytes_done = end_offset
+            monitor.rows = row_count
+            print(f"📊 {row_count:,} Records geparst ({monitor.elapsed:.1f}s, "
+                  f"{monitor.rows_per_second:,.0f}/s, Rest ~{format_duration(monitor.eta)})")
+            monitor.report()
+            if errors:
+                break
+            monitor.check_cancel()
+            chunk_start = time.time()
+    finally:
+        parsed.close()  # Parser-Prozesse sofort beenden
+        chunks.put(None)
+        writer_thread.join()
+
+    if errors:
+        raise errors[0]
+    return row_count
+
+def collect_tokens(cursor, id_table):
+    """Token -> Datei-IDs für alle IDs in der temporären Tabelle id_table"""
+    tokens = defaultdict(list)
+    rows = cursor.execute(f'SELECT id, filename, path FROM file_paths WHERE id IN (SELECT id FROM {id_table})').fetchall()
+    for file_id, filename, path in rows:
+        for token in set(tokenize_name(path or '')).union(tokenize_name(filename or '')):
+            tokens[token].append(file_id)
+    return tokens
+
+def update_token_index(cursor, removed, added):
+    """Wendet entfernte/hinzugefügte Datei-IDs auf die betroffenen Posting-Listen an"""
+    for token in set(removed) | set(added):
+        row = cursor.execute('SELECT postings FROM tokens WHERE token = ?', (token,)).fetchone()
+        ids = set(decode_postings(row[0])) if row else set()
+        ids.difference_update(removed.get(token, ()))
+        ids.update(added.get(token, ()))
+        if ids:
+            cursor.execute(
+                'INSERT OR REPLACE INTO tokens (id, token, doc_count, postings) '
+                'VALUES ((SELECT id FROM tokens WHERE token = ?), ?, ?, ?)',
+                (token, token, len(ids), encode_postings(sorted(ids)))
+            )
+        elif row:
+            cursor.execute('DELETE FROM tokens WHERE token = ?', (token,))
+
+def can_update(db_path):
+    """Enthält die DB bereits Daten im aktuellen Schema (sonst Vollaufbau)?"""
+    if not os.path.exists(db_path):
+        return False
+    conn = sqlite3.connect(db_path)
+    try:
+        if read_meta(conn).get('schema_version') != str(SCHEMA_VERSION):
+            return False
+        return conn.execute('SELECT 1 FROM files LIMIT 1').fetchone() is not None
+    except sqlite3.Error:
+        return False
+    finally:
+        conn.close()
+
+def update_sqlite(conn, input_file, monitor):
+    """
+    Inkrementelles Update: gleicht die neue TSV-Liste über (Verzeichnis, filename)
+    mit der DB ab und übernimmt nur Löschungen, Änderungen (md5, Größe,
+    Datum, ...) und neue Dateien - zusammen mit files_fts, tokens und stats
+    in einer Transaktion.
+    """
+    cursor = conn.cursor()
+    create_indexes(cursor)
+
+    # Neue Liste in eine temporäre Tabelle laden
+    create_files_table(cursor, 'new_files', temp=True)
+    cursor.execute('DELETE FROM new_files')
+    new_count = bulk_load(conn, 'new_files', input_file, monitor)
+    monitor.set_phase('update')
+    cursor.execute('CREATE INDEX IF NOT EXISTS temp.idx_new_key ON new_files(dir_id, filename)')
+    print(f"📥 {new_count:,} Records der neuen Liste geladen ({monitor.elapsed:.1f}s)")
+
+    payload_differs = ' OR '.join(f'f.{col} IS NOT n.{col}' for col in FILE_COLUMNS)
+    cursor.executescript(f'''
+        DROP TABLE IF EXISTS temp.deleted_ids;
+        DROP TABLE IF EXISTS temp.changed_ids;
+        DROP TABLE IF EXISTS temp.added_ids;
+
+        -- Nicht mehr gelistet oder Duplikat eines früheren Doppel-Imports
+        CREATE TEMP TABLE deleted_ids AS
+            SELECT f.id FROM files f
+            WHERE NOT EXISTS (SELECT 1 FROM new_files n WHERE n.dir_id = f.dir_id AND n.filename = f.filename)
+               OR f.id > (SELECT MIN(g.id) FROM files g WHERE g.dir_id = f.dir_id AND g.filename = f.filename);
+
+        -- Gleicher Schlüssel, aber geänderte Werte (md5, Größe, Datum, ...)
+        CREATE TEMP TABLE changed_ids AS
+            SELECT f.id, MIN(n.id) AS new_id FROM files f
+            JOIN new_files n ON n.dir_id = f.dir_id AND n.filename = f.filename
+            WHERE f.id NOT IN (SELECT id FROM deleted_ids)
+            GROUP BY f.id
+            HAVING MAX({payload_differs});
+    ''')
+
+    deleted = cursor.execute('SELECT COUNT(*) FROM deleted_ids').fetchone()[0]
+    changed = cursor.execute('SELECT COUNT(*) FROM changed_ids').fetchone()[0]
+
+    cursor.execute('BEGIN')
+    try:
+        fts = has_fts_index(cursor)
+        tokens = has_token_index(cursor)
+
+        # Abgeleitete Tabellen: alte Werte austragen, solange sie noch in files stehen
+        cursor.execute('CREATE TEMP TABLE IF NOT EXISTS touched_ids (id INTEGER PRIMARY KEY)')
+        cursor.execute('DELETE FROM touched_ids')
+        cursor.execute('INSERT INTO touched_ids SELECT id FROM deleted_ids UNION SELECT id FROM changed_ids')
+        removed_tokens = collect_tokens(cursor, 'touched_ids') if tokens else {}
+        if fts:
+            cursor.execute('''
+                INSERT INTO files_fts(files_fts, rowid, filename, path)
+                SELECT 'delete', id, filename, path FROM file_paths WHERE id IN (SELECT id FROM touched_ids)
+            ''')
+
+        cursor.execute('DELETE FROM files WHERE id IN (SELECT id FROM deleted_ids)')
+        cursor.execute(f'''
+            UPDATE files SET {', '.join(f'{col} = n.{col}' for col in FILE_COLUMNS)}
+            FROM changed_ids c JOIN new_files n ON n.id = c.new_id
+            WHERE files.id = c.id
+        ''')
+
+        # Neue Schlüssel anhängen; ihre IDs liegen über dem bisherigen Maximum
+        max_id = cursor.execute('SELECT COALESCE(MAX(id), 0) FROM files').fetchone()[0]
+        cursor.execute(f'''
+            INSERT INTO files ({', '.join(FILE_COLUMNS)})
+            SELECT {', '.join(FILE_COLUMNS)} FROM new_files
+            WHERE id IN (
+                SELECT MIN(n.id) FROM new_files n
+                WHERE NOT EXISTS (SELECT 1 FROM files f WHERE f.dir_id = n.dir_id AND f.filename = n.filename)
+                GROUP BY n.dir_id, n.filename
+            )
+            ORDER BY id
+        ''')
+        added = cursor.rowcount
+
+        # Neue Werte eintragen
+        cursor.execute('DELETE FROM touched_ids')
+        cursor.execute('INSERT INTO touched_ids SELECT id FROM changed_ids UNION SELECT id FROM files WHERE id > ?',
+                       (max_id,))
+        if fts:
+            cursor.execute('''
+                INSERT INTO files_fts(rowid, filename, path)
+                SELECT id, filename, path FROM file_paths WHERE id IN (SELECT id FROM touched_ids)
+            ''')
+        else:
+            build_fts_index(cursor)
+        if tokens:
+            update_token_index(cursor, removed_tokens, collect_tokens(cursor, 'touched_ids'))
+        else:
+            build_token_index(cursor)
+
+        update_directory_totals(cursor)
+        write_collections(cursor)
+        build_md5_groups(cursor)
+        write_statistics(cursor)
+        cursor.execute('COMMIT')
+    except BaseException:
+        cursor.execute('ROLLBACK')
+        raise
+
+    cursor.execute('DROP TABLE new_files')
+    print(f"🔁 Update: {added:,} neu, {changed:,} geändert, {deleted:,} entfernt")
+    return cursor
+
+def build_file_path(db_path):
+    """Nebendatei für den Aufbau - im selben Verzeichnis, damit os.replace atomar ist"""
+    return f"{db_path}.building"
+
+def copy_database(src_path, dst_path):
+    """Konsistente Kopie der Live-DB über die SQLite-Backup-API"""
+    src = sqlite3.connect(f"file:{src_path}?mode=ro", uri=True)
+    dst = sqlite3.connect(dst_path)
+    try:
+        src.backup(dst)
+    finally:
+        dst.close()
+        src.close()
+
+def verify_database(conn):
+    """
+    ANALYZE und Konsistenzprüfung vor dem Austausch
+
+    Raises:
+        sqlite3.DatabaseError, wenn die neue DB nicht verwendbar ist
+    """
+    print("🔎 ANALYZE und Integritätsprüfung...")
+    conn.execute('ANALYZE')
+    result = conn.execute('PRAGMA quick_check').fetchone()[0]
+    if result != 'ok':
+        raise sqlite3.DatabaseError(f"quick_check fehlgeschlagen: {result}")
+    if conn.execute('SELECT COUNT(*) FROM files').fetchone()[0] == 0:
+        raise sqlite3.DatabaseError("files-Tabelle ist leer")
+    conn.execute("INSERT INTO files_fts(files_fts, rank) VALUES ('integrity-check', 0)")
+    conn.commit()
+
+def remove_build_files(build_path):
+    """Entfernt eine Nebendatei samt WAL-Dateien"""
+    for path in (build_path, f"{build_path}-wal", f"{build_path}-shm"):
+        if os.path.exists(path):
+            os.remove(path)
+
+# Wie oft (in SQLite-VM-Schritten) lange SQL-Phasen das CancelToken prüfen
+CANCEL_CHECK_STEPS = 100000
+
+def preprocess_to_sqlite(full_rebuild=False, input_file=None, db_path=None, progress=None, cancel=None):
+    """
+    Erstellt SQLite-DB mit Indizes für ultra-schnelle Suche.
+    Enthält die DB bereits Daten, wird inkrementell aktualisiert,
+    außer full_rebuild ist gesetzt.
+
+    Aufgebaut wird immer in einer Nebendatei; erst nach ANALYZE und
+    Integritätsprüfung ersetzt sie die Live-DB per atomarem Rename.
+    Laufende Suchen sehen so nie eine halb gefüllte DB.
+
+    Ein abgebrochener Vollaufbau wird beim nächsten Aufruf ab dem letzten
+    Checkpoint (build_state) fortgesetzt, sofern die TSV-Datei unverändert ist.
+
+    Args:
+        full_rebuild: Vollaufbau auch bei vorhandener DB
+        input_file: TSV-Datei (Standard: INPUT_FILE)
+        db_path: Ziel-DB (Standard: PROCESSED_DB)
+        progress: Optionaler Callback(BuildProgress) nach jedem Bereich und Phasenwechsel
+        cancel: Optionales CancelToken; auch laufende SQL-Anweisungen werden abgebrochen
+
+    Returns:
+        BuildProgress mit Zeilenzahl und Zeiten pro Phase
+
+    Raises:
+        FileNotFoundError: TSV-Datei fehlt
+        BuildCancelled: Abbruch über cancel (ein Vollaufbau bleibt fortsetzbar)
+    """
+    input_file = input_file or INPUT_FILE
+    db_path = db_path or PROCESSED_DB
+
+    if not os.path.exists(input_file):
+        print(f"❌ Input-Datei nicht gefunden: {input_file}")
+        raise FileNotFoundError(input_file)
+
+    monitor = BuildProgress(os.path.getsize(input_file), progress, cancel)
+    incremental = not full_rebuild and can_update(db_path)
+
+    build_path = build_file_path(db_path)
+    resume_from = None if incremental else find_resume_point(build_path, input_file)
+    if resume_from is None:
+        remove_build_files(build_path)  # Rest eines abgebrochenen Aufbaus
+        if incremental:
+            copy_database(db_path, build_path)
+
+    # SQLite-DB erstellen (der Writer-Thread von bulk_load nutzt dieselbe Verbindung)
+    conn = sqlite3.connect(build_path, check_same_thread=False)
+    apply_build_pragmas(conn)
+    if cancel is not None:
+        # Lange Anweisungen (Index, FTS, ANALYZE) brechen mit "interrupted" ab
+        conn.set_progress_handler(lambda: cancel.cancelled, CANCEL_CHECK_STEPS)
+    cursor = conn.cursor()
+
+    try:
+        create_build_tables(cursor)
+        write_meta(cursor, complete=0)
+        conn.commit()
+
+        if incremental:
+            print("🔄 Inkrementelles Update der SQLite-DB...")
+            cursor = update_sqlite(conn, input_file, monitor)
+        else:
+            if resume_from:
+                print(f"⏯️  Setze Aufbau fort ab Byte {resume_from[0]:,} ({resume_from[1]:,} Records)")
+            else:
+                print("🔄 Preprocessing 2.5M Records zu SQLite...")
+                create_files_table(cursor)
+                write_meta(cursor, mode='full', **source_signature(input_file))
+                conn.commit()
+
+            # Daten laden, jeder Bereich wird mit Checkpoint committet
+            loaded = bulk_load(conn, 'files', input_file, monitor, checkpoint=True, resume_from=resume_from)
+            new_rows = loaded - monitor.rows_start
+            print(f"⚡ {loaded:,} Records geladen, davon {new_rows:,} in {monitor.elapsed:.1f}s "
+                  f"({monitor.rows_per_second:,.0f} Records/Sekunde)")
+
+            # Indizes erst nach dem Laden - ein Sortierlauf statt Millionen Einzel-Updates
+            monitor.set_phase('index')
+            print("🗂️  Erstelle Indizes...")
+            create_indexes(cursor)
+            conn.commit()
+
+            # Teilstring-Index für name:/Schnellsuche (LIKE '%...%' kann keinen B-Baum nutzen)
+            monitor.check_cancel()
+            print("🔤 Erstelle Trigram-Index über Dateiname und Pfad...")
+            build_fts_index(cursor)
+            conn.commit()
+
+            # Wort-Token-Index für Suchen mit mehreren Begriffen
+            monitor.check_cancel()
+            print("🔤 Erstelle Wort-Token-Index...")
+            build_token_index(cursor)
+            conn.commit()
+
+            # Verzeichnis-Summen und Statistiken für den Query-Planer (eb_planner.py)
+            monitor.set_phase('analyze')
+            update_directory_totals(cursor)
+            write_collections(cursor)
+            groups, copies, wasted = build_md5_groups(cursor)
+            print(f"🧬 {groups:,} md5-Gruppen mit {copies:,} überzähligen Kopien ({wasted / 1024 ** 3:,.1f} GB)")
+            write_statistics(cursor)
+            conn.commit()
+
+        if monitor.phase != 'analyze':
+            monitor.set_phase('analyze')
+        verify_database(conn)
+        monitor.check_cancel()
+
+        cursor.execute('SELECT COUNT(*) FROM files')
+        total_records = cursor.fetchone()[0]
+
+        # Erst jetzt gilt die DB als vollständig; die Werte erlauben der GUI
+        # und eb eine Frischeprüfung ohne COUNT(*) über die ganze Tabelle
+        cursor.execute('DELETE FROM build_state')
+        write_meta(cursor, complete=1, schema_version=SCHEMA_VERSION,
+                   mode='incremental' if incremental else 'full', **source_signature(input_file),
+                   source_fingerprint=source_fingerprint(input_file), row_count=total_records,
+                   build_seconds=f"{monitor.elapsed:.1f}", built_at=time.strftime('%Y-%m-%d %H:%M:%S'))
+        conn.commit()
+        conn.set_progress_handler(None, 0)
+        conn.execute('PRAGMA journal_mode = DELETE')  # Live-DB ohne WAL-Dateien
+
+        cursor.execute('''
+            SELECT t.name, COUNT(*) FROM files f JOIN file_types t ON t.id = f.type_id
+            GROUP BY f.type_id ORDER BY COUNT(*) DESC
+        ''')
+        type_stats = cursor.fetchall()
+    except BaseException as e:
+        conn.close()
+        cancelled = cancel is not None and cancel.cancelled
+        if incremental or (isinstance(e, sqlite3.DatabaseError) and not cancelled):
+            remove_build_files(build_path)
+            print("❌ Aufbau abgebrochen - die bisherige DB bleibt unverändert")
+        else:
+            print("⏸️  Aufbau unterbrochen - der nächste Aufruf setzt am letzten Checkpoint fort")
+        if cancelled and not isinstance(e, BuildCancelled):
+            raise BuildCancelled("Aufbau abgebrochen") from e
+        raise
+
+    conn.close()
+    os.replace(build_path, db_path)
+    print(f"🔀 Neue DB eingespielt: {db_path}")
+
+    monitor.rows = total_records
+    monitor.set_phase(None)
+    elapsed = monitor.elapsed
+
+    print(f"✅ Preprocessing abgeschlossen!")
+    print(f"📊 {total_records:,} Records in {elapsed:.1f}s verarbeitet")
+    print(f"⚡ {total_records/elapsed:.0f} Records/Sekunde")
+    print(f"⏱️  Phasen: {monitor.describe_phases()}")
+    print(f"💾 DB-Größe: {os.path.getsize(db_path)/1024/1024:.1f} MB")
+
+    print(f"\n📈 DATEITYP-VERTEILUNG:")
+    for file_type, count in type_stats:
+        percentage = (count / total_records) * 100
+        print(f"  {file_type:10}: {count:8,} ({percentage:5.1f}%)")
+
+    return monitor
+
+def test_search_performance():
+    """Testet die Such-Performance"""
+    if not os.path.exists(PROCESSED_DB):
+        print("❌ Erst preprocessing ausführen!")
+        return
+
+    conn = sqlite3.connect(PROCESSED_DB)
+    cursor = conn.cursor()
+
+    test_queries = [
+        ("Text-Suche", "SELECT * FROM files WHERE filename LIKE '%pdf%' LIMIT 100"),
+        ("Trigram-Suche", "SELECT * FROM files WHERE id IN (SELECT rowid FROM files_fts WHERE files_fts MATCH '\"manual\"') LIMIT 100"),
+        ("Extension-Filter", "SELECT * FROM files WHERE ext_id IN (SELECT ext_id FROM extensions WHERE extension_lower = 'mp3') LIMIT 100"),
+        ("Dateityp-Filter", "SELECT * FROM files WHERE type_id = (SELECT id FROM file_types WHERE name = 'audio') LIMIT 100"),
+        ("Datums-Filter", "SELECT * FROM files WHERE work_day BETWEEN 738521 AND 738885 LIMIT 100"),  # 2023
+        ("Größen-Filter", "SELECT * FROM files WHERE size > 50 * 1024 * 1024 LIMIT 100"),
+        ("Summe Größe", "SELECT COUNT(*), SUM(size) FROM files WHERE type_id = (SELECT id FROM file_types WHERE name = 'video')"),
+        ("Kombiniert", "SELECT * FROM files WHERE filename LIKE '%test%' AND type_id = (SELECT id FROM file_types WHERE name = 'text') LIMIT 100")
+    ]
+
+    print("🚀 PERFORMANCE-TEST:")
+    for name, query in test_queries:
+        start = time.time()
+        cursor.execute(query)
+        results = cursor.fetchall()
+        elapsed = (time.time() - start) * 1000
+        print(f"  {name:15}: {len(results):3} Ergebnisse in {elapsed:6.1f}ms")
+
+    conn.close()
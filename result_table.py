@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+result_table.py - Virtuelle Treffertabelle für eb-gui.py
+Ein ttk.Treeview mit genau so vielen Zeilen, wie sichtbar sind; beim
+Scrollen werden nur diese Zeilen aus der Trefferliste nachgeladen
+(eb_sql.ResultCursor.rows_at, seitenweise per Keyset). Ein Klick auf die
+Spaltenüberschrift sortiert - mit DB in SQL, im TSV-Modus in Python.
+"""
+
+import os
+import subprocess
+import tkinter as tk
+from tkinter import ttk
+
+from eb_query import format_size, parse_day
+
+# (Überschrift, TSV-Spalte, Sortierschlüssel aus eb_sql.SORT_EXPRESSIONS, Breite, Ausrichtung)
+TABLE_COLUMNS = (
+    ("Datum", 0, "datum", 90, tk.W),
+    ("Dateiname", 3, "name", 360, tk.W),
+    ("ext", 4, "ext", 50, tk.W),
+    ("Größe", 5, "size", 90, tk.E),
+    ("Dateidatum", 6, "dateidatum", 130, tk.W),
+    ("Pfad", 2, "pfad", 420, tk.W),
+)
+
+ROW_HEIGHT = 22     # Pixel je Tabellenzeile
+HEADER_HEIGHT = 26  # Pixel der Überschriftenzeile
+WHEEL_ROWS = 3      # Zeilen je Mausrad-Schritt
+
+
+def _size_key(row):
+    return int(row[5]) if row[5].isdigit() else -1
+
+
+# Sortierschlüssel im TSV-Modus, entsprechend eb_sql.SORT_EXPRESSIONS
+LIST_SORT_KEYS = {
+    "datum": lambda row: parse_day(row[0]) or 0,
+    "name": lambda row: row[3].lower(),
+    "ext": lambda row: row[4].lower(),
+    "size": _size_key,
+    "dateidatum": lambda row: parse_day(row[6]) or 0,
+    "pfad": lambda row: row[2].lower(),
+}
+
+
+class ListResults:
+    """Trefferliste im Speicher (TSV-Modus) mit der Schnittstelle von eb_sql.ResultCursor"""
+
+    def __init__(self, rows, order=None, descending=False):
+        self.rows = rows
+        self.order = order
+        self.descending = descending
+
+    def sorted_by(self, order, descending=False):
+        if order is None:
+            return ListResults(self.rows)
+        return ListResults(sorted(self.rows, key=LIST_SORT_KEYS[order], reverse=descending), order, descending)
+
+    def rows_at(self, offset, limit):
+        return self.rows[offset:offset + limit]
+
+    def count(self):
+        return len(self.rows)
+
+    def __iter__(self):
+        return iter(self.rows)
+
+
+class VirtualResultTable:
+    """
+    GUI-Komponente: Treffertabelle, die nur den sichtbaren Ausschnitt
+    darstellt. Datenquelle ist ein eb_sql.ResultCursor oder eine Liste.
+    """
+
+    def __init__(self, parent_frame, colors, source_callback=None):
+        """
+        Args:
+            parent_frame: Übergeordnetes tkinter Widget
+            colors: Farbschema-Dictionary aus der Haupt-GUI
+            source_callback: Wird mit der neuen Quelle aufgerufen, wenn die
+                             Sortierung wechselt (z.B. für den ODS-Export)
+        """
+        self.colors = colors
+        self.source_callback = source_callback
+        self.source = None
+        self.total = 0
+        self.offset = 0
+        self.visible_rows = 1
+        self.render_pending = False
+        self.row_cache = []  # aktuell sichtbare Zeilen (TSV-Format)
+
+        self.frame = tk.Frame(parent_frame, bg=colors['bg'])
+
+        style = ttk.Style()
+        style.configure('Results.Treeview',
+                        background=colors['entry_bg'],
+                        fieldbackground=colors['entry_bg'],
+                        foreground=colors['entry_fg'],
+                        rowheight=ROW_HEIGHT,
+                        borderwidth=0)
+        style.configure('Results.Treeview.Heading',
+                        background=colors['button_bg'],
+                        foreground=colors['fg'],
+                        font=('Arial', 10, 'bold'))
+        style.map('Results.Treeview',
+                  background=[('selected', colors['highlight'])],
+                  foreground=[('selected', '#ffffff')])
+
+        self.tree = ttk.Treeview(self.frame, style='Results.Treeview', show='headings', selectmode='browse',
+                                 columns=[str(i) for i in range(len(TABLE_COLUMNS))])
+        for i, (heading, _, order, width, anchor) in enumerate(TABLE_COLUMNS):
+            self.tree.heading(str(i), text=heading, command=lambda o=order: self.sort_by(o))
+            self.tree.column(str(i), width=width, anchor=anchor, stretch=(order == "pfad"))
+
+        # Die Scrollleiste steuert den Ausschnitt, nicht das Treeview selbst
+        self.scrollbar = ttk.Scrollbar(self.frame, orient=tk.VERTICAL, command=self.on_scrollbar)
+
+        self.tree.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        self.scrollbar.grid(row=0, column=1, sticky=(tk.N, tk.S))
+        self.frame.columnconfigure(0, weight=1)
+        self.frame.rowconfigure(0, weight=1)
+
+        self.frame.bind('<Configure>', self.on_resize)
+        self.tree.bind('<MouseWheel>', self.on_mousewheel)
+        self.tree.bind('<Button-4>', lambda e: self.scroll_to(self.offset - WHEEL_ROWS))
+        self.tree.bind('<Button-5>', lambda e: self.scroll_to(self.offset + WHEEL_ROWS))
+        self.tree.bind('<Home>', lambda e: self.scroll_to(0))
+        self.tree.bind('<End>', lambda e: self.scroll_to(self.total))
+        self.tree.bind('<Double-1>', self.on_double_click)
+
+    def set_source(self, source, total=None):
+        """
+        Zeigt eine neue Trefferliste ab der ersten Zeile
+
+        Args:
+            source: eb_sql.ResultCursor, ListResults, Liste oder None (leeren)
+            total: Bekannte Trefferzahl (sonst source.count())
+        """
+        if isinstance(source, list):
+            source = ListResults(source)
+        self.source = source
+        self.total = 0 if source is None else (source.count() if total is None else total)
+        self.offset = 0
+        self.update_headings()
+        self.schedule_render()
+
+    def clear(self):
+        self.set_source(None)
+
+    def sort_by(self, order):
+        """Sortiert nach der angeklickten Spalte; erneuter Klick kehrt die Richtung um"""
+        if self.source is None:
+            return
+        descending = self.source.order == order and not self.source.descending
+        self.source = self.source.sorted_by(order, descending)
+        self.offset = 0
+        self.update_headings()
+        self.schedule_render()
+        if self.source_callback:
+            self.source_callback(self.source)
+
+    def update_headings(self):
+        """Markiert die Sortierspalte mit ▲/▼"""
+        order = self.source.order if self.source is not None else None
+        descending = self.source.descending if self.source is not None else False
+        for i, (heading, _, column_order, _, _) in enumerate(TABLE_COLUMNS):
+            if column_order == order:
+                heading += " ▼" if descending else " ▲"
+            self.tree.heading(str(i), text=heading)
+
+    def on_resize(self, event):
+        visible = max(1, (event.height - HEADER_HEIGHT) // ROW_HEIGHT)
+        if visible != self.visible_rows:
+            self.visible_rows = visible
+            self.tree.configure(height=visible)
+            self.schedule_render()
+
+    def on_scrollbar(self, *args):
+        if args[0] == 'moveto':
+            self.scroll_to(int(float(args[1]) * self.total))
+        elif args[0] == 'scroll':
+            step = self.visible_rows if args[2] == 'pages' else 1
+            self.scroll_to(self.offset + int(args[1]) * step)
+
+    def on_mousewheel(self, event):
+        return self.scroll_to(self.offset - WHEEL_ROWS * (1 if event.delta > 0 else -1))
+
+    def scroll_to(self, offset):
+        offset = max(0, min(offset, self.total - self.visible_rows))
+        if offset != self.offset:
+            self.offset = offset
+            self.schedule_render()
+        return "break"
+
+    def schedule_render(self):
+        """Fasst mehrere Scroll-Ereignisse (Ziehen der Scrollleiste) zu einem Neuzeichnen zusammen"""
+        if not self.render_pending:
+            self.render_pending = True
+            self.frame.after_idle(self.render)
+
+    def render(self):
+        """Lädt nur die sichtbaren Zeilen und überschreibt die Einträge des Treeview"""
+        self.render_pending = False
+        rows = self.source.rows_at(self.offset, self.visible_rows) if self.source is not None else []
+        items = self.tree.get_children()
+        for i, row in enumerate(rows):
+            values = [format_size(int(row[5])) if index == 5 and row[5].isdigit() else row[index]
+                      for _, index, _, _, _ in TABLE_COLUMNS]
+            if i < len(items):
+                self.tree.item(items[i], values=values)
+            else:
+                self.tree.insert('', tk.END, values=values)
+        if len(items) > len(rows):
+            self.tree.delete(*items[len(rows):])
+        self.row_cache = rows
+
+        if self.total:
+            self.scrollbar.set(self.offset / self.total, min(1.0, (self.offset + self.visible_rows) / self.total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    def on_double_click(self, event):
+        """Öffnet die Datei der angeklickten Zeile mit der Standard-Anwendung"""
+        item = self.tree.identify_row(event.y)
+        if not item:
+            return
+        position = self.tree.get_children().index(item)
+        if position >= len(self.row_cache):
+            return
+        row = self.row_cache[position]
+        file_path = os.path.join(row[2], row[3])
+        try:
+            subprocess.Popen(["xdg-open", file_path])
+        except OSError as e:
+            print(f"[DEBUG] Kann {file_path} nicht öffnen: {e}")
@@ -1,5 +1,8 @@
 # SOFORTIGER DEBUG-CODE für eb-gui.py
 
+from eb_query import FILE_TYPE_IDS
+from eb_sql import ROW_COLUMNS, ROW_SOURCE
+
 def debug_search_comparison(self, query):
     """
     Vergleicht SQLite vs TSV Ergebnisse um den Bug zu finden
@@ -21,7 +24,7 @@ def debug_search_comparison(self, query):
     print(f"Filter: Text={has_text_query}, Datum={has_date_filter}, Typ={has_type_filter}")
     
     if has_date_filter:
-        print(f"Datums-Filter: {self.current_date_filter.strftime('%Y-%m-%d')}")
+        print(f"Datums-Filter: {self.current_date_filter.query_value()}")
     
     if has_type_filter:
         active_types = [k for k, v in self.type_vars.items() if v.get()]
@@ -31,7 +34,8 @@ def debug_search_comparison(self, query):
     try:
         print(f"\n--- SQLite-Suche ---")
         sqlite_start = time.time()
-        sqlite_results = self.search_sqlite(query, has_date_filter, has_type_filter)
+        # ResultCursor vollständig laden, damit der Vergleich alle Zeilen sieht
+        sqlite_results = list(self.search_sqlite(query, self.search_options()))
         sqlite_time = (time.time() - sqlite_start) * 1000
         print(f"SQLite: {len(sqlite_results)} Ergebnisse in {sqlite_time:.1f}ms")
         
@@ -115,30 +119,30 @@ def search_sqlite_with_debug(self, query, has_date_filter, has_type_filter):
     
     # Text-Suche (falls vorhanden)
     if query.strip():
-        conditions.append("filename_lower LIKE ?")
+        conditions.append("lower(filename) LIKE ?")
         params.append(f"%{query.lower()}%")
-        print(f"  Text-Filter: filename_lower LIKE '%{query.lower()}%'")
+        print(f"  Text-Filter: lower(filename) LIKE '%{query.lower()}%'")
 
     # Datums-Filter
     if has_date_filter and self.current_date_filter:
-        date_str = self.current_date_filter.strftime("%Y-%m-%d")
-        conditions.append("date_of_work LIKE ?")
-        params.append(f"{date_str}%")
-        print(f"  Datum-Filter: date_of_work LIKE '{date_str}%'")
+        date_range = self.current_date_filter
+        conditions.append("work_day BETWEEN ? AND ?")
+        params.extend([date_range.start.toordinal(), date_range.end.toordinal()])
+        print(f"  Datum-Filter: work_day BETWEEN ({date_range.query_value()})")
 
     # Dateityp-Filter
     if has_type_filter:
         type_conditions = []
         if self.type_vars['text'].get():
-            type_conditions.append("file_type = 'text'")
+            type_conditions.append(f"type_id = {FILE_TYPE_IDS['text']}")
         if self.type_vars['audio'].get():
-            type_conditions.append("file_type = 'audio'")
+            type_conditions.append(f"type_id = {FILE_TYPE_IDS['audio']}")
         if self.type_vars['graphik'].get():
-            type_conditions.append("file_type = 'graphik'")
+            type_conditions.append(f"type_id = {FILE_TYPE_IDS['graphik']}")
         if self.type_vars['video'].get():
-            type_conditions.append("file_type = 'video'")
+            type_conditions.append(f"type_id = {FILE_TYPE_IDS['video']}")
         if self.type_vars['sonstige'].get():
-            type_conditions.append("file_type = 'sonstige'")
+            type_conditions.append(f"type_id = {FILE_TYPE_IDS['sonstige']}")
 
         if type_conditions:
             type_filter = f"({' OR '.join(type_conditions)})"
@@ -146,9 +150,9 @@ def search_sqlite_with_debug(self, query, has_date_filter, has_type_filter):
             print(f"  Typ-Filter: {type_filter}")
 
     # SQL zusammensetzen
-    base_query = """
-        SELECT date_of_work, link, path, filename, extension, size, date, hash
-        FROM files
+    base_query = f"""
+        SELECT {ROW_COLUMNS}
+        FROM {ROW_SOURCE}
     """
 
     if conditions:
@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+"""
+tsv_scan.py - Paralleler Scan der großen TSV-Dateiliste
+Teilt die Datei in zeilengenaue Byte-Bereiche und prüft jeden Bereich in
+einem eigenen Prozess. Gemeinsam genutzt von eb.py (einfache und boolesche
+Suche), eb-gui.py (TSV-Fallback ohne SQLite-DB) und dem DB-Aufbau in
+ebib_preprocessor.py (parse_tsv).
+"""
+
+import mmap
+import multiprocessing
+import os
+import re
+
+CHUNK_SIZE = 16 * 1024 * 1024      # Bytes pro Arbeitspaket
+MIN_PARALLEL_SIZE = 32 * 1024 * 1024  # kleinere Dateien im eigenen Prozess scannen
+TSV_COLUMNS = 8
+
+# Pro Worker-Prozess einmalig erzeugter Filter und Vorauswahl-Muster
+_row_filter = None
+_literal_pattern = None
+
+
+def split_tsv_line(line):
+    """Zerlegt eine TSV-Zeile in genau TSV_COLUMNS Spalten"""
+    parts = line.rstrip('\r').split('\t')
+    if len(parts) < TSV_COLUMNS:
+        parts.extend([''] * (TSV_COLUMNS - len(parts)))
+    return parts[:TSV_COLUMNS]
+
+
+def split_ranges(path, chunk_size=CHUNK_SIZE, start=0):
+    """
+    Teilt eine Datei ab Byte start (einem Zeilenanfang) in Byte-Bereiche,
+    die jeweils an einem Zeilenanfang beginnen
+
+    Returns:
+        Liste von (start, end)-Tupeln
+    """
+    file_size = os.path.getsize(path)
+    ranges = []
+    with open(path, 'rb') as f:
+        while start < file_size:
+            end = start + chunk_size
+            if end >= file_size:
+                end = file_size
+            else:
+                f.seek(end)
+                f.readline()  # bis zum Ende der angeschnittenen Zeile
+                end = f.tell()
+            ranges.append((start, end))
+            start = end
+    return ranges
+
+
+def compile_literals(literals):
+    """
+    Übersetzt Pflicht-Literale (siehe eb_query.required_literals) in ein
+    Byte-Muster für die Suche in kleingeschriebenen Daten
+
+    Returns:
+        bytes (ein Literal), kompiliertes bytes-Regex (mehrere) oder None
+    """
+    if not literals:
+        return None
+    encoded = [lit.lower().encode('utf-8') for lit in literals]
+    if len(encoded) == 1:
+        return encoded[0]
+    return re.compile(b'|'.join(re.escape(lit) for lit in encoded))
+
+
+def iter_candidate_lines(data, pattern):
+    """
+    Liefert die Zeilen (bytes) aus data, die das Muster enthalten
+    (ohne Groß-/Kleinschreibung); ohne Muster alle Zeilen
+    """
+    if pattern is None:
+        for line in data.split(b'\n'):
+            if line:
+                yield line
+        return
+
+    lowered = data.lower()
+    if isinstance(pattern, bytes):
+        find = lambda pos: lowered.find(pattern, pos)
+    else:
+        def find(pos):
+            match = pattern.search(lowered, pos)
+            return match.start() if match else -1
+
+    pos = find(0)
+    while pos != -1:
+        line_start = lowered.rfind(b'\n', 0, pos) + 1
+        line_end = lowered.find(b'\n', pos)
+        if line_end == -1:
+            line_end = len(lowered)
+        yield data[line_start:line_end]
+        pos = find(line_end + 1)
+
+
+def scan_range(path, start, end, row_filter, pattern=None):
+    """
+    Prüft alle Zeilen eines Byte-Bereichs über ein Memory-Mapping.
+    Nur Zeilen, die das Vorauswahl-Muster enthalten, werden dekodiert
+    und zerlegt; der Speicherbedarf hängt nur von der Bereichsgröße ab.
+
+    Returns:
+        (geprüfte Zeilen, Liste der passenden Zeilen)
+    """
+    if end <= start:
+        return 0, []
+    with open(path, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            data = mm[start:end]
+
+    row_count = data.count(b'\n')
+    if not data.endswith(b'\n'):
+        row_count += 1
+
+    matches = []
+    for raw_line in iter_candidate_lines(data, pattern):
+        row = split_tsv_line(raw_line.decode('utf-8', errors='replace'))
+        if row_filter is None or row_filter(row):
+            matches.append(row)
+    return row_count, matches
+
+
+def parse_range(path, start, end, line_parser):
+    """
+    Wandelt alle Zeilen eines Byte-Bereichs mit line_parser um
+
+    Returns:
+        Liste der Ergebnisse (Zeilen, für die line_parser None liefert, entfallen)
+    """
+    if end <= start:
+        return []
+    with open(path, 'rb') as f:
+        f.seek(start)
+        text = f.read(end - start).decode('utf-8', errors='replace')
+    lines = text.split('\n')
+    if lines and lines[-1] == '':
+        lines.pop()  # Zeilenende des Bereichs
+    rows = []
+    for line in lines:
+        row = line_parser(line)
+        if row is not None:
+            rows.append(row)
+    return rows
+
+
+def accept_candidates():
+    """Filter-Factory für reine Literal-Suchen: die Vorauswahl ist bereits exakt"""
+    return None
+
+
+def line_contains(term):
+    """Filter-Factory: Zeile enthält term (ohne Groß-/Kleinschreibung)"""
+    return lambda row: term in '\t'.join(row).lower()
+
+
+def _init_worker(filter_factory, factory_args, literals):
+    global _row_filter, _literal_pattern
+    _row_filter = filter_factory(*factory_args)
+    _literal_pattern = compile_literals(literals)
+
+
+def _parse_task(task):
+    path, start, end, line_parser = task
+    return end - start, parse_range(path, start, end, line_parser)
+
+
+def _scan_task(task):
+    path, start, end = task
+    row_count, matches = scan_range(path, start, end, _row_filter, _literal_pattern)
+    return end - start, row_count, matches
+
+
+def scan_tsv(path, filter_factory, factory_args=(), literals=None, workers=None, progress=None,
+             should_stop=None, chunk_size=CHUNK_SIZE):
+    """
+    Durchsucht die TSV-Datei parallel und liefert Treffer in Dateireihenfolge
+
+    Args:
+        path: TSV-Datei
+        filter_factory: Picklebare Funktion, die aus factory_args einen
+                        Filter row -> bool erzeugt (z.B. eb_query.compile_node);
+                        liefert sie None, gilt jede Kandidatenzeile als Treffer
+        factory_args: Argumente für filter_factory (z.B. der geplante AST)
+        literals: Optionale Pflicht-Literale (eb_query.required_literals);
+                  nur Zeilen, die eines davon enthalten, werden geprüft
+        workers: Anzahl Prozesse (Standard: alle CPU-Kerne)
+        progress: Optionaler Callback (bytes_done, bytes_total, rows_done, matches_done)
+                  nach jedem Arbeitspaket
+        should_stop: Optionaler Callback; liefert er True, wird abgebrochen
+
+    Yields:
+        Listen passender Zeilen, ein Eintrag pro Arbeitspaket
+    """
+    total_bytes = os.path.getsize(path)
+    ranges = split_ranges(path, chunk_size)
+    tasks = [(path, start, end) for start, end in ranges]
+    workers = workers or os.cpu_count() or 1
+
+    bytes_done = rows_done = matches_done = 0
+
+    if workers == 1 or len(tasks) == 1 or total_bytes < MIN_PARALLEL_SIZE:
+        # Kleine Dateien: Prozessstart lohnt sich nicht
+        row_filter = filter_factory(*factory_args)
+        pattern = compile_literals(literals)
+        results = (
+            (end - start,) + scan_range(path, start, end, row_filter, pattern) for _, start, end in tasks
+        )
+        pool = None
+    else:
+        # spawn statt fork: sicher auch aus dem GUI-Thread heraus
+        context = multiprocessing.get_context('spawn')
+        pool = context.Pool(min(workers, len(tasks)), initializer=_init_worker,
+                            initargs=(filter_factory, factory_args, literals))
+        results = pool.imap(_scan_task, tasks)
+
+    try:
+        for chunk_bytes, row_count, matches in results:
+            if should_stop and should_stop():
+                break
+            bytes_done += chunk_bytes
+            rows_done += row_count
+            matches_done += len(matches)
+            if progress:
+                progress(bytes_done, total_bytes, rows_done, matches_done)
+            yield matches
+    finally:
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+
+
+def search_literal(path, term, **kwargs):
+    """
+    Sucht einen festen Begriff in der ganzen Zeile (wie grep -i -F)
+
+    ASCII-Begriffe werden vollständig über die Byte-Suche beantwortet.
+    Bei Umlauten dient der längste ASCII-Teil als Vorauswahl, die
+    Kandidaten werden danach mit str.lower() exakt geprüft.
+
+    Args:
+        path: TSV-Datei
+        term: Suchbegriff, darf Leerzeichen, - und Anführungszeichen enthalten
+        **kwargs: Weitere Argumente für scan_tsv (progress, should_stop, ...)
+
+    Yields:
+        Listen passender Zeilen, ein Eintrag pro Arbeitspaket
+    """
+    term = term.lower()
+    if term.isascii():
+        return scan_tsv(path, accept_candidates, (), literals=(term,), **kwargs)
+    fragment = max(re.split(r'[^\x00-\x7f]+', term), key=len)
+    return scan_tsv(path, line_contains, (term,), literals=(fragment,) if fragment else None, **kwargs)
+
+
+def parse_tsv(path, line_parser, workers=None, progress=None, chunk_size=CHUNK_SIZE, start=0):
+    """
+    Parst die TSV-Datei parallel in großen Bereichen, z.B. für den DB-Aufbau
+
+    Args:
+        path: TSV-Datei
+        line_parser: Picklebare Funktion line -> Ergebnis oder None
+        workers: Anzahl Prozesse (Standard: alle CPU-Kerne)
+        progress: Optionaler Callback (bytes_done, bytes_total) nach jedem Bereich
+        start: Byte-Position eines Zeilenanfangs, ab der gelesen wird (Fortsetzen)
+
+    Yields:
+        (Endposition, Liste geparster Zeilen) in Dateireihenfolge, ein Eintrag pro Bereich
+    """
+    total_bytes = os.path.getsize(path)
+    tasks = [(path, range_start, end, line_parser) for range_start, end in split_ranges(path, chunk_size, start)]
+    workers = workers or os.cpu_count() or 1
+
+    if workers == 1 or len(tasks) == 1 or total_bytes < MIN_PARALLEL_SIZE:
+        results = map(_parse_task, tasks)
+        pool = None
+    else:
+        context = multiprocessing.get_context('spawn')
+        pool = context.Pool(min(workers, len(tasks)))
+        results = pool.imap(_parse_task, tasks)
+
+    bytes_done = start
+    try:
+        for chunk_bytes, rows in results:
+            bytes_done += chunk_bytes
+            if progress:
+                progress(bytes_done, total_bytes)
+            yield bytes_done, rows
+    finally:
+        if pool is not None:
+            pool.terminate()
+            pool.join()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+ui_queue.py - Aktualisierungs-Kanal von Worker-Threads zur Tk-Oberfläche
+Such- und Aufbau-Threads legen Ereignisse nur in eine thread-sichere Queue;
+der Tk-Hauptthread leert sie in festem Takt (FRAME_INTERVAL_MS) und fasst
+dabei zusammen: Zustandsmeldungen (Statuszeile, Fortschritt) zählen nur
+mit ihrem letzten Wert je Takt, Textzeilen werden gesammelt und mit einem
+Aufruf eingefügt. So entsteht kein root.after-Closure pro Ereignis, und
+Worker-Threads berühren nie Tk-Widgets oder Tk-Variablen.
+"""
+
+import queue
+import traceback
+
+FRAME_INTERVAL_MS = 50  # Takt, in dem der Tk-Thread die Queue leert
+
+# Zustellung je Ereignisart
+MODE_CALL = 'call'      # jedes Ereignis einzeln, in Reihenfolge
+MODE_LATEST = 'latest'  # nur das letzte Ereignis eines Takts
+MODE_BATCH = 'batch'    # alle Ereignisse eines Takts als Liste in einem Aufruf
+
+
+class UIUpdateQueue:
+    """Thread-sichere Ereignis-Queue, die im Tk-Hauptthread getaktet abgearbeitet wird"""
+
+    def __init__(self, root, interval_ms=FRAME_INTERVAL_MS):
+        self.root = root
+        self.interval_ms = interval_ms
+        self.events = queue.SimpleQueue()
+        self.handlers = {}  # Ereignisart -> (handler, Modus)
+        self.running = False
+
+    def register(self, kind, handler, mode=MODE_CALL):
+        """
+        Meldet einen Handler (läuft im Tk-Thread) für eine Ereignisart an
+
+        Args:
+            kind: Name der Ereignisart, z.B. 'status'
+            handler: MODE_CALL/MODE_LATEST: handler(*args),
+                     MODE_BATCH: handler(liste der args-Tupel)
+            mode: MODE_CALL, MODE_LATEST oder MODE_BATCH
+        """
+        self.handlers[kind] = (handler, mode)
+
+    def post(self, kind, *args):
+        """Legt ein Ereignis ab; aus jedem Thread aufrufbar"""
+        self.events.put((kind, args))
+
+    def start(self):
+        if not self.running:
+            self.running = True
+            self.root.after(self.interval_ms, self.drain)
+
+    def stop(self):
+        self.running = False
+
+    def drain(self):
+        """Leert die Queue (Tk-Thread) und plant den nächsten Takt"""
+        events = []
+        try:
+            while True:
+                events.append(self.events.get_nowait())
+        except queue.Empty:
+            pass
+        if events:
+            self.dispatch(events)
+        if self.running:
+            self.root.after(self.interval_ms, self.drain)
+
+    def dispatch(self, events):
+        """
+        Stellt die Ereignisse eines Takts zu. Die Reihenfolge bleibt
+        erhalten: ein MODE_LATEST-Ereignis kommt an der Stelle seines
+        letzten Auftretens, aufeinanderfolgende MODE_BATCH-Ereignisse
+        derselben Art werden zu einem Aufruf.
+        """
+        last_position = {}
+        for position, (kind, _) in enumerate(events):
+            if self.handlers.get(kind, (None, None))[1] == MODE_LATEST:
+                last_position[kind] = position
+
+        batch_kind = None
+        batch = []
+        for position, (kind, args) in enumerate(events):
+            if kind not in self.handlers:
+                print(f"[DEBUG] Unbekanntes UI-Ereignis: {kind}")
+                continue
+            handler, mode = self.handlers[kind]
+            if mode == MODE_LATEST and last_position[kind] != position:
+                continue
+            if batch and (mode != MODE_BATCH or kind != batch_kind):
+                self._call(self.handlers[batch_kind][0], batch)
+                batch = []
+            if mode == MODE_BATCH:
+                batch_kind = kind
+                batch.append(args)
+            else:
+                self._call(handler, *args)
+        if batch:
+            self._call(self.handlers[batch_kind][0], batch)
+
+    def _call(self, handler, *args):
+        # Ein fehlerhafter Handler darf den Takt nicht beenden
+        try:
+            handler(*args)
+        except Exception:
+            traceback.print_exc()